@@ -0,0 +1,299 @@
+"""
+주문/결제/계정 도구의 비동기 버전.
+
+tools.py의 도구와 이름/인자/응답 문구가 같지만 로컬 저장소 대신 HTTP 백엔드(backend_client)를
+호출하므로, 백엔드 응답을 기다리는 동안 같은 이벤트 루프의 다른 대화가 계속 진행됨.
+SUPPORT_BACKEND_URL이 설정되면 전문 Agent들이 select_tools()로 이 버전을 사용함.
+"""
+from urllib.parse import quote
+
+from agents import FunctionTool, RunContextWrapper, function_tool
+
+from backend_client import get_backend_client, is_backend_enabled
+from domain_store import is_premium
+from models import UserAccountContext
+from tool_cache import invalidates, read_only
+from tools import (
+    BILLING_HISTORY_TTL,
+    EXPEDITE_PREMIUM_ONLY,
+    ORDER_STATUS_TTL,
+    billing_credit_message,
+    billing_history_message,
+    deactivation_message,
+    email_change_message,
+    expedite_message,
+    export_message,
+    order_status_message,
+    password_reset_message,
+    payment_method_message,
+    redelivery_message,
+    refund_message,
+    return_message,
+    two_factor_message,
+)
+
+
+async def _call(backend: str, method: str, context: UserAccountContext, path: str, **kwargs):
+    return await get_backend_client().request(backend, method, f"/{context.customer_id}{path}", **kwargs)
+
+
+# =============================================================================
+# BILLING SUPPORT TOOLS
+# =============================================================================
+
+
+@read_only(ttl=BILLING_HISTORY_TTL)
+@function_tool
+async def lookup_billing_history(wrapper: RunContextWrapper[UserAccountContext], months_back: int = 6) -> str:
+    """
+    고객의 청구 및 결제 내역을 조회함.
+
+    Args:
+        months_back: 조회 개월(기본 6개월)
+    """
+    invoices = await _call("billing", "GET", wrapper.context, "/invoices", params={"months_back": months_back})
+    return billing_history_message(invoices, months_back)
+
+
+@invalidates("lookup_billing_history")
+@function_tool
+async def process_refund_request(
+    wrapper: RunContextWrapper[UserAccountContext], refund_amount: float, reason: str
+) -> str:
+    """
+    고객 환불 요청을 처리함.
+
+    Args:
+        refund_amount: 환불 금액
+        reason: 환불 사유
+    """
+    context = wrapper.context
+    result = await _call("billing", "POST", context, "/refunds", json={"amount": refund_amount, "reason": reason})
+    return refund_message(result["refund_id"], refund_amount, reason, context)
+
+
+@invalidates("lookup_billing_history")
+@function_tool
+async def update_payment_method(wrapper: RunContextWrapper[UserAccountContext], payment_type: str) -> str:
+    """
+    고객 결제 수단 업데이트를 지원함.
+
+    Args:
+        payment_type: 결제 수단 유형 (credit_card, paypal, bank_transfer)
+    """
+    context = wrapper.context
+    await _call("billing", "POST", context, "/payment-method", json={"payment_type": payment_type})
+    return payment_method_message(payment_type, context)
+
+
+@invalidates("lookup_billing_history")
+@function_tool
+async def apply_billing_credit(
+    wrapper: RunContextWrapper[UserAccountContext], credit_amount: float, reason: str
+) -> str:
+    """
+    보상/정산 목적의 청구 크레딧을 계정에 적용함.
+
+    Args:
+        credit_amount: 적용할 크레딧 금액
+        reason: 크레딧 사유
+    """
+    context = wrapper.context
+    await _call("billing", "POST", context, "/credits", json={"amount": credit_amount, "reason": reason})
+    return billing_credit_message(credit_amount, reason, context)
+
+
+# =============================================================================
+# ORDER MANAGEMENT TOOLS
+# =============================================================================
+
+
+@read_only(ttl=ORDER_STATUS_TTL)
+@function_tool
+async def lookup_order_status(wrapper: RunContextWrapper[UserAccountContext], order_number: str) -> str:
+    """
+    주문 상태와 상세 정보를 조회함.
+
+    Args:
+        order_number: 고객 주문 번호
+    """
+    context = wrapper.context
+    order = await _call("orders", "GET", context, f"/orders/{quote(order_number, safe='')}")
+    return order_status_message(order, order_number, context)
+
+
+@invalidates("lookup_order_status", match=("order_number",))
+@function_tool
+async def initiate_return_process(
+    wrapper: RunContextWrapper[UserAccountContext], order_number: str, return_reason: str, items: str
+) -> str:
+    """
+    주문 반품 프로세스를 시작함.
+
+    Args:
+        order_number: 반품 대상 주문 번호
+        return_reason: 반품 사유
+        items: 반품 품목
+    """
+    context = wrapper.context
+    result = await _call(
+        "orders",
+        "POST",
+        context,
+        f"/orders/{quote(order_number, safe='')}/return",
+        json={"reason": return_reason, "items": items},
+    )
+    if result is None:
+        return f"주문을 찾을 수 없음: {order_number}"
+    return return_message(result["return_id"], result["order_number"], items, context)
+
+
+# 운송장 번호로는 주문을 특정할 수 없으므로 고객의 주문 조회 결과를 모두 지움
+@invalidates("lookup_order_status")
+@function_tool
+async def schedule_redelivery(
+    wrapper: RunContextWrapper[UserAccountContext], tracking_number: str, preferred_date: str
+) -> str:
+    """
+    배송 실패 건에 대해 재배송 일정을 예약함.
+
+    Args:
+        tracking_number: 운송장 번호
+        preferred_date: 고객이 선호하는 배송 날짜
+    """
+    context = wrapper.context
+    result = await _call(
+        "orders",
+        "POST",
+        context,
+        f"/shipments/{quote(tracking_number.strip(), safe='')}/redelivery",
+        json={"preferred_date": preferred_date},
+    )
+    if result is None:
+        return f"운송장을 찾을 수 없음: {tracking_number}"
+    return redelivery_message(result["tracking_number"], preferred_date, context)
+
+
+@invalidates("lookup_order_status", match=("order_number",))
+@function_tool
+async def expedite_shipping(wrapper: RunContextWrapper[UserAccountContext], order_number: str) -> str:
+    """
+    주문의 배송 속도를 업그레이드함 (프리미엄 고객 전용).
+
+    Args:
+        order_number: 대상 주문 번호
+    """
+    context = wrapper.context
+    # 프리미엄 고객 여부 확인
+    if not is_premium(context.tier):
+        return EXPEDITE_PREMIUM_ONLY
+
+    result = await _call("orders", "POST", context, f"/orders/{quote(order_number, safe='')}/expedite", json={})
+    if result is None:
+        return f"배송 정보가 있는 주문을 찾을 수 없음: {order_number}"
+    return expedite_message(result["order_number"], context)
+
+
+# =============================================================================
+# ACCOUNT MANAGEMENT TOOLS
+# =============================================================================
+
+
+@function_tool
+async def reset_user_password(wrapper: RunContextWrapper[UserAccountContext], email: str) -> str:
+    """
+    고객 이메일로 비밀번호 재설정 안내를 발송함.
+
+    Args:
+        email: 재설정 안내를 보낼 이메일 주소
+    """
+    await _call("identity", "POST", wrapper.context, "/password-reset", json={"email": email})
+    return password_reset_message(email)
+
+
+@function_tool
+async def enable_two_factor_auth(wrapper: RunContextWrapper[UserAccountContext], method: str = "app") -> str:
+    """
+    2단계 인증을 설정함.
+
+    Args:
+        method: 인증 방식 (app, sms, email)
+    """
+    context = wrapper.context
+    await _call("identity", "POST", context, "/two-factor", json={"method": method})
+    return two_factor_message(method, context)
+
+
+@function_tool
+async def update_account_email(
+    wrapper: RunContextWrapper[UserAccountContext], old_email: str, new_email: str
+) -> str:
+    """
+    계정 이메일 주소 변경을 처리함.
+
+    Args:
+        old_email: 기존 이메일 주소
+        new_email: 새 이메일 주소
+    """
+    await _call(
+        "identity", "POST", wrapper.context, "/email-change", json={"old_email": old_email, "new_email": new_email}
+    )
+    return email_change_message(old_email, new_email)
+
+
+@function_tool
+async def deactivate_account(
+    wrapper: RunContextWrapper[UserAccountContext], reason: str, feedback: str = ""
+) -> str:
+    """
+    계정 비활성화 요청을 처리함.
+
+    Args:
+        reason: 계정 비활성화 사유
+        feedback: 선택 입력 피드백
+    """
+    context = wrapper.context
+    await _call("identity", "POST", context, "/deactivation", json={"reason": reason, "feedback": feedback})
+    return deactivation_message(reason, feedback, context)
+
+
+@function_tool
+async def export_account_data(wrapper: RunContextWrapper[UserAccountContext], data_types: str) -> str:
+    """
+    고객 계정 데이터 내보내기를 생성함.
+
+    Args:
+        data_types: 내보낼 데이터 유형 (profile, orders, billing 등)
+    """
+    context = wrapper.context
+    result = await _call("identity", "POST", context, "/exports", json={"data_types": data_types})
+    return export_message(result["export_id"], data_types, context)
+
+
+ASYNC_TOOLS = {
+    tool.name: tool
+    for tool in [
+        lookup_billing_history,
+        process_refund_request,
+        update_payment_method,
+        apply_billing_credit,
+        lookup_order_status,
+        initiate_return_process,
+        schedule_redelivery,
+        expedite_shipping,
+        reset_user_password,
+        enable_two_factor_auth,
+        update_account_email,
+        deactivate_account,
+        export_account_data,
+    ]
+}
+
+
+def select_tools(tools: list[FunctionTool], use_backend: bool | None = None) -> list[FunctionTool]:
+    # 백엔드를 사용할 때는 같은 이름의 비동기 버전으로 바꿈 (비동기 버전이 없는 도구는 그대로 사용함)
+    if use_backend is None:
+        use_backend = is_backend_enabled()
+    if not use_backend:
+        return list(tools)
+    return [ASYNC_TOOLS.get(tool.name, tool) for tool in tools]
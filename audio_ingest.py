@@ -0,0 +1,164 @@
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+from agents.voice.input import DEFAULT_SAMPLE_RATE
+
+
+# STT 모델에 전달할 오디오 샘플링 레이트 (AudioInput 기본값과 동일)
+STT_SAMPLE_RATE = DEFAULT_SAMPLE_RATE
+
+# WAV fmt 청크의 오디오 포맷 코드
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+@dataclass
+class WavPayload:
+    # WAV 헤더 정보와 PCM 데이터 (원본 버퍼를 복사하지 않은 memoryview)
+    channels: int
+    sample_width: int
+    sample_rate: int
+    audio_format: int
+    pcm: memoryview
+
+    @property
+    def frames(self) -> int:
+        return len(self.pcm) // (self.channels * self.sample_width)
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+
+def _as_memoryview(audio_input) -> memoryview:
+    # Streamlit UploadedFile은 BytesIO이므로 getbuffer()로 복사 없이 접근 가능함
+    if hasattr(audio_input, "getbuffer"):
+        return audio_input.getbuffer()
+    if hasattr(audio_input, "getvalue"):
+        return memoryview(audio_input.getvalue())
+    return memoryview(audio_input)
+
+
+def parse_wav(audio_input) -> WavPayload:
+    """
+    WAV 헤더를 한 번만 파싱하여 포맷 정보와 PCM 구간(memoryview)을 반환함.
+    wave 모듈과 달리 data 청크를 읽어서 복사하지 않음.
+    """
+    view = _as_memoryview(audio_input).cast("B")
+    if len(view) < 12 or view[0:4] != b"RIFF" or view[8:12] != b"WAVE":
+        raise ValueError("WAV(RIFF) 형식의 오디오가 아님")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset : offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        body = offset + 8
+
+        if chunk_id == b"fmt ":
+            audio_format, channels, sample_rate = struct.unpack_from("<HHI", view, body)
+            (bits,) = struct.unpack_from("<H", view, body + 14)
+            if audio_format == WAVE_FORMAT_EXTENSIBLE:
+                # 확장 포맷은 SubFormat GUID 앞 2바이트가 실제 포맷 코드임
+                (audio_format,) = struct.unpack_from("<H", view, body + 24)
+            fmt = (audio_format, channels, sample_rate, bits // 8)
+
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data 청크가 fmt 청크보다 먼저 나옴")
+            audio_format, channels, sample_rate, sample_width = fmt
+            # 스트리밍 녹음기는 data 크기를 0 또는 0xFFFFFFFF로 기록하기도 함
+            end = len(view) if chunk_size in (0, 0xFFFFFFFF) else body + chunk_size
+            end = min(end, len(view))
+            block_align = channels * sample_width
+            end -= (end - body) % block_align
+            return WavPayload(
+                channels=channels,
+                sample_width=sample_width,
+                sample_rate=sample_rate,
+                audio_format=audio_format,
+                pcm=view[body:end],
+            )
+
+        # 청크는 2바이트 정렬됨
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV data 청크를 찾을 수 없음")
+
+
+def pcm_to_int16(payload: WavPayload) -> np.ndarray:
+    """
+    PCM 데이터를 (frames, channels) 형태의 int16 배열로 변환함.
+    16-bit PCM은 원본 버퍼의 뷰를 그대로 반환하므로 복사가 없음.
+    """
+    pcm = payload.pcm
+    width = payload.sample_width
+
+    if payload.audio_format == WAVE_FORMAT_IEEE_FLOAT:
+        if width != 4:
+            raise ValueError(f"지원하지 않는 float 샘플 크기: {width}")
+        samples = np.frombuffer(pcm, dtype="<f4")
+        samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    elif payload.audio_format != WAVE_FORMAT_PCM:
+        raise ValueError(f"지원하지 않는 WAV 포맷 코드: {payload.audio_format}")
+    elif width == 2:
+        samples = np.frombuffer(pcm, dtype="<i2")
+    elif width == 1:
+        # 8-bit PCM은 부호 없는 값(0~255, 중앙 128)
+        samples = (np.frombuffer(pcm, dtype=np.uint8).astype(np.int16) - 128) << 8
+    elif width == 3:
+        # 24-bit PCM은 상위 2바이트가 곧 int16 샘플임
+        triples = np.frombuffer(pcm, dtype=np.uint8).reshape(-1, 3)
+        samples = np.ascontiguousarray(triples[:, 1:]).view("<i2").reshape(-1)
+    elif width == 4:
+        samples = (np.frombuffer(pcm, dtype="<i4") >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"지원하지 않는 샘플 크기: {width}")
+
+    return samples.reshape(-1, payload.channels)
+
+
+def downmix(frames: np.ndarray) -> np.ndarray:
+    # 다채널 오디오를 채널 평균으로 모노로 변환함 (모노면 복사 없이 뷰 반환)
+    if frames.shape[1] == 1:
+        return frames[:, 0]
+    return frames.mean(axis=1, dtype=np.float32)
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    벡터화된 리샘플링.
+    - 정수 배 다운샘플링(48k → 24k 등)은 블록 평균으로 처리해 에일리어싱을 줄임
+    - 그 외 비율은 선형 보간(np.interp)으로 처리함
+    """
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+
+    if source_rate % target_rate == 0:
+        factor = source_rate // target_rate
+        usable = len(samples) - len(samples) % factor
+        return samples[:usable].reshape(-1, factor).mean(axis=1, dtype=np.float32)
+
+    target_length = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(target_length, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def convert_audio(audio_input, target_rate: int = STT_SAMPLE_RATE) -> np.ndarray:
+    """
+    Streamlit 오디오 입력(.wav)을 STT 모델 입력용 모노 int16 NumPy 배열로 변환하는 함수.
+    - 헤더는 한 번만 파싱하고 PCM은 memoryview로 접근함
+    - 16-bit 모노 + 목표 샘플링 레이트인 경우 복사 없이 원본 버퍼의 뷰를 반환함
+    - 다채널은 다운믹스, 다른 샘플링 레이트는 target_rate로 리샘플링함
+    """
+    payload = parse_wav(audio_input)
+    mono = downmix(pcm_to_int16(payload))
+    mono = resample(mono, payload.sample_rate, target_rate)
+    if mono.dtype != np.int16:
+        # 부동소수 중간 결과는 이 함수가 만든 배열이므로 제자리에서 반올림/클리핑함
+        np.rint(mono, out=mono)
+        np.clip(mono, -32768, 32767, out=mono)
+        mono = mono.astype(np.int16)
+    return mono
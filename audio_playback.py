@@ -0,0 +1,238 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# TTS 출력 기본 포맷 (OpenAI TTS: 24kHz, 모노, int16)
+PLAYBACK_SAMPLE_RATE = 24000
+PLAYBACK_CHANNELS = 1
+# 유휴 상태로 이 시간(초)이 지나면 세션의 재생기를 닫고 풀에서 제거함
+DEFAULT_IDLE_TTL_SECONDS = 15 * 60
+
+
+class RingBuffer:
+    """
+    고정 크기의 int16 링 버퍼. 생산자(이벤트 루프)와 소비자(오디오 스레드)가
+    락 하나로 동기화하며, 쓰기/읽기 시 추가 메모리 할당이 없음.
+    """
+
+    def __init__(self, capacity: int):
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._capacity = capacity
+        self._read = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self):
+        with self._lock:
+            return self._size
+
+    def free(self) -> int:
+        with self._lock:
+            return self._capacity - self._size
+
+    def write(self, samples: np.ndarray) -> int:
+        # 남은 공간만큼만 기록하고 실제로 기록한 샘플 수를 반환함
+        with self._lock:
+            count = min(len(samples), self._capacity - self._size)
+            start = (self._read + self._size) % self._capacity
+            first = min(count, self._capacity - start)
+            self._data[start : start + first] = samples[:first]
+            self._data[: count - first] = samples[first:count]
+            self._size += count
+            return count
+
+    def read_into(self, out: np.ndarray) -> int:
+        # out을 가능한 만큼 채우고 읽은 샘플 수를 반환함
+        with self._lock:
+            count = min(len(out), self._size)
+            first = min(count, self._capacity - self._read)
+            out[:first] = self._data[self._read : self._read + first]
+            out[first:count] = self._data[: count - first]
+            self._read = (self._read + count) % self._capacity
+            self._size -= count
+            return count
+
+    def clear(self):
+        with self._lock:
+            self._read = 0
+            self._size = 0
+
+
+@dataclass
+class PlaybackStats:
+    # 재생 상태 지표 (사이드바 표시용)
+    underruns: int = 0
+    samples_played: int = 0
+    samples_dropped: int = 0
+
+
+class AudioPlayer:
+    """
+    세션당 하나만 여는 저지연 오디오 재생기.
+    - OutputStream은 최초 사용 시 한 번만 열고 이후 턴에서 재사용함
+    - TTS 청크는 링 버퍼에 넣기만 하고, 실제 재생은 PortAudio 콜백 스레드가 담당함
+    - 버퍼에 pre-roll 만큼 쌓이기 전에는 무음을 내보내 지터를 흡수함
+    - 재생 중 데이터가 모자라면 underrun으로 집계함
+    """
+
+    def __init__(
+        self,
+        samplerate: int = PLAYBACK_SAMPLE_RATE,
+        channels: int = PLAYBACK_CHANNELS,
+        buffer_seconds: float = 10.0,
+        preroll_ms: float = 150.0,
+        blocksize: int = 480,
+    ):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.preroll = int(samplerate * channels * preroll_ms / 1000)
+        self.buffer = RingBuffer(int(samplerate * channels * buffer_seconds))
+        self.stats = PlaybackStats()
+        self._stream = None
+        self._playing = False
+        self._turn_open = False
+
+    def start(self):
+        # 스트림은 세션당 한 번만 열림
+        if self._stream is not None:
+            return
+        import sounddevice as sd
+
+        self._stream = sd.OutputStream(
+            samplerate=self.samplerate,
+            channels=self.channels,
+            dtype=np.int16,
+            blocksize=self.blocksize,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def begin_turn(self):
+        # 새 응답 시작: pre-roll이 다시 채워질 때까지 재생을 대기함
+        self._turn_open = True
+        if len(self.buffer) == 0:
+            self._playing = False
+
+    def end_turn(self):
+        # 응답 끝: 남은 샘플은 pre-roll 조건 없이 모두 재생함
+        self._turn_open = False
+
+    async def feed(self, samples: np.ndarray):
+        """
+        TTS 청크를 링 버퍼에 넣음. 버퍼가 가득 차면 블로킹하지 않고
+        한 블록 재생 시간만큼 이벤트 루프에 양보한 뒤 다시 시도함.
+        """
+        if samples is None:
+            return
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        wait = self.blocksize / self.samplerate
+        while len(samples):
+            written = self.buffer.write(samples)
+            samples = samples[written:]
+            if len(samples):
+                if self._stream is None:
+                    # 재생 스트림이 없으면 소비자가 없으므로 나머지는 버림
+                    self.stats.samples_dropped += len(samples)
+                    return
+                await asyncio.sleep(wait)
+
+    async def drain(self, poll_interval: float = 0.02):
+        # 버퍼에 남은 오디오가 모두 재생될 때까지 대기함
+        while len(self.buffer) and self._stream is not None:
+            await asyncio.sleep(poll_interval)
+
+    def _callback(self, outdata, frames, time_info, status):
+        # PortAudio 오디오 스레드에서 호출됨: 할당/블로킹 없이 처리해야 함
+        out = outdata.reshape(-1)
+        if not self._playing:
+            buffered = len(self.buffer)
+            if buffered >= self.preroll or (not self._turn_open and buffered):
+                self._playing = True
+            else:
+                out.fill(0)
+                return
+
+        count = self.buffer.read_into(out)
+        self.stats.samples_played += count
+        if count < len(out):
+            out[count:] = 0
+            if self._turn_open:
+                # 응답 도중 데이터가 모자람: underrun 후 다시 pre-roll 대기
+                self.stats.underruns += 1
+            self._playing = False
+
+    @property
+    def in_turn(self) -> bool:
+        return self._turn_open
+
+    def close(self):
+        # 스트림 콜백이 이 객체를 참조하므로 GC로는 닫히지 않음: 세션이 끝나면 반드시 호출해야 함
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+        self._playing = False
+        self._turn_open = False
+        self.buffer.clear()
+
+
+class AudioPlayerPool:
+    """
+    세션 키별 AudioPlayer를 보관하고 끝난 세션의 스트림을 닫는 풀.
+    - 일정 시간 사용되지 않은 재생기는 acquire() 시 닫고 제거함 (재생 중인 턴은 제외)
+    - release()/close_inactive()로 종료된 세션의 재생기를 바로 닫음
+    """
+
+    def __init__(self, idle_ttl: float = DEFAULT_IDLE_TTL_SECONDS, **player_kwargs):
+        self.idle_ttl = idle_ttl
+        self.player_kwargs = player_kwargs
+        self._players: dict[str, tuple[AudioPlayer, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, session_key: str) -> AudioPlayer:
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key
+                for key, (player, last_used) in self._players.items()
+                if now - last_used > self.idle_ttl and not player.in_turn
+            ]
+            closed = [self._players.pop(key)[0] for key in expired]
+            player = self._players.get(session_key, (None, now))[0] or AudioPlayer(**self.player_kwargs)
+            self._players[session_key] = (player, now)
+        for expired_player in closed:
+            expired_player.close()
+        return player
+
+    def release(self, session_key: str):
+        with self._lock:
+            entry = self._players.pop(session_key, None)
+        if entry is not None:
+            entry[0].close()
+
+    def close_inactive(self, is_active):
+        # is_active(session_key)가 False인 세션(예: 브라우저 탭이 닫힌 Streamlit 세션)의 재생기를 닫음
+        with self._lock:
+            keys = [key for key in self._players if not is_active(key)]
+        for key in keys:
+            self.release(key)
+
+    def close(self):
+        with self._lock:
+            players = [player for player, _ in self._players.values()]
+            self._players.clear()
+        for player in players:
+            player.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._players)
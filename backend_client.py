@@ -0,0 +1,173 @@
+"""
+주문/결제/계정(identity) 백엔드를 호출하는 공유 비동기 HTTP 클라이언트.
+
+- 프로세스 전체가 keep-alive 커넥션 풀을 공유함 (이벤트 루프마다 하나의 httpx.AsyncClient)
+- 백엔드별 타임아웃/재시도 횟수를 따로 지정함
+- 연결 실패, 타임아웃, 429/5xx 응답은 지수 백오프(+지터)로 재시도함
+  (POST는 같은 Idempotency-Key로 재시도하므로 백엔드가 중복 처리하지 않음)
+
+백엔드 주소는 SUPPORT_BACKEND_URL 환경 변수로 지정함 (로컬 대체 서버: python mock_backend.py)
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+import uuid
+import weakref
+from dataclasses import dataclass, field
+
+import httpx
+
+
+# 이 환경 변수가 설정되면 도구가 로컬 저장소 대신 HTTP 백엔드를 비동기로 호출함
+BACKEND_URL_ENV_VAR = "SUPPORT_BACKEND_URL"
+DEFAULT_BACKEND_URL = "http://127.0.0.1:8790"
+
+# 커넥션 풀 크기 (모든 백엔드 합계 / 유지할 keep-alive 커넥션)
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 30.0
+# 재시도할 HTTP 상태 코드
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+
+@dataclass
+class BackendSettings:
+    # 백엔드 하나의 주소/경로 접두사와 호출 정책
+    prefix: str
+    timeout: float
+    retries: int = 2
+    backoff: float = 0.1
+    connect_timeout: float = 1.0
+
+
+# 조회가 대부분인 주문 백엔드는 짧게, 결제 처리는 여유 있게 기다림
+DEFAULT_BACKENDS = {
+    "orders": BackendSettings(prefix="/orders", timeout=2.0),
+    "billing": BackendSettings(prefix="/billing", timeout=4.0),
+    "identity": BackendSettings(prefix="/identity", timeout=2.0, retries=1),
+}
+
+
+class BackendError(Exception):
+    # 재시도 후에도 실패한 백엔드 호출 (도구에서는 기본 오류 메시지로 모델에 전달됨)
+
+    def __init__(self, backend: str, message: str, status_code: int | None = None):
+        super().__init__(f"{backend} 백엔드 호출 실패: {message}")
+        self.backend = backend
+        self.status_code = status_code
+
+
+@dataclass
+class BackendStats:
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    # 백엔드별 성공 호출 지연 시간 합계(초)와 횟수
+    latency: dict[str, list[float]] = field(default_factory=dict)
+
+    def record(self, backend: str, seconds: float):
+        total, count = self.latency.get(backend, [0.0, 0])
+        self.latency[backend] = [total + seconds, count + 1]
+
+    def mean_ms(self, backend: str) -> float:
+        total, count = self.latency.get(backend, [0.0, 0])
+        return total / count * 1000 if count else 0.0
+
+
+class BackendClient:
+    """
+    백엔드 호출 진입점. httpx.AsyncClient는 만들어진 이벤트 루프에 묶이므로
+    (Streamlit은 턴마다 asyncio.run을 사용함) 루프별로 클라이언트를 하나씩 두고 재사용함.
+    """
+
+    def __init__(self, base_url: str | None = None, backends: dict[str, BackendSettings] | None = None):
+        self.base_url = (base_url or os.environ.get(BACKEND_URL_ENV_VAR) or DEFAULT_BACKEND_URL).rstrip("/")
+        self.backends = backends or DEFAULT_BACKENDS
+        self.stats = BackendStats()
+        self._clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY,
+                    ),
+                )
+                self._clients[loop] = client
+            return client
+
+    async def request(self, backend: str, method: str, path: str, params=None, json=None):
+        """
+        백엔드를 호출하고 응답 JSON을 반환함 (404는 None).
+        재시도 후에도 실패하면 BackendError를 발생시킴.
+        """
+        settings = self.backends[backend]
+        timeout = httpx.Timeout(settings.timeout, connect=settings.connect_timeout)
+        headers = {"Idempotency-Key": uuid.uuid4().hex} if method != "GET" else None
+        client = self._client()
+
+        for attempt in range(settings.retries + 1):
+            if attempt:
+                self.stats.retries += 1
+                # 지수 백오프 + 지터 (동시에 실패한 요청이 한꺼번에 재시도하지 않도록)
+                await asyncio.sleep(settings.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            self.stats.requests += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(
+                    method, settings.prefix + path, params=params, json=json, headers=headers, timeout=timeout
+                )
+            except httpx.TransportError as e:
+                error = BackendError(backend, f"{type(e).__name__}: {e}")
+                continue
+            if response.status_code in RETRY_STATUS_CODES:
+                error = BackendError(backend, f"HTTP {response.status_code}", response.status_code)
+                continue
+
+            self.stats.record(backend, time.perf_counter() - start)
+            if response.status_code == 404:
+                return None
+            if response.is_error:
+                self.stats.failures += 1
+                raise BackendError(backend, f"HTTP {response.status_code}: {response.text}", response.status_code)
+            return response.json()
+
+        self.stats.failures += 1
+        raise error
+
+    async def aclose(self):
+        # 현재 루프의 클라이언트를 닫음
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+
+_client: BackendClient | None = None
+
+
+def is_backend_enabled() -> bool:
+    return bool(os.environ.get(BACKEND_URL_ENV_VAR))
+
+
+def get_backend_client() -> BackendClient:
+    global _client
+    if _client is None:
+        _client = BackendClient()
+    return _client
+
+
+def configure_backend_client(client: BackendClient):
+    # 벤치마크 등에서 주소/타임아웃 정책이 다른 클라이언트로 교체할 때 사용함
+    global _client
+    _client = client
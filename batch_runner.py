@@ -0,0 +1,307 @@
+"""
+텍스트 발화 코퍼스(JSONL)를 Agent 그래프에 동시에 흘려보내는 배치 실행기.
+라우팅 회귀 테스트와 용량 계획(처리량/지연 시간 측정)에 사용함.
+도구는 실제로 실행되므로 기본적으로 도메인 저장소의 임시 복사본을 사용함 (--domain-db로 지정 가능).
+
+코퍼스 한 줄 형식 (transcript는 text 대신 사용 가능 → benchmarks/fixtures/voice_turns.jsonl 그대로 사용 가능):
+    {"id": "...", "text": "...", "context": {"customer_id": 1, "name": "...", "tier": "basic"},
+     "expected_agent": "Billing Support Agent"}
+
+실행:
+    python batch_runner.py corpus.jsonl --output results.jsonl --concurrency 16 --rate 5
+    python batch_runner.py benchmarks/fixtures/voice_turns.jsonl --offline --latency instant
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+
+import numpy as np
+from agents import OutputGuardrailTripwireTriggered, RunConfig, RunContextWrapper, Runner
+
+import providers
+from domain_store import DomainStore, configure_domain_store, get_domain_store
+from models import UserAccountContext
+from my_agents.triage_agent import fast_router, off_topic_guardrail, triage_agent
+from offline_provider import LatencyProfile, OfflineModelProvider
+from turn_tracing import start_turn
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_OUTPUT = "batch-results.jsonl"
+# 코퍼스 항목에 context가 없을 때 사용하는 고객 정보
+DEFAULT_CONTEXT = {"customer_id": 0, "name": "batch", "tier": "basic"}
+# 결과 파일에 남기는 응답 텍스트 최대 길이
+MAX_OUTPUT_CHARS = 300
+
+
+@dataclass
+class BatchResult:
+    id: str
+    text: str
+    expected_agent: str | None
+    routed_agent: str | None
+    # ok | blocked | error
+    status: str
+    fast_path: bool
+    latency_ms: float
+    output: str = ""
+    error: str | None = None
+    # 도구 호출 수, 호출별 실행 시간 합계, 도구가 하나라도 실행 중이던 시간
+    # (한 응답의 조회가 동시에 실행되면 tool_wall_ms가 tool_ms보다 짧아짐)
+    tool_calls: int = 0
+    tool_ms: float = 0.0
+    tool_wall_ms: float = 0.0
+
+    @property
+    def correct(self) -> bool:
+        return self.expected_agent is not None and self.routed_agent == self.expected_agent
+
+
+class RateLimiter:
+    # 초당 시작 횟수를 제한함 (요청 시작 시각을 1/rate 간격으로 배정)
+
+    def __init__(self, rate: float | None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        await asyncio.sleep(start - now)
+
+
+def load_corpus(path: str) -> list[dict]:
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            item.setdefault("id", str(index))
+            item["text"] = item.get("text") or item["transcript"]
+            items.append(item)
+    return items
+
+
+class BatchRunner:
+    """
+    코퍼스 항목을 semaphore(동시 실행 수)와 rate limiter(초당 시작 수) 아래에서 실행함.
+    각 항목은 음성 워크플로우와 같은 경로(로컬 라우터 → triage/전문 Agent, 입력 가드레일 병렬 검사)를
+    텍스트로 실행하며, 결과는 끝나는 순서대로 출력 파일에 한 줄씩 기록함.
+    """
+
+    def __init__(
+        self,
+        entry_agent,
+        router=None,
+        input_guardrails=None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: float | None = None,
+    ):
+        self.entry_agent = entry_agent
+        self.router = router
+        self.input_guardrails = input_guardrails or []
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rate_limiter = RateLimiter(rate)
+
+    async def run_item(self, item: dict) -> BatchResult:
+        context = UserAccountContext(**(item.get("context") or DEFAULT_CONTEXT))
+        text = item["text"]
+        async with self.semaphore:
+            await self.rate_limiter.wait()
+            # 항목마다 턴을 시작해 도구 호출 span을 모음 (항목은 각자 태스크에서 실행되므로 섞이지 않음)
+            turn = start_turn(str(item["id"]))
+            start = time.perf_counter()
+            agent = self.entry_agent
+            fast_path = False
+            try:
+                if self.router is not None:
+                    routed = self.router.agent_for(await self.router.route(text))
+                    if routed is not None:
+                        agent, fast_path = routed, True
+
+                run = await self._run_guarded(agent, text, context)
+                if run is None:
+                    # 차단된 발화는 진입 Agent에 머문 것으로 봄 (워크플로우는 응답을 내보내지 않음)
+                    status, routed_agent, output = "blocked", self.entry_agent.name, ""
+                else:
+                    status, routed_agent = "ok", run.last_agent.name
+                    output = str(run.final_output)[:MAX_OUTPUT_CHARS]
+                error = None
+            except OutputGuardrailTripwireTriggered as e:
+                # 라우팅은 끝났지만 응답이 출력 가드레일에 걸린 경우
+                status, routed_agent, output, error = "blocked", e.guardrail_result.agent.name, "", None
+            except Exception as e:
+                status, routed_agent, output, error = "error", None, "", f"{type(e).__name__}: {e}"
+            latency_ms = (time.perf_counter() - start) * 1000
+            tool_spans = [span for span in turn.finished_spans() if span.stage == "tool"]
+
+        return BatchResult(
+            id=item["id"],
+            text=text,
+            expected_agent=item.get("expected_agent"),
+            routed_agent=routed_agent,
+            status=status,
+            fast_path=fast_path,
+            latency_ms=round(latency_ms, 3),
+            output=output,
+            error=error,
+            tool_calls=len(tool_spans),
+            tool_ms=round(sum(span.duration_ms for span in tool_spans), 3),
+            tool_wall_ms=round(_covered_ms(tool_spans), 3),
+        )
+
+    async def _run_guarded(self, agent, text: str, context: UserAccountContext):
+        # 입력 가드레일을 Agent 실행과 병렬로 실행하고, tripwire가 발동하면 실행을 취소하고 None을 반환함
+        # (음성 워크플로우와 같이 차단된 발화의 도구 호출이 끝까지 실행되지 않도록 함)
+        wrapper = RunContextWrapper(context=context)
+        run = asyncio.create_task(Runner.run(agent, text, context=context, run_config=providers.get_run_config()))
+        checks = [asyncio.create_task(guardrail.run(agent, text, wrapper)) for guardrail in self.input_guardrails]
+        try:
+            for done in asyncio.as_completed(checks):
+                if (await done).output.tripwire_triggered:
+                    return None
+            return await run
+        finally:
+            for task in (run, *checks):
+                task.cancel()
+            # 취소된 태스크의 예외를 회수함 ("Task exception was never retrieved" 방지)
+            await asyncio.gather(run, *checks, return_exceptions=True)
+
+    async def run(self, items: list[dict], output_path: str, progress=None) -> list[BatchResult]:
+        results = []
+        with open(output_path, "w", encoding="utf-8") as f:
+            for done in asyncio.as_completed([self.run_item(item) for item in items]):
+                result = await done
+                results.append(result)
+                f.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+                f.flush()
+                if progress is not None:
+                    progress(len(results), len(items), result)
+        return results
+
+
+def _covered_ms(spans) -> float:
+    # 겹치는 구간을 합친 전체 길이
+    covered, end = 0.0, float("-inf")
+    for span in sorted(spans, key=lambda s: s.start_ms):
+        if span.end_ms > end:
+            covered += span.end_ms - max(span.start_ms, end)
+            end = span.end_ms
+    return covered
+
+
+def summarize(results: list[BatchResult], elapsed: float) -> dict:
+    latencies = np.array([r.latency_ms for r in results], dtype=float)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+
+    per_agent = defaultdict(lambda: {"total": 0, "correct": 0, "routed": 0})
+    for result in results:
+        if result.expected_agent is not None:
+            per_agent[result.expected_agent]["total"] += 1
+            per_agent[result.expected_agent]["correct"] += result.correct
+        if result.routed_agent is not None:
+            per_agent[result.routed_agent]["routed"] += 1
+    labeled = [r for r in results if r.expected_agent is not None]
+    multi_tool = [r for r in results if r.tool_calls > 1 and r.tool_wall_ms > 0]
+
+    return {
+        "items": len(results),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(results) / elapsed, 3) if elapsed else None,
+        "latency_ms": {"p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3)},
+        "status": {s: sum(r.status == s for r in results) for s in ("ok", "blocked", "error")},
+        "fast_path_rate": round(sum(r.fast_path for r in results) / len(results), 3) if results else 0,
+        "routing_accuracy": round(sum(r.correct for r in labeled) / len(labeled), 3) if labeled else None,
+        # 도구를 여러 번 호출한 항목에서 병렬 실행으로 줄어든 도구 시간 (합계 / 실제 경과)
+        "tools": {
+            "calls": sum(r.tool_calls for r in results),
+            "multi_tool_items": len(multi_tool),
+            "parallel_speedup": (
+                round(sum(r.tool_ms for r in multi_tool) / sum(r.tool_wall_ms for r in multi_tool), 3)
+                if multi_tool
+                else None
+            ),
+        },
+        # recall: 해당 Agent로 가야 할 발화 중 맞게 라우팅된 비율 / precision: 해당 Agent로 간 발화 중 맞은 비율
+        "per_agent": {
+            name: {
+                "total": stats["total"],
+                "recall": round(stats["correct"] / stats["total"], 3) if stats["total"] else None,
+                "precision": round(stats["correct"] / stats["routed"], 3) if stats["routed"] else None,
+            }
+            for name, stats in sorted(per_agent.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="항목별 결과 JSONL (끝나는 순서대로 기록)")
+    parser.add_argument("--report", help="요약 리포트 JSON 파일 경로 (생략 시 표준 출력)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=None, help="초당 시작하는 최대 항목 수")
+    parser.add_argument("--limit", type=int, default=None, help="코퍼스 앞에서부터 N개만 실행")
+    parser.add_argument("--offline", action="store_true", help="오프라인 대체 모델로 실행 (네트워크 호출 없음)")
+    parser.add_argument("--latency", choices=["default", "instant"], default="default", help="오프라인 모델 지연 프로필")
+    parser.add_argument("--no-fast-path", action="store_true", help="로컬 라우터 없이 항상 triage부터 실행")
+    parser.add_argument("--no-guardrails", action="store_true", help="입력 가드레일 검사를 생략")
+    parser.add_argument(
+        "--domain-db",
+        default=None,
+        help="도구가 사용할 도메인 저장소 파일 (배치 중 변경됨, 생략 시 기본 저장소의 임시 복사본)",
+    )
+    args = parser.parse_args()
+
+    # 도구의 쓰기(환불, 티켓, 주문 변경 등)가 실제 도메인 저장소에 남지 않도록 분리된 저장소를 사용함
+    sandbox = None
+    if args.domain_db:
+        configure_domain_store(DomainStore(args.domain_db))
+    else:
+        sandbox = tempfile.TemporaryDirectory(prefix="batch-domain-")
+        configure_domain_store(get_domain_store().snapshot(os.path.join(sandbox.name, "domain.db")))
+
+    if args.offline:
+        os.environ[providers.OFFLINE_ENV_VAR] = "1"
+        latency = LatencyProfile.instant() if args.latency == "instant" else LatencyProfile()
+        providers.configure(RunConfig(model_provider=OfflineModelProvider(latency), tracing_disabled=True))
+
+    items = load_corpus(args.corpus)[: args.limit]
+    runner = BatchRunner(
+        triage_agent,
+        router=None if args.no_fast_path else fast_router,
+        input_guardrails=[] if args.no_guardrails else [off_topic_guardrail],
+        concurrency=args.concurrency,
+        rate=args.rate,
+    )
+
+    def progress(done, total, result):
+        mark = "✓" if result.correct else ("·" if result.expected_agent is None else "✗")
+        print(f"[{done}/{total}] {mark} {result.id} → {result.routed_agent} ({result.latency_ms:.0f}ms)", flush=True)
+
+    start = time.perf_counter()
+    results = asyncio.run(runner.run(items, args.output, progress))
+    report = summarize(results, time.perf_counter() - start)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+    if sandbox is not None:
+        sandbox.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+벤치마크용 WAV 픽스처 생성기.
+
+fixtures/voice_turns.jsonl의 각 항목에 대해 발화와 비슷한 합성 음성(음절 단위
+배음 버스트 + 앞뒤 무음 + 배경 잡음)을 지정된 샘플링 레이트/채널 수로 생성함.
+실제 녹음 파일을 같은 이름으로 넣어두면 그 파일이 대신 사용됨.
+
+실행: python benchmarks/make_fixtures.py [--force]
+"""
+import argparse
+import json
+import os
+import wave
+
+import numpy as np
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MANIFEST = os.path.join(FIXTURE_DIR, "voice_turns.jsonl")
+
+# 한국어 발화 속도 근사치 (초당 음절 수)
+SYLLABLES_PER_SECOND = 6
+
+
+def load_manifest(path=MANIFEST):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthesize_speech(transcript: str, sample_rate: int, seed: int) -> np.ndarray:
+    # 음절마다 피치가 조금씩 다른 배음 버스트를 이어 붙여 발화처럼 만듦
+    rng = np.random.default_rng(seed)
+    syllables = max(1, len(transcript.replace(" ", "")))
+    syllable_length = sample_rate // SYLLABLES_PER_SECOND
+    t = np.arange(syllable_length) / sample_rate
+    envelope = np.sin(np.pi * np.arange(syllable_length) / syllable_length) ** 2
+
+    bursts = []
+    for _ in range(syllables):
+        pitch = rng.uniform(110, 220)
+        burst = sum(
+            np.sin(2 * np.pi * pitch * harmonic * t) / harmonic for harmonic in range(1, 5)
+        )
+        bursts.append(burst * envelope * rng.uniform(0.5, 1.0))
+    speech = np.concatenate(bursts) * 9000
+
+    lead = np.zeros(int(sample_rate * rng.uniform(0.4, 0.9)))
+    tail = np.zeros(int(sample_rate * rng.uniform(0.6, 1.2)))
+    signal = np.concatenate([lead, speech, tail])
+    signal += rng.normal(0, 40, len(signal))
+    return np.clip(signal, -32768, 32767).astype(np.int16)
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int, channels: int):
+    frames = np.repeat(samples[:, None], channels, axis=1)
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(frames.tobytes())
+
+
+def ensure_fixtures(force: bool = False) -> list[dict]:
+    # 매니페스트를 읽고 없는 WAV 파일을 생성한 뒤 항목 목록을 반환함
+    fixtures = load_manifest()
+    for index, fixture in enumerate(fixtures):
+        path = os.path.join(FIXTURE_DIR, fixture["file"])
+        fixture["path"] = path
+        if force or not os.path.exists(path):
+            samples = synthesize_speech(fixture["transcript"], fixture["sample_rate"], seed=index)
+            write_wav(path, samples, fixture["sample_rate"], fixture["channels"])
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true", help="기존 WAV 파일도 다시 생성")
+    args = parser.parse_args()
+    for fixture in ensure_fixtures(force=args.force):
+        print(f"{fixture['id']:>26}: {fixture['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+턴마다 VoicePipeline을 새로 만드는 방식과 VoicePipelinePool을 재사용하는 방식을 비교하는 벤치마크.
+
+1) 턴당 준비 비용 (네트워크 호출 없음)
+   - workflow: 서비스 구성(가드레일, 빠른 라우터)의 CustomWorkflow 생성
+   - per_turn: 워크플로우 + VoicePipeline 생성 + STT/TTS 모델 및 클라이언트 생성
+   - pooled: 풀에서 세션의 파이프라인을 꺼내 컨텍스트만 교체
+2) 첫 턴 지연 시간 (오프라인 대체 모델로 실제 턴 실행)
+   - new: 턴마다 build_pipeline_pool()로 새 풀/파이프라인을 만들어 실행
+   - pooled: 미리 만들어 둔 풀의 파이프라인을 재사용해 실행
+   턴 시작 → 첫 오디오 바이트(time_to_first_audio), 오디오 스트림 종료(total_turn)를 측정함
+
+실행: python benchmarks/pipeline_setup.py --turns 200 --latency-turns 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 클라이언트 생성에는 키 값만 필요하므로 더미 키로 대체함
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from agents import RunConfig, SQLiteSession
+from agents.voice import AudioInput, VoicePipeline
+
+import providers
+from audio_ingest import STT_SAMPLE_RATE, convert_audio
+from conversation_state import ConversationState
+from make_fixtures import ensure_fixtures
+from models import UserAccountContext
+from my_agents.triage_agent import triage_agent
+from offline_provider import LatencyProfile, OfflineModelProvider, OfflineVoiceModelProvider
+from service import build_pipeline_pool
+from turn_tracing import TurnTracingHooks
+from voice_activity import trim_silence
+
+# 첫 턴 지연 측정에 사용하는 픽스처 (가드레일에 막히지 않는 발화)
+LATENCY_FIXTURE = "billing-refund"
+
+
+def create_workflow(pool, context):
+    # VoicePipelinePool._create()와 같은 구성으로 워크플로우만 만듦
+    return pool.workflow_class(
+        context=context,
+        hooks=TurnTracingHooks(),
+        input_guardrails=pool.input_guardrails,
+        guardrail_grace_seconds=pool.guardrail_grace_seconds,
+        sentence_guardrails=pool.sentence_guardrails,
+        router=pool.router,
+    )
+
+
+def setup_per_turn(pool, context):
+    # 기존 main.run_agent 방식: 매 턴 워크플로우/파이프라인 생성
+    pipeline = VoicePipeline(workflow=create_workflow(pool, context))
+    # pipeline.run()이 내부에서 수행하는 모델 해석까지 포함
+    pipeline._get_stt_model()
+    pipeline._get_tts_model()
+    return pipeline
+
+
+def setup_pooled(pool, context):
+    pipeline = pool.acquire("benchmark-session", context)
+    pipeline._get_stt_model()
+    pipeline._get_tts_model()
+    return pipeline
+
+
+def stats(samples, unit):
+    samples = sorted(samples)
+    return {
+        f"mean_{unit}": statistics.fmean(samples),
+        f"p50_{unit}": samples[len(samples) // 2],
+        f"p95_{unit}": samples[max(int(len(samples) * 0.95) - 1, 0)],
+    }
+
+
+def measure(fn, turns):
+    samples = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return stats(samples, "us")
+
+
+async def run_turn(make_pool, session_key, stt_model, fixture, context):
+    # 새 대화로 픽스처 한 턴을 실행하고 (첫 오디오까지, 턴 전체) 시간(ms)을 반환함
+    state = ConversationState(
+        conversation_id=session_key,
+        context=context,
+        agent=triage_agent,
+        session=SQLiteSession(session_key, ":memory:"),
+    )
+    with open(fixture["path"], "rb") as f:
+        wav = f.read()
+
+    start = time.perf_counter()
+    vad = trim_silence(convert_audio(wav), STT_SAMPLE_RATE)
+    stt_model.register(vad.audio, fixture["transcript"])
+    pipeline = make_pool().acquire(session_key, context, state)
+    first_audio_at = None
+    result = await pipeline.run(AudioInput(buffer=vad.audio, frame_rate=STT_SAMPLE_RATE))
+    async for event in result.stream():
+        if event.type == "voice_stream_event_audio" and first_audio_at is None:
+            first_audio_at = time.perf_counter()
+    end = time.perf_counter()
+    return (first_audio_at - start) * 1000, (end - start) * 1000
+
+
+async def measure_first_turn(turns, latency, context):
+    os.environ[providers.OFFLINE_ENV_VAR] = "1"
+    voice_provider = OfflineVoiceModelProvider(latency)
+    providers.configure(
+        run_config=RunConfig(model_provider=OfflineModelProvider(latency), tracing_disabled=True),
+        voice_model_provider=voice_provider,
+    )
+    fixtures = ensure_fixtures()
+    fixture = next((f for f in fixtures if f["id"] == LATENCY_FIXTURE), fixtures[0])
+
+    def new_pool():
+        return build_pipeline_pool(model_provider=voice_provider)
+
+    shared = new_pool()
+    # 풀 항목과 모델을 미리 만들어 둠 (재사용 경로만 측정)
+    await run_turn(lambda: shared, "pooled", voice_provider.stt_model, fixture, context)
+
+    results = {}
+    for name, make_pool in (("new", new_pool), ("pooled", lambda: shared)):
+        first_audio, total = [], []
+        for index in range(turns):
+            session_key = f"new-{index}" if name == "new" else "pooled"
+            ttfa, turn_ms = await run_turn(make_pool, session_key, voice_provider.stt_model, fixture, context)
+            first_audio.append(ttfa)
+            total.append(turn_ms)
+        results[name] = {
+            "time_to_first_audio": stats(first_audio, "ms"),
+            "total_turn": stats(total, "ms"),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200, help="준비 비용 측정 반복 수")
+    parser.add_argument("--latency-turns", type=int, default=20, help="첫 턴 지연 측정 반복 수 (0이면 생략)")
+    parser.add_argument(
+        "--latency",
+        choices=["default", "instant"],
+        default="instant",
+        help="오프라인 모델 지연 프로필 (instant: 코드 경로 자체의 비용만 측정)",
+    )
+    args = parser.parse_args()
+
+    context = UserAccountContext(customer_id=1, name="bench", tier="basic", email="bench@example.com")
+    pool = build_pipeline_pool()
+
+    setup = {
+        "workflow": measure(lambda: create_workflow(pool, context), args.turns),
+        "per_turn": measure(lambda: setup_per_turn(pool, context), args.turns),
+        "pooled": measure(lambda: setup_pooled(pool, context), args.turns),
+    }
+    print("setup cost per turn")
+    for name, result in setup.items():
+        print(
+            f"{name:>9}: mean {result['mean_us']:8.1f}us  "
+            f"p50 {result['p50_us']:8.1f}us  p95 {result['p95_us']:8.1f}us"
+        )
+    print(f"speedup: {setup['per_turn']['mean_us'] / setup['pooled']['mean_us']:.1f}x")
+
+    if args.latency_turns <= 0:
+        return
+    latency = LatencyProfile.instant() if args.latency == "instant" else LatencyProfile()
+    first_turn = asyncio.run(measure_first_turn(args.latency_turns, latency, context))
+    print(f"\nfirst-turn latency ({args.latency} offline models, {args.latency_turns} turns)")
+    for name, result in first_turn.items():
+        ttfa, total = result["time_to_first_audio"], result["total_turn"]
+        print(
+            f"{name:>9}: first audio p50 {ttfa['p50_ms']:7.2f}ms p95 {ttfa['p95_ms']:7.2f}ms  "
+            f"total p50 {total['p50_ms']:7.2f}ms p95 {total['p95_ms']:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+shard 수에 따른 대화 기록 동시 추가(append) 처리량 벤치마크.
+
+여러 고객의 대화가 동시에 턴마다 항목을 추가하는 상황을 흉내 내어
+shard 수별 초당 추가 항목 수와 add_items 지연 시간(p50/p95/p99)을 보고함.
+
+한 프로세스 안에서는 shard별 writer 스레드가 쓰기를 모아 커밋하므로 shard 수를 늘려도
+처리량이 거의 같음. shard의 효과는 여러 워커 프로세스(service.py --workers N)가 같은
+디렉터리에 쓸 때 나타나므로 --processes로 프로세스 수를 지정해 비교함
+(shard가 하나면 모든 프로세스가 같은 파일의 쓰기 락을 두고 경쟁함).
+락 대기는 먼저 p95/p99 지연에 드러나고, 처리량 차이는 프로세스 수만큼 CPU 코어가 있어야 나타남.
+
+실행: python benchmarks/session_shards.py --shards 1 2 4 8 --conversations 200 --turns 20 --processes 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_sharding import ShardedSessionStore, shard_paths
+
+
+def make_turn(customer_id: int, turn: int) -> list[dict]:
+    # 음성 턴 하나가 남기는 항목 (사용자 발화 + 도구 호출/결과 + 응답)
+    return [
+        {"role": "user", "content": f"고객 {customer_id}의 {turn}번째 문의입니다. 주문 상태를 확인해 주세요."},
+        {"type": "function_call", "call_id": f"call-{customer_id}-{turn}", "name": "lookup_order", "arguments": "{}"},
+        {"type": "function_call_output", "call_id": f"call-{customer_id}-{turn}", "output": "배송 중"},
+        {"role": "assistant", "content": "주문하신 상품은 현재 배송 중이며 내일 도착 예정입니다."},
+    ]
+
+
+async def run_conversation(sharded: ShardedSessionStore, customer_id: int, turns: int, latencies: list[float]):
+    session = sharded.session(customer_id, "benchmark")
+    for turn in range(turns):
+        items = make_turn(customer_id, turn)
+        start = time.perf_counter()
+        await session.add_items(items)
+        latencies.append(time.perf_counter() - start)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_conversations(
+    directory: str, shard_count: int, customer_ids, turns: int
+) -> tuple[float, float, list[float]]:
+    # (시작 시각, 종료 시각, add_items 지연 시간 목록)
+    sharded = ShardedSessionStore(shard_paths(directory, shard_count))
+    latencies: list[float] = []
+    try:
+        start = time.time()
+        await asyncio.gather(
+            *(run_conversation(sharded, customer_id, turns, latencies) for customer_id in customer_ids)
+        )
+        end = time.time()
+    finally:
+        sharded.close()
+    return start, end, latencies
+
+
+def _worker(directory: str, shard_count: int, customer_ids, turns: int, barrier, results):
+    # 모든 프로세스가 준비된 뒤 동시에 시작함 (import/커넥션 준비 시간은 제외)
+    barrier.wait()
+    results.put(asyncio.run(run_conversations(directory, shard_count, customer_ids, turns)))
+
+
+def bench(shard_count: int, conversations: int, turns: int, directory: str, processes: int = 1) -> dict:
+    # 스키마는 미리 만들어 둠 (여러 프로세스가 동시에 만들지 않도록)
+    ShardedSessionStore(shard_paths(directory, shard_count)).close()
+    slices = [range(index, conversations, processes) for index in range(processes)]
+    if processes == 1:
+        runs = [asyncio.run(run_conversations(directory, shard_count, slices[0], turns))]
+    else:
+        barrier = multiprocessing.Barrier(processes)
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=_worker, args=(directory, shard_count, ids, turns, barrier, results))
+            for ids in slices
+        ]
+        for worker in workers:
+            worker.start()
+        runs = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    elapsed = max(end for _, end, _ in runs) - min(start for start, _, _ in runs)
+    latencies = [latency for _, _, run_latencies in runs for latency in run_latencies]
+    items = conversations * turns * len(make_turn(0, 0))
+    return {
+        "shards": shard_count,
+        "items_per_second": items / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--processes", type=int, default=1, help="같은 shard 디렉터리에 쓰는 프로세스 수")
+    args = parser.parse_args()
+
+    print(f"{'shards':>6} {'items/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for shard_count in args.shards:
+        directory = tempfile.mkdtemp(prefix="session-shards-")
+        try:
+            result = bench(shard_count, args.conversations, args.turns, directory, args.processes)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(
+            f"{result['shards']:>6} {result['items_per_second']:>10.0f} "
+            f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+동시 도구 호출 중 이벤트 루프 응답성 부하 테스트.
+
+로컬 대체 백엔드(mock_backend)를 띄우고 주문/청구 조회 도구를 동시에 호출하면서,
+이벤트 루프가 얼마나 늦게 깨어나는지(loop lag)를 5ms 간격 heartbeat로 측정함.
+- async: async_tools의 비동기 도구 (공유 keep-alive 커넥션 풀 + 재시도)
+- blocking: 같은 요청을 동기 HTTP 클라이언트로 이벤트 루프 안에서 호출 (동기 도구가 실제 서비스를 부르는 경우)
+
+실행: python benchmarks/tool_backend_load.py --calls 400 --concurrency 32 --latency-ms 40 --failure-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from agents.tool_context import ToolContext
+
+import async_tools
+from backend_client import BackendClient, configure_backend_client, get_backend_client
+from domain_store import DomainStore, configure_domain_store, get_domain_store
+from mock_backend import FaultProfile, MockBackend, serve_in_background
+from models import UserAccountContext
+from tool_cache import TOOL_ERROR_PREFIX, ToolCache, configure_tool_cache
+from tools import billing_history_message, order_status_message
+
+HEARTBEAT_INTERVAL = 0.005
+
+
+def build_calls(store: DomainStore, calls: int, seed: int):
+    # (도구 이름, 고객 ID, 인자) 목록: 주문 조회와 청구 내역 조회를 반반 섞음
+    rng = random.Random(seed)
+    conn = store._conn()
+    customers = store.counts()["customers"]
+    plan = []
+    for _ in range(calls):
+        customer_id = rng.randint(1, customers)
+        if rng.random() < 0.5:
+            order_number = conn.execute(
+                "SELECT order_number FROM orders WHERE customer_id = ? LIMIT 1", (customer_id,)
+            ).fetchone()[0]
+            plan.append(("lookup_order_status", customer_id, {"order_number": order_number}))
+        else:
+            plan.append(("lookup_billing_history", customer_id, {"months_back": 6}))
+    return plan
+
+
+def context_for(customer_id: int) -> UserAccountContext:
+    return UserAccountContext(customer_id=customer_id, name=f"customer{customer_id}", email="bench@example.com")
+
+
+async def call_async(name: str, customer_id: int, arguments: dict):
+    tool = async_tools.ASYNC_TOOLS[name]
+    input_json = json.dumps(arguments)
+    tool_context = ToolContext(
+        context=context_for(customer_id), tool_name=name, tool_call_id="load", tool_arguments=input_json
+    )
+    return await tool.on_invoke_tool(tool_context, input_json)
+
+
+def call_blocking(http: httpx.Client, name: str, customer_id: int, arguments: dict):
+    # 동기 도구가 서비스를 직접 호출하는 경우 (응답을 기다리는 동안 이벤트 루프 전체가 멈춤)
+    context = context_for(customer_id)
+    if name == "lookup_order_status":
+        response = http.get(f"/orders/{customer_id}/orders/{arguments['order_number']}")
+        if response.status_code >= 500:
+            response.raise_for_status()
+        order = response.json() if response.status_code == 200 else None
+        return order_status_message(order, arguments["order_number"], context)
+    response = http.get(f"/billing/{customer_id}/invoices", params=arguments)
+    response.raise_for_status()
+    return billing_history_message(response.json(), arguments["months_back"])
+
+
+async def heartbeat(lags: list[float], stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT_INTERVAL
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run_mode(mode: str, plan, concurrency: int, url: str) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags, errors = [], [], 0
+    http = httpx.Client(base_url=url, timeout=10.0) if mode == "blocking" else None
+
+    async def one(name, customer_id, arguments):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if mode == "async":
+                    result = await call_async(name, customer_id, arguments)
+                else:
+                    result = call_blocking(http, name, customer_id, arguments)
+                errors += result.startswith(TOOL_ERROR_PREFIX)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(*call) for call in plan))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    if http is not None:
+        http.close()
+    else:
+        await get_backend_client().aclose()
+
+    def pct(values, p):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000 if ordered else 0.0
+
+    return {
+        "mode": mode,
+        "calls": len(plan),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_s": round(len(plan) / elapsed, 1),
+        "call_ms": {"p50": round(pct(latencies, 0.5), 1), "p95": round(pct(latencies, 0.95), 1)},
+        "loop_lag_ms": {
+            "p50": round(pct(lags, 0.5), 2),
+            "p99": round(pct(lags, 0.99), 2),
+            "max": round(max(lags) * 1000, 2) if lags else 0.0,
+            "mean": round(statistics.mean(lags) * 1000, 2) if lags else 0.0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=["async", "blocking"], default=["async", "blocking"])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="대체 백엔드 응답 지연 중앙값")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="503 응답 비율 (async 모드는 재시도함)")
+    parser.add_argument("--db", default=None, help="도메인 저장소 경로 (생략 시 기본 저장소)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = DomainStore(args.db) if args.db else get_domain_store()
+    configure_domain_store(store)
+    # 캐시 없이 매 호출이 백엔드까지 가도록 함
+    configure_tool_cache(ToolCache(max_entries=0))
+
+    backend = MockBackend(store, FaultProfile(latency_ms=args.latency_ms, failure_rate=args.failure_rate), seed=args.seed)
+    server, url = serve_in_background(backend)
+    try:
+        plan = build_calls(store, args.calls, args.seed)
+        for mode in args.modes:
+            client = BackendClient(url)
+            configure_backend_client(client)
+            report = asyncio.run(run_mode(mode, plan, args.concurrency, url))
+            if mode == "async":
+                report["retries"] = client.stats.retries
+            print(json.dumps(report, ensure_ascii=False))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
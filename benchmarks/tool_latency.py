@@ -0,0 +1,129 @@
+"""
+주문/결제/계정 도구의 호출 지연 시간 벤치마크.
+
+합성 데이터 저장소(domain_store)에서 무작위 고객/주문을 골라 도구를 직접 호출하고
+도구별 지연 시간(p50/p95/p99)을 보고함. 도구 결과 캐시는 끄고 저장소 조회 자체를 측정함.
+
+실행:
+    python domain_store.py generate --customers 200000
+    python benchmarks/tool_latency.py --calls 2000
+    python benchmarks/tool_latency.py --path /tmp/bench.db --generate 200000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.tool_context import ToolContext
+
+import tools
+from domain_store import DEFAULT_DB_PATH, DomainStore, configure_domain_store
+from models import UserAccountContext
+from tool_cache import ToolCache, configure_tool_cache
+
+
+def sample_order(store: DomainStore, rng: random.Random, customers: int):
+    # 무작위 고객의 주문 하나 (고객 ID, 주문 번호, 운송장 번호)
+    customer_id = rng.randint(1, customers)
+    row = store._conn().execute(
+        """
+        SELECT o.order_number, s.tracking_number FROM orders o
+        LEFT JOIN shipments s ON s.order_number = o.order_number
+        WHERE o.customer_id = ? LIMIT 1
+        """,
+        (customer_id,),
+    ).fetchone()
+    return customer_id, row["order_number"], row["tracking_number"]
+
+
+def build_calls(store: DomainStore, calls: int, seed: int):
+    # 실제 대화에 가까운 비율로 조회/변경 도구 호출을 섞음
+    rng = random.Random(seed)
+    customers = store.counts()["customers"]
+    plan = []
+    for _ in range(calls):
+        customer_id, order_number, tracking_number = sample_order(store, rng, customers)
+        # 모델이 말로 들은 주문 번호를 여러 형태로 넘기는 상황도 포함함
+        spoken = rng.choice([order_number, order_number.split("-")[1], order_number.lower()])
+        kind = rng.choices(["order", "billing", "redelivery", "return"], weights=[50, 35, 10, 5])[0]
+        if kind == "order":
+            plan.append((tools.lookup_order_status, customer_id, {"order_number": spoken}))
+        elif kind == "billing":
+            plan.append((tools.lookup_billing_history, customer_id, {"months_back": rng.choice([3, 6, 12])}))
+        elif kind == "redelivery" and tracking_number:
+            plan.append(
+                (
+                    tools.schedule_redelivery,
+                    customer_id,
+                    {"tracking_number": tracking_number, "preferred_date": "내일 오전"},
+                )
+            )
+        else:
+            plan.append(
+                (
+                    tools.initiate_return_process,
+                    customer_id,
+                    {"order_number": spoken, "return_reason": "단순 변심", "items": "전체"},
+                )
+            )
+    return plan
+
+
+async def run(plan) -> dict[str, list[float]]:
+    latencies: dict[str, list[float]] = {}
+    for tool, customer_id, arguments in plan:
+        context = UserAccountContext(customer_id=customer_id, name=f"customer{customer_id}", tier="basic")
+        input_json = json.dumps(arguments, ensure_ascii=False)
+        tool_context = ToolContext(
+            context=context, tool_name=tool.name, tool_call_id="bench", tool_arguments=input_json
+        )
+        start = time.perf_counter()
+        await tool.on_invoke_tool(tool_context, input_json)
+        latencies.setdefault(tool.name, []).append(time.perf_counter() - start)
+    return latencies
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=DEFAULT_DB_PATH)
+    parser.add_argument("--generate", type=int, default=None, help="측정 전에 고객 N명의 합성 데이터를 생성")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = DomainStore(args.path)
+    if args.generate:
+        start = time.perf_counter()
+        store.generate(args.generate, seed=args.seed)
+        print(f"generated {args.generate} customers in {time.perf_counter() - start:.1f}s")
+    elif store.is_empty():
+        parser.error(f"{args.path}에 데이터가 없음 (--generate N 또는 python domain_store.py generate)")
+    configure_domain_store(store)
+    configure_tool_cache(ToolCache(max_entries=0))
+
+    counts = store.counts()
+    print(f"rows: {sum(counts.values())} {counts}")
+    latencies = asyncio.run(run(build_calls(store, args.calls, args.seed)))
+
+    print(f"{'tool':28} {'calls':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, values in sorted(latencies.items()):
+        ms = [v * 1000 for v in values]
+        print(
+            f"{name:28} {len(ms):>6} {statistics.mean(ms):>7.3f}ms {percentile(ms, 0.5):>7.3f}ms "
+            f"{percentile(ms, 0.95):>7.3f}ms {percentile(ms, 0.99):>7.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+음성 턴 전체 지연 시간 벤치마크.
+
+WAV 픽스처를 convert_audio → trim_silence → VoicePipeline(CustomWorkflow)로 흘려보내고
+오프라인 대체 모델(offline_provider)로 실행하여 다음 지표를 p50/p95/p99로 보고함.
+파이프라인 풀은 서비스와 같은 build_pipeline_pool()로 만들므로 가드레일/빠른 라우터 비용이 포함됨
+(가드레일에 막힌 턴은 턴별 결과의 blocked에 표시함).
+- time_to_first_transcript: 턴 시작 → 전사 완료(워크플로우 시작)
+- time_to_first_token: 턴 시작 → 첫 텍스트 청크
+- time_to_first_audio: 턴 시작 → 첫 오디오 바이트
+- total_turn: 턴 시작 → 오디오 스트림 종료
+- handoffs: 턴당 핸드오프 횟수
+- peak_rss_mb: 프로세스 최대 RSS
+
+실행: python benchmarks/voice_turns.py --iterations 5 --output bench_output.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 모든 모델 호출을 오프라인 대체 모델로 실행 (트레이스 전송도 비활성화)
+os.environ["SUPPORT_AGENT_OFFLINE"] = "1"
+
+import numpy as np
+from agents import InputGuardrailTripwireTriggered, OutputGuardrailTripwireTriggered, RunConfig, SQLiteSession
+from agents.voice import AudioInput
+
+import providers
+from audio_ingest import STT_SAMPLE_RATE, convert_audio
+from conversation_state import ConversationState
+from make_fixtures import ensure_fixtures
+from models import UserAccountContext
+from my_agents.triage_agent import triage_agent
+from offline_provider import LatencyProfile, OfflineModelProvider, OfflineVoiceModelProvider
+from pipeline_pool import VoicePipelinePool
+from service import build_pipeline_pool
+from turn_tracing import TurnTracingHooks
+from voice_activity import trim_silence
+from workflow import CustomWorkflow
+
+METRICS = [
+    "time_to_first_transcript_ms",
+    "time_to_first_token_ms",
+    "time_to_first_audio_ms",
+    "total_turn_ms",
+    "handoffs",
+    "peak_rss_mb",
+]
+
+
+class HandoffCounter(TurnTracingHooks):
+    def __init__(self):
+        super().__init__()
+        self.handoffs = 0
+
+    async def on_handoff(self, context, from_agent, to_agent):
+        self.handoffs += 1
+        await super().on_handoff(context, from_agent, to_agent)
+
+
+class TimedWorkflow(CustomWorkflow):
+    # 전사 완료 시점과 첫 텍스트 청크 시점을 기록하는 워크플로우
+    def __init__(self, context, state=None, hooks=None, **kwargs):
+        super().__init__(context, state=state, hooks=HandoffCounter(), **kwargs)
+        self.transcript_at = None
+        self.first_token_at = None
+
+    async def run(self, transcription):
+        self.transcript_at = time.perf_counter()
+        async for chunk in super().run(transcription):
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            yield chunk
+
+
+class TimedPipelinePool(VoicePipelinePool):
+    workflow_class = TimedWorkflow
+
+
+def peak_rss_mb() -> float:
+    # Linux는 KB, macOS는 바이트 단위로 보고함
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def elapsed_ms(start, end):
+    return None if end is None else (end - start) * 1000
+
+
+async def run_turn(pool, stt_model, fixture, context):
+    # 픽스처 하나를 처리하고 지표를 반환함 (매 턴 triage부터 새 대화로 시작)
+    state = ConversationState(
+        conversation_id=fixture["id"],
+        context=context,
+        agent=triage_agent,
+        session=SQLiteSession(fixture["id"], ":memory:"),
+    )
+
+    start = time.perf_counter()
+    with open(fixture["path"], "rb") as f:
+        audio_array = convert_audio(f.read())
+    vad = trim_silence(audio_array, STT_SAMPLE_RATE)
+    stt_model.register(vad.audio, fixture["transcript"])
+
+    pipeline = pool.acquire(fixture["id"], context, state)
+    workflow = pipeline.workflow
+    workflow.transcript_at = workflow.first_token_at = None
+    workflow.hooks.handoffs = 0
+
+    first_audio_at = None
+    blocked = None
+    result = await pipeline.run(AudioInput(buffer=vad.audio, frame_rate=STT_SAMPLE_RATE))
+    try:
+        async for event in result.stream():
+            if event.type == "voice_stream_event_audio" and first_audio_at is None:
+                first_audio_at = time.perf_counter()
+    except InputGuardrailTripwireTriggered:
+        blocked = "input"
+    except OutputGuardrailTripwireTriggered:
+        blocked = "output"
+    end = time.perf_counter()
+
+    return {
+        "fixture": fixture["id"],
+        "category": fixture["category"],
+        "routed_agent": state.agent.name,
+        "expected_agent": fixture["expected_agent"],
+        "blocked": blocked,
+        "trimmed_seconds": round(vad.dropped_seconds, 3),
+        "time_to_first_transcript_ms": elapsed_ms(start, workflow.transcript_at),
+        "time_to_first_token_ms": elapsed_ms(start, workflow.first_token_at),
+        "time_to_first_audio_ms": elapsed_ms(start, first_audio_at),
+        "total_turn_ms": elapsed_ms(start, end),
+        "handoffs": workflow.hooks.handoffs,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def summarize(turns):
+    summary = {}
+    for metric in METRICS:
+        values = np.array([t[metric] for t in turns if t[metric] is not None], dtype=float)
+        if len(values) == 0:
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        summary[metric] = {
+            "p50": round(p50, 3),
+            "p95": round(p95, 3),
+            "p99": round(p99, 3),
+            "mean": round(values.mean(), 3),
+        }
+    return summary
+
+
+async def run_benchmark(iterations, latency):
+    fixtures = ensure_fixtures()
+    voice_provider = OfflineVoiceModelProvider(latency)
+    providers.configure(
+        run_config=RunConfig(model_provider=OfflineModelProvider(latency), tracing_disabled=True),
+        voice_model_provider=voice_provider,
+    )
+    # 서비스와 같은 구성(입력/문장 가드레일, 빠른 라우터)으로 만듦
+    pool = build_pipeline_pool(TimedPipelinePool, model_provider=voice_provider)
+    context = UserAccountContext(customer_id=1, name="bench", tier="basic", email="bench@example.com")
+
+    turns = []
+    for _ in range(iterations):
+        for fixture in fixtures:
+            turns.append(await run_turn(pool, voice_provider.stt_model, fixture, context))
+    return turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument(
+        "--latency",
+        choices=["default", "instant"],
+        default="default",
+        help="오프라인 모델 지연 프로필 (instant: 코드 경로 자체의 비용만 측정)",
+    )
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (생략 시 표준 출력)")
+    args = parser.parse_args()
+
+    latency = LatencyProfile.instant() if args.latency == "instant" else LatencyProfile()
+    turns = asyncio.run(run_benchmark(args.iterations, latency))
+
+    report = {
+        "benchmark": "voice_turns",
+        "iterations": args.iterations,
+        "latency_profile": args.latency,
+        "turn_count": len(turns),
+        "routing_accuracy": round(
+            sum(t["routed_agent"] == t["expected_agent"] for t in turns) / len(turns), 3
+        ),
+        "summary": summarize(turns),
+        "turns": turns,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(json.dumps(report["summary"], indent=2))
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+
+from agents import Agent
+from agents.memory import SessionABC
+from models import UserAccountContext
+from session_memory import SummarizingSession
+
+
+# 유휴 상태로 이 시간(초)이 지나면 대화 상태를 메모리에서 제거함 (기록/활성 Agent는 DB에 남음)
+DEFAULT_IDLE_TTL_SECONDS = 15 * 60
+# 다른 턴이 진행 중일 때 잠금을 다시 시도하는 간격 (초)
+TURN_LOCK_POLL_INTERVAL = 0.05
+
+
+class TurnLock:
+    """
+    대화 하나의 턴을 하나씩 실행하기 위한 async 잠금.
+    Streamlit은 rerun마다 asyncio.run()으로 새 이벤트 루프를 만들고 대화 상태는 루프를 넘어
+    캐시되므로, 특정 루프에 묶이는 asyncio.Lock 대신 threading.Lock을 사용함.
+    이벤트 루프를 막지 않도록 잠금을 얻을 때까지 sleep하며 다시 시도함 (취소되어도 잠금이 남지 않음).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    async def __aenter__(self):
+        while not self._lock.acquire(blocking=False):
+            await asyncio.sleep(TURN_LOCK_POLL_INTERVAL)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+
+@dataclass
+class ConversationState:
+    # 대화 하나의 실행 상태 (워크플로우가 매 턴 읽고 갱신함)
+    conversation_id: str
+    context: UserAccountContext
+    agent: Agent
+    session: SessionABC
+    last_used: float = field(default_factory=time.monotonic)
+    turns: int = 0
+    # 같은 대화의 턴은 한 번에 하나씩 실행함 (이벤트 루프가 달라도 동작함)
+    lock: TurnLock = field(default_factory=TurnLock, repr=False)
+
+    @property
+    def key(self) -> tuple[int, str]:
+        return (self.context.customer_id, self.conversation_id)
+
+
+class ConversationStateStore:
+    """
+    (고객 ID, 대화 ID)별 활성 Agent/세션/컨텍스트를 보관하는 저장소.
+    - 세션 기록과 턴 종료 시점의 활성 Agent는 세션 저장소(SQLite)에 저장하므로
+      다른 프로세스나 재시작 후에도 같은 Agent에서 대화를 이어감
+    - 메모리에 남아 있는 상태도 턴을 시작할 때 refresh()로 저장된 활성 Agent와 요약을 다시 읽음
+      (사이에 다른 워커 프로세스가 턴을 처리했을 수 있음)
+    - 메모리에는 최근에 사용한 대화만 유지함
+    """
+
+    def __init__(
+        self,
+        session_store,
+        agents: list[Agent],
+        entry_agent: Agent,
+        idle_ttl: float = DEFAULT_IDLE_TTL_SECONDS,
+    ):
+        self.session_store = session_store
+        self.agents = {agent.name: agent for agent in [entry_agent, *agents]}
+        self.entry_agent = entry_agent
+        self.idle_ttl = idle_ttl
+        self._states: dict[tuple[int, str], ConversationState] = {}
+        self._lock = threading.Lock()
+
+    def get(self, context: UserAccountContext, conversation_id: str) -> ConversationState:
+        # 대화 상태를 반환함. 없으면 저장된 활성 Agent로 복원하고, 컨텍스트는 이번 요청의 것으로 교체함
+        key = (context.customer_id, conversation_id)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            state = self._states.get(key)
+            if state is None:
+                history = self.session_store.session(context.customer_id, conversation_id)
+                agent = self.agents.get(history.active_agent(), self.entry_agent)
+                state = ConversationState(
+                    conversation_id=conversation_id,
+                    context=context,
+                    agent=agent,
+                    # 요약 상태는 대화 기록과 같은 저장소(shard)에 저장함
+                    session=SummarizingSession(history),
+                )
+                self._states[key] = state
+            state.context = context
+            state.last_used = now
+            return state
+
+    async def refresh(self, state: ConversationState):
+        # 저장된 활성 Agent와 요약을 다시 읽음 (턴 시작 시 state.lock을 잡은 상태에서 호출)
+        agent_name = await asyncio.to_thread(state.session.session.active_agent)
+        state.agent = self.agents.get(agent_name, self.entry_agent)
+        await asyncio.to_thread(state.session.reload_summary)
+
+    async def save(self, state: ConversationState):
+        # 턴이 끝난 뒤 활성 Agent를 저장함
+        state.turns += 1
+        await state.session.session.save_active_agent(state.agent.name)
+
+    async def reset(self, state: ConversationState):
+        # 대화 기록을 지우고 진입 Agent부터 다시 시작함
+        await state.session.clear_session()
+        state.agent = self.entry_agent
+
+    def _evict_idle(self, now: float):
+        expired = [
+            key
+            for key, state in self._states.items()
+            if now - state.last_used > self.idle_ttl and not state.lock.locked()
+        ]
+        for key in expired:
+            del self._states[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._states)
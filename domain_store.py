@@ -0,0 +1,437 @@
+"""
+주문/결제/계정 도구가 조회하는 로컬 도메인 데이터 저장소 (SQLite).
+
+테이블: customers, orders, shipments, invoices, refunds, tickets
+합성 데이터 생성:
+    python domain_store.py generate --customers 200000       (약 400만 행)
+"""
+import argparse
+import random
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+
+DEFAULT_DB_PATH = "customer-support-data.db"
+# 저장소가 비어 있으면 데모용으로 이만큼의 고객 데이터를 만들어 둠
+DEFAULT_SEED_CUSTOMERS = 500
+BUSY_TIMEOUT_MS = 5000
+# 합성 데이터를 한 번에 넣는 행 수
+INSERT_BATCH = 20000
+
+ORDER_NUMBER_START = 10001
+TRACKING_NUMBER_START = 100001
+ORDER_STATUSES = ["processing", "shipped", "in_transit", "delivered", "delivered", "delivered"]
+PREMIUM_TIERS = ("premium", "enterprise")
+PRODUCTS = ["무선 이어폰", "스마트 워치", "노트북 거치대", "기계식 키보드", "USB-C 허브", "모니터 암", "보조 배터리"]
+CARRIERS = ["CJ대한통운", "한진택배", "롯데택배", "우체국택배"]
+PLAN_PRICES = {"basic": 29.99, "premium": 49.99, "enterprise": 99.99}
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS customers (
+        customer_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        tier TEXT NOT NULL DEFAULT 'basic',
+        status TEXT NOT NULL DEFAULT 'active',
+        payment_method TEXT NOT NULL DEFAULT 'credit_card',
+        two_factor_method TEXT,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        order_number TEXT PRIMARY KEY,
+        customer_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        items TEXT NOT NULL,
+        total REAL NOT NULL,
+        ordered_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS shipments (
+        tracking_number TEXT PRIMARY KEY,
+        order_number TEXT NOT NULL,
+        carrier TEXT NOT NULL,
+        status TEXT NOT NULL,
+        estimated_delivery TEXT NOT NULL,
+        service_level TEXT NOT NULL DEFAULT 'standard'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS invoices (
+        invoice_id INTEGER PRIMARY KEY,
+        customer_id INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        status TEXT NOT NULL,
+        issued_at TEXT NOT NULL
+    )
+    """,
+    # 환불과 청구 크레딧 (kind: refund | credit)
+    """
+    CREATE TABLE IF NOT EXISTS refunds (
+        refund_id INTEGER PRIMARY KEY,
+        customer_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        amount REAL NOT NULL,
+        reason TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    # 도구가 남기는 요청 기록 (에스컬레이션, 반품, 재배송, 비밀번호 재설정 등)
+    """
+    CREATE TABLE IF NOT EXISTS tickets (
+        ticket_id INTEGER PRIMARY KEY,
+        customer_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        reference TEXT,
+        summary TEXT NOT NULL,
+        priority TEXT NOT NULL DEFAULT 'medium',
+        status TEXT NOT NULL DEFAULT 'open',
+        created_at TEXT NOT NULL
+    )
+    """,
+]
+
+# 인덱스 이름 -> 대상 (대량 적재 시 지웠다가 다시 만듦)
+INDEXES = {
+    "idx_customers_email": "customers (email)",
+    "idx_orders_customer": "orders (customer_id, ordered_at DESC)",
+    "idx_shipments_order": "shipments (order_number)",
+    "idx_invoices_customer": "invoices (customer_id, issued_at DESC)",
+    "idx_refunds_customer": "refunds (customer_id, created_at DESC)",
+    "idx_tickets_customer": "tickets (customer_id, created_at DESC)",
+}
+
+ORDER_NUMBER_DIGITS = re.compile(r"\d{5,}")
+
+
+def normalize_order_number(order_number: str) -> str:
+    # "48213", "ord48213", "ORD-48213"을 모두 ORD-48213으로 맞춤
+    match = ORDER_NUMBER_DIGITS.search(order_number or "")
+    return f"ORD-{match.group(0)}" if match else (order_number or "").strip().upper()
+
+
+def is_premium(tier: str) -> bool:
+    return tier in PREMIUM_TIERS
+
+
+class DomainStore:
+    """
+    도메인 데이터 저장소. 스레드마다 커넥션을 하나씩 열어 사용함 (WAL이므로 읽기는 서로 막지 않음).
+    도구는 고객 ID를 항상 조건에 포함하므로 다른 고객의 주문/운송장은 조회되지 않음.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        for statement in SCHEMA:
+            conn.execute(statement)
+        self._create_indexes(conn)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _create_indexes(conn):
+        for name, target in INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+    @contextmanager
+    def transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def snapshot(self, path: str) -> "DomainStore":
+        # 현재 데이터를 path로 복사한 별도 저장소 (배치 재생처럼 도구의 쓰기가 이 저장소에 남으면 안 될 때 사용)
+        target = sqlite3.connect(path)
+        try:
+            self._conn().backup(target)
+        finally:
+            target.close()
+        return DomainStore(path)
+
+    def is_empty(self) -> bool:
+        return self._conn().execute("SELECT 1 FROM customers LIMIT 1").fetchone() is None
+
+    def counts(self) -> dict[str, int]:
+        conn = self._conn()
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("customers", "orders", "shipments", "invoices", "refunds", "tickets")
+        }
+
+    # -------------------------------------------------------------------------
+    # 조회
+    # -------------------------------------------------------------------------
+
+    def customer(self, customer_id: int) -> sqlite3.Row | None:
+        return self._conn().execute(
+            "SELECT * FROM customers WHERE customer_id = ?", (customer_id,)
+        ).fetchone()
+
+    def order(self, customer_id: int, order_number: str) -> sqlite3.Row | None:
+        # 주문과 (있으면) 배송 정보
+        return self._conn().execute(
+            """
+            SELECT o.*, s.tracking_number, s.carrier, s.status AS shipment_status,
+                   s.estimated_delivery, s.service_level
+            FROM orders o
+            LEFT JOIN shipments s ON s.order_number = o.order_number
+            WHERE o.order_number = ? AND o.customer_id = ?
+            """,
+            (normalize_order_number(order_number), customer_id),
+        ).fetchone()
+
+    def shipment(self, customer_id: int, tracking_number: str) -> sqlite3.Row | None:
+        return self._conn().execute(
+            """
+            SELECT s.*, o.customer_id
+            FROM shipments s
+            JOIN orders o ON o.order_number = s.order_number
+            WHERE s.tracking_number = ? AND o.customer_id = ?
+            """,
+            (tracking_number.strip().upper(), customer_id),
+        ).fetchone()
+
+    def invoices(self, customer_id: int, months_back: int) -> list[sqlite3.Row]:
+        since = (date.today() - timedelta(days=31 * months_back)).isoformat()
+        return self._conn().execute(
+            """
+            SELECT * FROM invoices
+            WHERE customer_id = ? AND issued_at >= ?
+            ORDER BY issued_at DESC
+            """,
+            (customer_id, since),
+        ).fetchall()
+
+    # -------------------------------------------------------------------------
+    # 변경
+    # -------------------------------------------------------------------------
+
+    def add_refund(self, customer_id: int, kind: str, amount: float, reason: str, status: str) -> int:
+        with self.transaction() as conn:
+            return conn.execute(
+                "INSERT INTO refunds (customer_id, kind, amount, reason, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (customer_id, kind, amount, reason, status, date.today().isoformat()),
+            ).lastrowid
+
+    def add_ticket(
+        self,
+        customer_id: int,
+        kind: str,
+        summary: str,
+        reference: str | None = None,
+        priority: str = "medium",
+    ) -> int:
+        with self.transaction() as conn:
+            return conn.execute(
+                """
+                INSERT INTO tickets (customer_id, kind, reference, summary, priority, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (customer_id, kind, reference, summary, priority, date.today().isoformat()),
+            ).lastrowid
+
+    def update_customer(self, customer_id: int, **fields) -> bool:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE customers SET {assignments} WHERE customer_id = ?",
+                (*fields.values(), customer_id),
+            )
+        return cursor.rowcount > 0
+
+    def update_order(self, customer_id: int, order_number: str, status: str) -> bool:
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE orders SET status = ? WHERE order_number = ? AND customer_id = ?",
+                (status, normalize_order_number(order_number), customer_id),
+            )
+        return cursor.rowcount > 0
+
+    def update_shipment(self, tracking_number: str, **fields) -> bool:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE shipments SET {assignments} WHERE tracking_number = ?",
+                (*fields.values(), tracking_number.strip().upper()),
+            )
+        return cursor.rowcount > 0
+
+    # -------------------------------------------------------------------------
+    # 합성 데이터
+    # -------------------------------------------------------------------------
+
+    @contextmanager
+    def bulk_load(self):
+        # 대량 적재 중에는 인덱스를 지웠다가 마지막에 한 번에 다시 만듦
+        conn = self._conn()
+        conn.execute("PRAGMA synchronous=OFF")
+        for name in INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        try:
+            yield conn
+        finally:
+            self._create_indexes(conn)
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA synchronous=NORMAL")
+
+    def generate(self, customers: int, seed: int = 0, progress=None) -> dict[str, int]:
+        """
+        고객 ID 1..customers의 합성 데이터를 생성함 (기존 데이터는 지움).
+        고객당 평균 주문 4건(대부분 배송 정보 포함), 월별 청구서 12건, 환불/티켓 약간.
+        """
+        rng = random.Random(seed)
+        today = date.today()
+        with self.bulk_load() as conn:
+            for table in ("customers", "orders", "shipments", "invoices", "refunds", "tickets"):
+                conn.execute(f"DELETE FROM {table}")
+
+            buffers = {table: [] for table in ("customers", "orders", "shipments", "invoices", "refunds", "tickets")}
+            columns = {
+                "customers": "customer_id, name, email, tier, status, payment_method, two_factor_method, created_at",
+                "orders": "order_number, customer_id, status, items, total, ordered_at",
+                "shipments": "tracking_number, order_number, carrier, status, estimated_delivery, service_level",
+                "invoices": "customer_id, amount, status, issued_at",
+                "refunds": "customer_id, kind, amount, reason, status, created_at",
+                "tickets": "customer_id, kind, reference, summary, priority, status, created_at",
+            }
+
+            def flush(force: bool = False):
+                for table, rows in buffers.items():
+                    if rows and (force or len(rows) >= INSERT_BATCH):
+                        placeholders = ", ".join("?" * len(rows[0]))
+                        conn.execute("BEGIN")
+                        conn.executemany(f"INSERT INTO {table} ({columns[table]}) VALUES ({placeholders})", rows)
+                        conn.execute("COMMIT")
+                        rows.clear()
+
+            order_number = ORDER_NUMBER_START
+            tracking_number = TRACKING_NUMBER_START
+            for customer_id in range(1, customers + 1):
+                tier = rng.choices(["basic", "premium", "enterprise"], weights=[70, 25, 5])[0]
+                created = today - timedelta(days=rng.randint(400, 2000))
+                buffers["customers"].append(
+                    (
+                        customer_id,
+                        f"customer{customer_id}",
+                        f"customer{customer_id}@example.com",
+                        tier,
+                        "active",
+                        rng.choice(["credit_card", "credit_card", "paypal", "bank_transfer"]),
+                        rng.choice([None, None, "app", "sms"]),
+                        created.isoformat(),
+                    )
+                )
+
+                for _ in range(max(1, int(rng.expovariate(1 / 4)))):
+                    ordered = today - timedelta(days=rng.randint(0, 365))
+                    status = rng.choice(ORDER_STATUSES)
+                    items = ", ".join(rng.sample(PRODUCTS, rng.randint(1, 3)))
+                    number = f"ORD-{order_number}"
+                    buffers["orders"].append(
+                        (number, customer_id, status, items, round(rng.uniform(9.9, 499.0), 2), ordered.isoformat())
+                    )
+                    if status != "processing":
+                        eta = ordered + timedelta(days=rng.randint(1, 5))
+                        buffers["shipments"].append(
+                            (f"1Z{tracking_number}", number, rng.choice(CARRIERS), status, eta.isoformat(), "standard")
+                        )
+                        tracking_number += 1
+                    order_number += 1
+
+                price = PLAN_PRICES[tier]
+                for month in range(12):
+                    issued = today - timedelta(days=30 * month)
+                    status = "Failed" if rng.random() < 0.03 else "Paid"
+                    buffers["invoices"].append((customer_id, price, status, issued.isoformat()))
+                    if rng.random() < 0.01:
+                        buffers["refunds"].append(
+                            (customer_id, "refund", price, "중복 결제", "completed", issued.isoformat())
+                        )
+
+                if rng.random() < 0.3:
+                    buffers["tickets"].append(
+                        (
+                            customer_id,
+                            rng.choice(["engineering", "return", "password_reset"]),
+                            None,
+                            "이전 문의",
+                            "medium",
+                            "closed",
+                            (today - timedelta(days=rng.randint(0, 365))).isoformat(),
+                        )
+                    )
+
+                flush()
+                if progress is not None and customer_id % 10000 == 0:
+                    progress(customer_id, customers)
+            flush(force=True)
+        return self.counts()
+
+
+_store: DomainStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_domain_store() -> DomainStore:
+    # 최초 사용 시 기본 경로의 저장소를 열고, 비어 있으면 데모용 데이터를 만듦
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DomainStore(DEFAULT_DB_PATH)
+            if _store.is_empty():
+                _store.generate(DEFAULT_SEED_CUSTOMERS)
+        return _store
+
+
+def configure_domain_store(store: DomainStore):
+    # 벤치마크 등에서 다른 경로의 저장소를 사용할 때 교체함
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    generate = subcommands.add_parser("generate", help="합성 데이터 생성 (기존 데이터는 지움)")
+    generate.add_argument("--path", default=DEFAULT_DB_PATH)
+    generate.add_argument("--customers", type=int, default=200000)
+    generate.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = DomainStore(args.path)
+    start = time.perf_counter()
+    counts = store.generate(
+        args.customers,
+        seed=args.seed,
+        progress=lambda done, total: print(f"{done}/{total} customers", flush=True),
+    )
+    print(f"generated {sum(counts.values())} rows in {time.perf_counter() - start:.1f}s: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from topic_classifier import normalize, vectorize
+
+
+logger = logging.getLogger(__name__)
+
+# 이 확신도 이상이면 triage LLM 턴 없이 바로 전문 Agent로 전환함
+DEFAULT_CONFIDENCE_THRESHOLD = 0.6
+# 최고 점수가 이보다 낮으면 확신도와 무관하게 triage Agent에 맡김
+MIN_SCORE = 0.5
+# 1위 카테고리 예시와의 유사도가 이보다 낮으면 키워드가 있어도 triage Agent에 맡김 (유사도 출처별)
+MIN_CATEGORY_SIMILARITY = {"ngram": 0.35, "embedding": 0.45}
+# 키워드 하나가 유사도 점수에 더해지는 가중치 (키워드만으로는 라우팅되지 않도록 유사도보다 훨씬 작게 둠)
+KEYWORD_WEIGHT = 0.15
+DEFAULT_DECISION_LOG = "routing-decisions.jsonl"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+
+# 카테고리별 핵심 키워드 (분류 지침의 카테고리 제목과 같은 키를 사용함)
+KEYWORD_TABLES = {
+    "TECHNICAL SUPPORT": [
+        "오류", "에러", "버그", "충돌", "꺼져", "멈춰", "느려", "로딩", "설치", "업데이트", "앱이",
+        "error", "bug", "crash",
+    ],
+    "BILLING SUPPORT": [
+        "결제", "환불", "요금", "구독", "청구", "영수증", "카드", "해지", "billing", "refund", "charge", "invoice",
+    ],
+    "ORDER MANAGEMENT": [
+        "주문", "배송", "택배", "운송장", "반품", "교환", "도착", "상품", "order", "shipping", "delivery",
+    ],
+    "ACCOUNT MANAGEMENT": [
+        "비밀번호", "로그인", "계정", "이메일", "인증", "탈퇴", "프로필", "password", "login", "account",
+    ],
+}
+
+
+@dataclass
+class RouteDecision:
+    # category가 None이면 triage Agent가 판단하도록 넘김
+    category: str | None
+    confidence: float
+    source: str
+    scores: dict[str, float] = field(default_factory=dict)
+    keywords: list[str] = field(default_factory=list)
+    reason: str = ""
+
+    @property
+    def routed(self) -> bool:
+        return self.category is not None
+
+
+class EmbeddingIndex:
+    """
+    카테고리 예시 문장의 임베딩을 미리 계산해 디스크(.npz)에 저장한 인덱스.
+    로드하면 해시 n-gram 유사도 대신 임베딩 유사도로 카테고리 점수를 계산함.
+    """
+
+    def __init__(self, vectors: np.ndarray, labels: list[str], model: str):
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = (vectors / np.maximum(norms, 1e-9)).astype(np.float32)
+        self.labels = labels
+        self.model = model
+        self._client = None
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingIndex":
+        data = np.load(path, allow_pickle=False)
+        return cls(data["vectors"], [str(label) for label in data["labels"]], str(data["model"]))
+
+    def save(self, path: str):
+        np.savez(path, vectors=self.vectors, labels=np.array(self.labels), model=np.array(self.model))
+
+    @classmethod
+    def build(cls, seeds: dict[str, dict[str, list[str]]], model: str = DEFAULT_EMBEDDING_MODEL) -> "EmbeddingIndex":
+        from openai import OpenAI
+
+        texts, labels = [], []
+        for category, seed in seeds.items():
+            for text in seed["phrases"] + seed["examples"]:
+                texts.append(text)
+                labels.append(category)
+        response = OpenAI().embeddings.create(model=model, input=texts)
+        return cls(np.array([item.embedding for item in response.data]), labels, model)
+
+    async def embed(self, text: str) -> np.ndarray:
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            self._client = AsyncOpenAI()
+        response = await self._client.embeddings.create(model=self.model, input=[text])
+        vector = np.array(response.data[0].embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-9)
+
+
+class FastRouter:
+    """
+    명확한 요청은 triage LLM 턴 없이 바로 전문 Agent로 보내는 로컬 라우터.
+    - 점수: 카테고리별 키워드 수 × KEYWORD_WEIGHT + 카테고리 예시와의 최대 유사도
+    - 확신도: (1위 점수 - 2위 점수) / 1위 점수
+    - 1위 카테고리 예시와의 유사도가 MIN_CATEGORY_SIMILARITY 이상이어야 하고,
+      topic_classifier가 있으면 벡터 점수도 동의하는 확신 있는 on-topic 판정일 때만 라우팅함
+    결정은 모두 로그(JSONL)로 남겨 임계값 조정에 사용함.
+    (파일 기록은 백그라운드 스레드가 모아서 처리하므로 route()는 파일 I/O를 기다리지 않음)
+    """
+
+    def __init__(
+        self,
+        seeds: dict[str, dict[str, list[str]]],
+        agents: dict,
+        entry_agent,
+        threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+        keyword_tables: dict[str, list[str]] = KEYWORD_TABLES,
+        decision_log: str | None = DEFAULT_DECISION_LOG,
+        topic_classifier=None,
+    ):
+        self.agents = agents
+        self.topic_classifier = topic_classifier
+        self.entry_agent = entry_agent
+        self.threshold = threshold
+        self.keyword_tables = {
+            category: [keyword.lower() for keyword in keywords]
+            for category, keywords in keyword_tables.items()
+            if category in agents
+        }
+        self.decision_log = decision_log
+        self.index: EmbeddingIndex | None = None
+        self._categories = list(agents)
+        texts, labels = [], []
+        for category in self._categories:
+            seed = seeds.get(category, {"phrases": [], "examples": []})
+            for text in seed["phrases"] + seed["examples"]:
+                texts.append(text)
+                labels.append(category)
+        self._labels = np.array(labels)
+        self._vectors = vectorize(texts)
+        self._lock = threading.Lock()
+        self._log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._log_thread: threading.Thread | None = None
+
+    def load_index(self, path: str):
+        # 미리 계산한 임베딩 인덱스를 사용함 (쿼리마다 임베딩 API를 한 번 호출함)
+        self.index = EmbeddingIndex.load(path)
+
+    def _similarities(self, vectors: np.ndarray, labels, query: np.ndarray) -> dict[str, float]:
+        similarity = vectors @ query
+        labels = np.asarray(labels)
+        return {
+            category: float(similarity[labels == category].max()) if (labels == category).any() else 0.0
+            for category in self._categories
+        }
+
+    async def route(self, text: str) -> RouteDecision:
+        if self.topic_classifier is not None:
+            verdict = self.topic_classifier.classify(text, record=False)
+            if verdict.label != "on_topic" or not verdict.vector_agrees:
+                # 범위 밖이거나 애매한 요청은 triage Agent(와 LLM 가드레일)가 판단하게 함
+                decision = RouteDecision(
+                    category=None, confidence=0.0, source="classifier",
+                    reason=f"topic {verdict.label} (vector_agrees={verdict.vector_agrees})",
+                )
+                self._log(text, decision)
+                return decision
+
+        normalized = normalize(text)
+        keywords = {
+            category: [keyword for keyword in table if keyword in normalized]
+            for category, table in self.keyword_tables.items()
+        }
+
+        if self.index is not None:
+            source = "embedding"
+            similarities = self._similarities(self.index.vectors, self.index.labels, await self.index.embed(text))
+        else:
+            source = "ngram"
+            similarities = self._similarities(self._vectors, self._labels, vectorize([text])[0])
+
+        scores = {
+            category: KEYWORD_WEIGHT * len(keywords.get(category, [])) + similarities[category]
+            for category in self._categories
+        }
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        top = scores[ranked[0]]
+        second = scores[ranked[1]] if len(ranked) > 1 else 0.0
+        confidence = (top - second) / top if top > 0 else 0.0
+
+        if similarities[ranked[0]] < MIN_CATEGORY_SIMILARITY.get(source, 0.0):
+            reason = "low category similarity"
+        elif top < MIN_SCORE:
+            reason = "low score"
+        elif confidence < self.threshold:
+            reason = "low confidence"
+        else:
+            reason = ""
+        decision = RouteDecision(
+            category=None if reason else ranked[0],
+            confidence=round(confidence, 4),
+            source=source,
+            scores={category: round(score, 4) for category, score in scores.items()},
+            keywords=keywords.get(ranked[0], []),
+            reason=reason,
+        )
+        self._log(text, decision)
+        return decision
+
+    def agent_for(self, decision: RouteDecision):
+        return self.agents.get(decision.category) if decision.routed else None
+
+    def _log(self, text: str, decision: RouteDecision):
+        record = {"ts": time.time(), "text": text, "threshold": self.threshold, **asdict(decision)}
+        logger.info("fast route: %s", json.dumps(record, ensure_ascii=False))
+        if self.decision_log is None:
+            return
+        self._log_queue.put(json.dumps(record, ensure_ascii=False) + "\n")
+        with self._lock:
+            if self._log_thread is None:
+                self._log_thread = threading.Thread(target=self._write_log, name="route-log", daemon=True)
+                self._log_thread.start()
+                # 종료 시 남은 기록을 마저 씀
+                atexit.register(self.close)
+
+    def _write_log(self):
+        while True:
+            line = self._log_queue.get()
+            if line is None:
+                return
+            lines = [line]
+            # 그동안 쌓인 기록을 한 번에 씀
+            while True:
+                try:
+                    line = self._log_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if line is None:
+                    self._log_queue.put(None)
+                    break
+                lines.append(line)
+            try:
+                with open(self.decision_log, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+            except OSError:
+                logger.exception("route decision log write failed: %s", self.decision_log)
+
+    def close(self):
+        # 쌓인 결정 로그를 모두 쓰고 기록 스레드를 종료함
+        with self._lock:
+            thread, self._log_thread = self._log_thread, None
+        if thread is not None:
+            self._log_queue.put(None)
+            thread.join()
+
+
+if __name__ == "__main__":
+    # 분류 지침의 예시로 임베딩 인덱스를 만들어 저장함
+    # 실행: python fast_router.py routing-index.npz
+    import sys
+
+    from my_agents.triage_agent import triage_instruction_seeds
+
+    output = sys.argv[1] if len(sys.argv) > 1 else "routing-index.npz"
+    EmbeddingIndex.build(triage_instruction_seeds).save(output)
+    print(f"saved {output}")
@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from agents import Agent, RunConfig
+from pydantic import BaseModel
+
+
+# 캐시 기본 설정
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_TABLE = "guardrail_verdicts"
+BUSY_TIMEOUT_MS = 5000
+
+# 판정에 영향을 주지 않는 문장 끝 부호/공백 (재시도 발화의 사소한 차이를 무시함)
+TRAILING_PUNCTUATION = re.compile(r"[\s.!?~…。,]+$")
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower().strip()
+    text = re.sub(r"\s+", " ", text)
+    return TRAILING_PUNCTUATION.sub("", text)
+
+
+def guardrail_version(agent: Agent, run_config: RunConfig | None = None) -> str:
+    """
+    가드레일 에이전트의 지침/모델/출력 스키마(와 모델 제공자)로 만든 버전 해시.
+    프롬프트가 바뀌면 버전이 달라지므로 이전 판정은 더 이상 조회되지 않음.
+    """
+    provider = type(run_config.model_provider).__name__ if run_config else None
+    instructions = agent.instructions if isinstance(agent.instructions, str) else repr(agent.instructions)
+    schema = agent.output_type.model_json_schema() if agent.output_type else None
+    payload = json.dumps(
+        {
+            "instructions": instructions,
+            "model": str(agent.model),
+            "provider": provider,
+            "schema": schema,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class GuardrailCache:
+    """
+    가드레일 판정(pydantic 출력) 캐시.
+    - 키: 가드레일 이름 + 버전(프롬프트 해시) + 정규화된 텍스트
+    - 메모리: LRU + TTL, 항목 수와 직렬화 크기(bytes)로 제한함
+    - path를 주면 SQLite 테이블에도 저장하여 프로세스 재시작 후에도 재사용함
+      (커넥션은 스레드마다 하나씩 열어 재사용함)
+    비동기 가드레일에서는 aget()/aput()을 사용함: 메모리 조회는 바로 처리하고
+    SQLite 조회/저장만 스레드 풀에서 실행하여 이벤트 루프를 막지 않음.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        path: str | None = None,
+        table: str = DEFAULT_TABLE,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+        self.table = table
+        self.stats = CacheStats()
+        # key -> (만료 시각, 직렬화된 판정)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if path is not None:
+            with self._conn() as conn:
+                conn.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        key TEXT PRIMARY KEY,
+                        guardrail TEXT NOT NULL,
+                        version TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                    """
+                )
+                conn.execute(f"DELETE FROM {table} WHERE expires_at < ?", (time.time(),))
+
+    @staticmethod
+    def make_key(guardrail: str, version: str, text: str) -> str:
+        raw = f"{guardrail}\x00{version}\x00{normalize_text(text)}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, guardrail: str, version: str, text: str, output_type: type[BaseModel]):
+        key = self.make_key(guardrail, version, text)
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None:
+            value = self._finish_load(key, self._load(key, now))
+        return output_type.model_validate_json(value) if value is not None else None
+
+    async def aget(self, guardrail: str, version: str, text: str, output_type: type[BaseModel]):
+        key = self.make_key(guardrail, version, text)
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None:
+            row = await asyncio.to_thread(self._load, key, now) if self.path is not None else None
+            value = self._finish_load(key, row)
+        return output_type.model_validate_json(value) if value is not None else None
+
+    def put(self, guardrail: str, version: str, text: str, output: BaseModel):
+        row = self._put_memory(guardrail, version, text, output)
+        if self.path is not None:
+            self._store(row)
+
+    async def aput(self, guardrail: str, version: str, text: str, output: BaseModel):
+        row = self._put_memory(guardrail, version, text, output)
+        if self.path is not None:
+            await asyncio.to_thread(self._store, row)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.path is not None:
+            with self._conn() as conn:
+                conn.execute(f"DELETE FROM {self.table}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def _get_memory(self, key: str, now: float) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at >= now:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return value
+            self._remove(key)
+            self.stats.expirations += 1
+            return None
+
+    def _finish_load(self, key: str, row: tuple[float, str] | None) -> str | None:
+        # SQLite 조회 결과를 통계에 반영하고 메모리에 올림
+        with self._lock:
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self.stats.disk_hits += 1
+            self._insert(key, row[1], row[0])
+        return row[1]
+
+    def _put_memory(self, guardrail: str, version: str, text: str, output: BaseModel) -> tuple:
+        key = self.make_key(guardrail, version, text)
+        value = output.model_dump_json()
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._insert(key, value, expires_at)
+        return (key, guardrail, version, value, expires_at)
+
+    def _load(self, key: str, now: float) -> tuple[float, str] | None:
+        if self.path is None:
+            return None
+        return self._conn().execute(
+            f"SELECT expires_at, value FROM {self.table} WHERE key = ? AND expires_at >= ?",
+            (key, now),
+        ).fetchone()
+
+    def _store(self, row: tuple):
+        _, guardrail, version, _, _ = row
+        with self._conn() as conn:
+            # 버전이 바뀐 이전 판정은 함께 정리함
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE guardrail = ? AND version != ?",
+                (guardrail, version),
+            )
+            conn.execute(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?)", row)
+
+    def _insert(self, key: str, value: str, expires_at: float):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, value)
+        self._bytes += len(key) + len(value)
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_cache = GuardrailCache()
+
+
+def get_guardrail_cache() -> GuardrailCache:
+    return _cache
+
+
+def configure_guardrail_cache(cache: GuardrailCache):
+    # 앱 시작 시 영속화 경로 등을 지정한 캐시로 교체함
+    global _cache
+    _cache = cache
@@ -0,0 +1,113 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from models import UserAccountContext
+
+
+# 고객별로 렌더링한 전체 프롬프트를 보관하는 최대 개수 (Agent별)
+DEFAULT_MAX_RENDERED = 1024
+# 토큰 수 계산에 사용할 인코딩 (tiktoken이 없으면 UTF-8 바이트 수로 추정함)
+TOKEN_ENCODING = "o200k_base"
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+        except ImportError:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    # 한국어는 대략 3바이트(한 글자)당 0.75토큰
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+@dataclass
+class PromptTokenStats:
+    agent: str
+    tier: str
+    prefix_tokens: int
+    suffix_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prefix_tokens + self.suffix_tokens
+
+
+class CompiledInstructions:
+    """
+    Agent 지침을 고정 본문(prefix)과 고객별 정보(suffix)로 나누어 렌더링함.
+    - 본문은 등급(tier)별로 한 번만 만들어 재사용함 (모든 고객이 같은 prefix를 공유하므로
+      모델 제공자의 프롬프트 캐시가 적중함)
+    - 고객 정보는 항상 끝에 붙이고, 렌더링한 전체 프롬프트는 고객 컨텍스트별로 메모이즈함
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        body: Callable[[str], str],
+        suffix: Callable[[UserAccountContext], str],
+        max_rendered: int = DEFAULT_MAX_RENDERED,
+    ):
+        self.agent_name = agent_name
+        self._body = body
+        self._suffix = suffix
+        self.max_rendered = max_rendered
+        self._bodies: dict[str, str] = {}
+        self._rendered: OrderedDict[tuple, str] = OrderedDict()
+        self._token_stats: dict[str, PromptTokenStats] = {}
+        self._lock = threading.Lock()
+
+    def body(self, tier: str) -> str:
+        with self._lock:
+            body = self._bodies.get(tier)
+            if body is None:
+                body = self._bodies[tier] = self._body(tier)
+            return body
+
+    def render(self, context: UserAccountContext) -> str:
+        key = (context.customer_id, context.name, context.email, context.tier)
+        with self._lock:
+            rendered = self._rendered.get(key)
+            if rendered is not None:
+                self._rendered.move_to_end(key)
+                return rendered
+
+        body = self.body(context.tier)
+        suffix = self._suffix(context)
+        rendered = body + suffix
+        with self._lock:
+            self._rendered[key] = rendered
+            while len(self._rendered) > self.max_rendered:
+                self._rendered.popitem(last=False)
+            if context.tier not in self._token_stats:
+                self._token_stats[context.tier] = PromptTokenStats(
+                    self.agent_name, context.tier, count_tokens(body), count_tokens(suffix)
+                )
+        return rendered
+
+    def token_stats(self) -> list[PromptTokenStats]:
+        with self._lock:
+            return list(self._token_stats.values())
+
+
+# Agent 이름 -> 컴파일된 지침 (토큰 수 보고용)
+_registry: dict[str, CompiledInstructions] = {}
+
+
+def compile_instructions(agent_name: str, body, suffix) -> CompiledInstructions:
+    compiled = CompiledInstructions(agent_name, body, suffix)
+    _registry[agent_name] = compiled
+    return compiled
+
+
+def prompt_token_report() -> list[PromptTokenStats]:
+    # 지금까지 렌더링된 Agent/등급별 프롬프트 토큰 수
+    return [stats for compiled in _registry.values() for stats in compiled.token_stats()]
@@ -5,19 +5,43 @@ dotenv.load_dotenv()
 from openai import OpenAI
 import asyncio
 import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from agents import (
     Runner,
-    SQLiteSession,
     InputGuardrailTripwireTriggered,
     OutputGuardrailTripwireTriggered,
 )
-from agents.voice import AudioInput, VoicePipeline
-from models import UserAccountContext
-from my_agents.triage_agent import triage_agent
 import numpy as np
-import wave, io
-from workflow import CustomWorkflow
-import sounddevice as sd
+from models import UserAccountContext
+from my_agents.triage_agent import topic_classifier
+from instruction_compiler import prompt_token_report
+from session_log import SessionLogReader, render_session_log
+from audio_playback import AudioPlayerPool
+from streaming_input import STREAMING_STT_SETTINGS, run_streaming_conversation
+from turn_tracing import build_span_exporter, current_turn, render_waterfall, start_turn
+from service import (
+    SupportService,
+    build_conversation_states,
+    build_guardrail_cache,
+    build_pipeline_pool,
+    build_session_store,
+)
+from service_client import remote_reset, remote_turn
+from tool_cache import get_tool_cache
+from tool_execution import get_tool_timings
+import uuid
+import os
+
+# 음성 서비스(python service.py) 주소. 지정하면 Streamlit은 클라이언트로만 동작하고
+# 지정하지 않으면 같은 프로세스에서 서비스를 실행함
+SERVICE_URL = os.environ.get("SUPPORT_SERVICE_URL")
+
+# 브라우저 세션마다 별도의 대화를 사용함 (같은 고객이라도 세션 간에 기록/활성 Agent를 공유하지 않음)
+# 스크립트 컨텍스트가 없으면(bare 실행, 테스트) 브라우저 세션이 없으므로 프로세스 단위의 ID를 사용함
+_script_run_ctx = get_script_run_ctx()
+STREAMLIT_SESSION_ID = _script_run_ctx.session_id if _script_run_ctx is not None else "bare"
+CONVERSATION_ID = f"chat-{STREAMLIT_SESSION_ID}"
 
 # OpenAI 클라이언트 초기화
 client = OpenAI()
@@ -30,104 +54,192 @@ user_account_ctx = UserAccountContext(
     email="ktra@example.com"
 )
 
-# Streamlit 세션에 대화 세션 저장소가 없을 경우 생성
-if "session" not in st.session_state:
-    st.session_state["session"] = SQLiteSession(
-        "chat-history",                      # 세션 파일 이름
-        "customer-support-memory.db",        # 로컬 SQLite DB 경로
-    )
-session = st.session_state["session"]
 
-# Streamlit 세션에 활성 Agent가 없을 경우 기본 triage_agent 설정
-if "agent" not in st.session_state:
-    st.session_state["agent"] = triage_agent
+@st.cache_resource
+def get_session_store():
+    # 프로세스 전체가 공유하는 대화 기록 저장소 (shard별 커넥션 풀 + 쓰기 배치)
+    return build_session_store()
 
 
-def convert_audio(audio_input):
-    """
-    Streamlit 오디오 입력 데이터를 NumPy 배열로 변환하는 함수.
-    음성 입력은 .wav 포맷으로 들어오며, 이 데이터를 버퍼에서 읽어 정수형 배열로 반환함.
-    """
-    audio_data = audio_input.getvalue()
+@st.cache_resource
+def get_span_exporter():
+    # 턴 단계별 span을 로컬 파일로 내보냄 (SUPPORT_SPAN_EXPORT=sqlite:<경로>면 SQLite에 저장)
+    return build_span_exporter()
+
+
+@st.cache_resource
+def get_guardrail_cache():
+    # 가드레일 판정 캐시 (라우팅 임베딩 인덱스도 함께 준비함)
+    return build_guardrail_cache()
 
-    # WAV 파일을 메모리에서 직접 읽음
-    with wave.open(io.BytesIO(audio_data), "rb") as wav_file:
-        audio_frames = wav_file.readframes(-1)
 
-    # 오디오 프레임을 NumPy 배열로 변환 (int16 형식)
-    return np.frombuffer(
-        audio_frames,
-        dtype=np.int16,
+get_guardrail_cache()
+
+
+@st.cache_resource
+def get_service():
+    # 대화별 활성 Agent/세션을 관리하고 턴을 실행하는 서비스 (프로세스 전체가 공유함)
+    return SupportService(
+        build_conversation_states(get_session_store()),
+        build_pipeline_pool(),
+        span_exporter=get_span_exporter(),
     )
 
 
+@st.cache_resource
+def get_streaming_pipeline_pool():
+    # 스트리밍 모드는 턴 감지 설정이 다르므로 별도의 풀을 사용함
+    return build_pipeline_pool(stt_settings=STREAMING_STT_SETTINGS)
+
+
+# 대화 상태 (활성 Agent, 요약 세션, 컨텍스트)
+# 최근 턴만 그대로 전달하고 오래된 턴은 요약하여 턴당 입력 토큰을 일정하게 유지함
+conversation = get_service().conversation(user_account_ctx, CONVERSATION_ID)
+session = conversation.session
+
+# 사이드바 세션 로그 뷰어가 이미 읽은 항목을 rerun 사이에 유지함
+if "log_reader" not in st.session_state:
+    st.session_state["log_reader"] = SessionLogReader(session.session)
+
+# 파이프라인 풀에서 이 브라우저 세션을 식별하기 위한 키
+if "pipeline_key" not in st.session_state:
+    st.session_state["pipeline_key"] = uuid.uuid4().hex
+
+
+@st.cache_resource
+def get_player_pool():
+    # 브라우저 세션별 오디오 재생기 (스트림을 턴마다 새로 열지 않고, 끝난 세션의 스트림은 닫음)
+    return AudioPlayerPool()
+
+
+def _is_active_session(session_id: str) -> bool:
+    # 런타임이 없으면(bare 실행) 세션 종료를 알 수 없으므로 모두 활성으로 봄
+    return not runtime.exists() or runtime.get_instance().is_active_session(session_id)
+
+
+# 연결이 끊긴 브라우저 세션의 재생기를 정리하고 이 세션의 재생기를 가져옴
+get_player_pool().close_inactive(_is_active_session)
+player = get_player_pool().acquire(STREAMLIT_SESSION_ID)
+
+
 async def run_agent(audio_input):
     """
-    음성 입력을 받아 VoicePipeline을 실행하는 비동기 함수.
-    - 오디오 데이터를 변환
-    - CustomWorkflow을 통해 처리
-    - Guardrail 예외를 처리
+    음성 입력 한 턴을 서비스에 보내고 응답을 재생하는 비동기 함수.
+    - SUPPORT_SERVICE_URL이 있으면 WebSocket으로, 없으면 같은 프로세스의 서비스로 실행
+    - 오디오 변환, 무음 제거, 가드레일 처리는 서비스가 담당함
     """
     # AI 응답 영역 생성
     with st.chat_message("ai"):
         # 처리 상태 표시 UI
         status_container = st.status("⏳ Processing voice message...")
-        try:
-            # 오디오 입력을 NumPy 배열로 변환
-            audio_array = convert_audio(audio_input)
-
-            # AudioInput 객체로 래핑
-            audio = AudioInput(buffer=audio_array)
-
-            # 사용자 컨텍스트를 포함한 커스텀 워크플로우 생성
-            workflow = CustomWorkflow(context=user_account_ctx)
+        # 업로드된 오디오는 복사하지 않고 버퍼(memoryview) 그대로 넘김 (audio_ingest가 헤더만 파싱함)
+        if SERVICE_URL:
+            events = remote_turn(SERVICE_URL, CONVERSATION_ID, user_account_ctx, audio_input.getbuffer())
+        else:
+            events = get_service().run_turn(conversation, audio_input)
 
-            # VoicePipeline 초기화
-            pipeline = VoicePipeline(workflow=workflow)
-
-            # 상태 업데이트: 워크플로우 실행 중
-            status_container.update(label="Running workflow", state="running")
+        playing = False
+        try:
+            async for event in events:
+                if isinstance(event, bytes):
+                    if not playing:
+                        # 세션 재생기 스트림 시작 (이미 열려 있으면 재사용)
+                        # 실제 재생은 오디오 스레드가 담당하므로 이벤트 루프를 막지 않음
+                        player.start()
+                        player.begin_turn()
+                        playing = True
+                    await player.feed(np.frombuffer(event, dtype=np.int16))
+                elif event["type"] == "turn_started":
+                    # 이번 턴의 단계별 span (같은 프로세스에서 실행할 때만 볼 수 있음)
+                    if not SERVICE_URL:
+                        st.session_state["last_turn"] = current_turn()
+                    status_container.update(label="Running workflow", state="running")
+                elif event["type"] == "no_speech":
+                    # 발화가 없으면 모델을 호출하지 않고 종료
+                    status_container.update(label="🔇 No speech detected", state="error")
+                    st.write("음성이 감지되지 않았어요. 다시 말씀해 주세요.")
+                elif event["type"] == "blocked":
+                    status_container.update(state="complete")
+                    if event["guardrail"] == "input":
+                        # 입력 가드레일 트리거 시 차단
+                        st.write("I can't help you with that.")
+                    else:
+                        # 출력 가드레일 트리거 시 차단
+                        st.write("Cant show you that answer.")
+                elif event["type"] == "turn_ended":
+                    status_container.update(
+                        label=f"{event['agent']} · trimmed {event['trimmed_seconds']:.1f}s of silence",
+                        state="complete",
+                    )
+                elif event["type"] == "error":
+                    status_container.update(label=event["message"], state="error")
+        finally:
+            if playing:
+                player.end_turn()
 
-            # 파이프라인 실행 및 결과 비동기 수신
-            result = await pipeline.run(audio)
 
-            # 음성 출력 스트림 초기화 (재생용)
-            player = sd.OutputStream(
-                samplerate=24000,  # 샘플링 레이트
-                channels=1,        # 단일 채널(모노)
-                dtype=np.int16,    # 데이터 타입
-            )
-            player.start()
+async def run_streaming_agent():
+    """
+    마이크 스트리밍 모드로 VoicePipeline을 실행하는 비동기 함수.
+    - 녹음 완료/업로드를 기다리지 않고 청크 단위로 STT에 전달
+    - 발화 종료는 STT 세션의 턴 감지가 결정
+    - 마이크를 직접 열어야 하므로 항상 같은 프로세스에서 실행함
+    - 녹음 모드와 같이 턴 단위 span을 기록하고 내보냄 (사이드바 워터폴에도 표시)
+    """
+    with st.chat_message("ai"):
+        status_container = st.status("🎙️ Listening...")
+        # 같은 대화의 턴은 녹음 모드와 마찬가지로 하나씩 실행함
+        async with conversation.lock:
+            # 파이프라인 태스크가 만들어지기 전에 턴을 시작해야 모든 단계가 같은 턴에 기록됨
+            turn = start_turn()
+            st.session_state["last_turn"] = turn
+            try:
+                await get_service().states.refresh(conversation)
+                pipeline = get_streaming_pipeline_pool().acquire(
+                    st.session_state["pipeline_key"],
+                    user_account_ctx,
+                    conversation,
+                )
+                turns = await run_streaming_conversation(pipeline, player)
+                if turns:
+                    status_container.update(label="Done", state="complete")
+                else:
+                    status_container.update(label="🔇 No speech detected", state="error")
 
-            # 상태 업데이트: 완료 표시
-            status_container.update(state="complete")
+            # 입력 가드레일 트리거 시 차단
+            except InputGuardrailTripwireTriggered:
+                st.write("I can't help you with that.")
 
-            # VoicePipeline에서 반환된 이벤트 스트림을 실시간으로 재생
-            async for event in result.stream():
-                if event.type == "voice_stream_event_audio":
-                    player.write(event.data)
+            # 출력 가드레일 트리거 시 차단
+            except OutputGuardrailTripwireTriggered:
+                st.write("Cant show you that answer.")
 
-        # 입력 가드레일 트리거 시 차단
-        except InputGuardrailTripwireTriggered:
-            st.write("I can't help you with that.")
+            finally:
+                await get_service().states.save(conversation)
+                turn.finish()
+                get_span_exporter().export(turn)
 
-        # 출력 가드레일 트리거 시 차단
-        except OutputGuardrailTripwireTriggered:
-            st.write("Cant show you that answer.")
 
+# 입력 모드 선택: 녹음 후 전송(기본) 또는 마이크 스트리밍
+streaming_mode = st.sidebar.toggle("Streaming microphone mode")
 
-# Streamlit 오디오 입력 컴포넌트 (마이크 녹음용)
-audio_input = st.audio_input(
-    "Record your message",
-)
+if streaming_mode:
+    # 버튼을 누르면 바로 마이크를 열고 발화가 끝나는 즉시 응답함
+    if st.button("🎙️ Talk"):
+        asyncio.run(run_streaming_agent())
+else:
+    # Streamlit 오디오 입력 컴포넌트 (마이크 녹음용)
+    audio_input = st.audio_input(
+        "Record your message",
+    )
 
-# 사용자가 오디오를 입력한 경우 실행
-if audio_input:
-    # 사용자의 음성 입력을 채팅 형태로 표시
-    with st.chat_message("human"):
-        st.audio(audio_input)
-    # 비동기 파이프라인 실행
-    asyncio.run(run_agent(audio_input))
+    # 사용자가 오디오를 입력한 경우 실행
+    if audio_input:
+        # 사용자의 음성 입력을 채팅 형태로 표시
+        with st.chat_message("human"):
+            st.audio(audio_input)
+        # 비동기 파이프라인 실행
+        asyncio.run(run_agent(audio_input))
 
 
 # 사이드바 영역
@@ -135,6 +247,58 @@ with st.sidebar:
     # 메모리(세션) 초기화 버튼
     reset = st.button("Reset memory")
     if reset:
-        asyncio.run(session.clear_session())  # 세션 데이터 삭제
-    # 세션 로그 조회
-    st.write(asyncio.run(session.get_items()))
+        # 세션 데이터 삭제 후 진입 Agent부터 다시 시작
+        if SERVICE_URL:
+            asyncio.run(remote_reset(SERVICE_URL, CONVERSATION_ID, user_account_ctx))
+        else:
+            asyncio.run(get_service().reset(conversation))
+        st.session_state["log_reader"].reset()
+        get_streaming_pipeline_pool().release(st.session_state["pipeline_key"])
+    # 마지막 턴의 단계별 지연 시간 워터폴
+    if "last_turn" in st.session_state:
+        render_waterfall(st.session_state["last_turn"])
+    # 재생 상태 (underrun이 잦으면 pre-roll을 늘려야 함)
+    st.caption(
+        f"Playback underruns: {player.stats.underruns} · "
+        f"played: {player.stats.samples_played / player.samplerate:.1f}s"
+    )
+    # 로컬 사전 분류기가 LLM 가드레일 호출 없이 판정한 비율
+    st.caption(
+        f"Topic pre-classifier hit rate: {topic_classifier.stats.hit_rate:.0%} "
+        f"({topic_classifier.stats.total} checks)"
+    )
+    # 가드레일 판정 캐시 적중률
+    cache_stats = get_guardrail_cache().stats
+    st.caption(
+        f"Guardrail cache hit rate: {cache_stats.hit_rate:.0%} "
+        f"({cache_stats.hits} hits / {cache_stats.misses} misses)"
+    )
+    # 읽기 전용 도구(주문/결제 조회 등) 결과 캐시 적중률
+    tool_stats = get_tool_cache().stats
+    st.caption(
+        f"Tool cache hit rate: {tool_stats.hit_rate:.0%} "
+        f"({tool_stats.hits} hits / {tool_stats.invalidations} invalidated)"
+    )
+    # 도구별 실행 시간 (한 응답의 조회 도구는 동시에 실행되므로 턴 시간은 합계보다 짧음)
+    with st.expander("Tool timings"):
+        st.table(
+            [
+                {"tool": name, "calls": timing.calls, "mean_ms": round(timing.mean_ms, 1), "max_ms": round(timing.max_ms, 1)}
+                for name, timing in get_tool_timings().snapshot().items()
+            ]
+        )
+    # Agent/등급별 프롬프트 토큰 수 (prefix: 고객 간 공유되어 캐시되는 부분)
+    with st.expander("Prompt tokens"):
+        st.table(
+            [
+                {
+                    "agent": stats.agent,
+                    "tier": stats.tier,
+                    "prefix": stats.prefix_tokens,
+                    "suffix": stats.suffix_tokens,
+                }
+                for stats in prompt_token_report()
+            ]
+        )
+    # 세션 로그 조회 (요약 전 원본 기록, 새로 추가된 항목만 읽어 페이지 단위로 표시)
+    render_session_log(st.session_state["log_reader"])
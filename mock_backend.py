@@ -0,0 +1,286 @@
+"""
+주문/결제/계정(identity) 백엔드의 로컬 대체 서버.
+
+도메인 저장소(domain_store)를 HTTP로 노출하고, 실제 서비스처럼 응답 지연과 장애를 흉내 냄.
+- 지연: 로그 정규 분포 (중앙값 --latency-ms, 꼬리 --jitter)
+- 장애: --failure-rate 비율로 503 응답, --stall-rate 비율로 --stall-seconds 동안 응답 지연
+- 변경 요청(POST)은 Idempotency-Key 헤더로 중복 처리를 막음 (재시도해도 한 번만 반영)
+
+실행:
+    python mock_backend.py --port 8790 --latency-ms 40 --failure-rate 0.05
+    SUPPORT_BACKEND_URL=http://127.0.0.1:8790 streamlit run main.py
+"""
+import argparse
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from domain_store import DEFAULT_DB_PATH, DomainStore, get_domain_store
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8790
+# 기억해 둘 Idempotency-Key 응답 수
+IDEMPOTENCY_CACHE_SIZE = 10000
+
+
+@dataclass
+class FaultProfile:
+    latency_ms: float = 40.0
+    # 로그 정규 분포의 sigma (클수록 꼬리 지연이 길어짐)
+    jitter: float = 0.5
+    failure_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall_seconds: float = 5.0
+
+    @classmethod
+    def instant(cls) -> "FaultProfile":
+        return cls(latency_ms=0.0, jitter=0.0)
+
+    def delay(self, rng: random.Random) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self.latency_ms / 1000 * math.exp(rng.gauss(0, self.jitter))
+
+
+class MockBackend:
+    """
+    세 백엔드를 하나의 서버에서 경로 접두사(/orders, /billing, /identity)로 나누어 제공함.
+    """
+
+    def __init__(self, store: DomainStore | None = None, profile: FaultProfile | None = None, seed: int | None = None):
+        self.store = store or get_domain_store()
+        self.profile = profile or FaultProfile()
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.injected_failures = 0
+        self.injected_stalls = 0
+        # Idempotency-Key -> (상태 코드, 응답)을 담을 future (서버 이벤트 루프 안에서만 사용함)
+        self._idempotent: OrderedDict[str, asyncio.Future] = OrderedDict()
+
+    def endpoint(self, handler):
+        # 지연/장애 주입 + Idempotency-Key 처리를 핸들러에 씌움
+        async def endpoint(request):
+            self.requests += 1
+            # 본문은 먼저 읽어 둠 (멈춘 사이 클라이언트가 연결을 끊어도 요청은 끝까지 처리됨)
+            body = await request.json() if request.method == "POST" else {}
+            # 같은 키의 요청이 처리 중이거나 끝났으면 그 결과를 그대로 돌려줌
+            # (원 요청이 멈춘 사이 클라이언트가 타임아웃 후 재시도해도 한 번만 반영됨)
+            key = request.headers.get("idempotency-key")
+            if key is not None:
+                pending = self._idempotent.get(key)
+                if pending is not None:
+                    status_code, result = await asyncio.shield(pending)
+                    return JSONResponse(result, status_code=status_code)
+                pending = self._idempotent[key] = asyncio.get_running_loop().create_future()
+                while len(self._idempotent) > IDEMPOTENCY_CACHE_SIZE:
+                    self._idempotent.popitem(last=False)
+
+            try:
+                profile = self.profile
+                if self.rng.random() < profile.failure_rate:
+                    # 처리하지 않은 실패이므로 같은 키로 다시 시도할 수 있음
+                    self.injected_failures += 1
+                    await asyncio.sleep(profile.delay(self.rng))
+                    if key is not None:
+                        self._idempotent.pop(key, None)
+                        pending.set_result((503, {"error": "injected failure"}))
+                    return JSONResponse({"error": "injected failure"}, status_code=503)
+                if self.rng.random() < profile.stall_rate:
+                    self.injected_stalls += 1
+                    await asyncio.sleep(profile.stall_seconds)
+                await asyncio.sleep(profile.delay(self.rng))
+
+                status_code, result = handler(request.path_params, request.query_params, body)
+            except BaseException:
+                if key is not None:
+                    self._idempotent.pop(key, None)
+                    pending.set_result((500, {"error": "request failed"}))
+                raise
+            if key is not None:
+                pending.set_result((status_code, result))
+            return JSONResponse(result, status_code=status_code)
+
+        return endpoint
+
+    # -------------------------------------------------------------------------
+    # orders
+    # -------------------------------------------------------------------------
+
+    def get_order(self, path, query, body):
+        order = self.store.order(path["customer_id"], path["order_number"])
+        if order is None:
+            return 404, {"error": "order not found"}
+        return 200, dict(order)
+
+    def create_return(self, path, query, body):
+        customer_id = path["customer_id"]
+        order = self.store.order(customer_id, path["order_number"])
+        if order is None:
+            return 404, {"error": "order not found"}
+        self.store.update_order(customer_id, order["order_number"], "return_requested")
+        return_id = self.store.add_ticket(
+            customer_id, "return", f"{body['reason']} ({body['items']})", reference=order["order_number"]
+        )
+        return 200, {"return_id": return_id, "order_number": order["order_number"]}
+
+    def expedite(self, path, query, body):
+        order = self.store.order(path["customer_id"], path["order_number"])
+        if order is None or not order["tracking_number"]:
+            return 404, {"error": "shipment not found"}
+        self.store.update_shipment(
+            order["tracking_number"],
+            service_level="next_day",
+            estimated_delivery=(date.today() + timedelta(days=1)).isoformat(),
+        )
+        return 200, {"order_number": order["order_number"]}
+
+    def redelivery(self, path, query, body):
+        customer_id = path["customer_id"]
+        shipment = self.store.shipment(customer_id, path["tracking_number"])
+        if shipment is None:
+            return 404, {"error": "shipment not found"}
+        self.store.update_shipment(shipment["tracking_number"], status="redelivery_scheduled")
+        self.store.add_ticket(
+            customer_id, "redelivery", body["preferred_date"], reference=shipment["tracking_number"]
+        )
+        return 200, {"tracking_number": shipment["tracking_number"]}
+
+    # -------------------------------------------------------------------------
+    # billing
+    # -------------------------------------------------------------------------
+
+    def get_invoices(self, path, query, body):
+        invoices = self.store.invoices(path["customer_id"], int(query.get("months_back", 6)))
+        return 200, [dict(invoice) for invoice in invoices]
+
+    def create_refund(self, path, query, body):
+        refund_id = self.store.add_refund(path["customer_id"], "refund", body["amount"], body["reason"], "processing")
+        return 200, {"refund_id": refund_id}
+
+    def create_credit(self, path, query, body):
+        credit_id = self.store.add_refund(path["customer_id"], "credit", body["amount"], body["reason"], "applied")
+        return 200, {"credit_id": credit_id}
+
+    def payment_method(self, path, query, body):
+        ticket_id = self.store.add_ticket(path["customer_id"], "payment_method", body["payment_type"])
+        return 200, {"ticket_id": ticket_id}
+
+    # -------------------------------------------------------------------------
+    # identity
+    # -------------------------------------------------------------------------
+
+    def password_reset(self, path, query, body):
+        ticket_id = self.store.add_ticket(path["customer_id"], "password_reset", body["email"])
+        return 200, {"ticket_id": ticket_id}
+
+    def two_factor(self, path, query, body):
+        if not self.store.update_customer(path["customer_id"], two_factor_method=body["method"].lower()):
+            return 404, {"error": "customer not found"}
+        return 200, {"method": body["method"].lower()}
+
+    def email_change(self, path, query, body):
+        ticket_id = self.store.add_ticket(
+            path["customer_id"], "email_change", f"{body['old_email']} → {body['new_email']}"
+        )
+        return 200, {"ticket_id": ticket_id}
+
+    def deactivation(self, path, query, body):
+        customer_id = path["customer_id"]
+        self.store.update_customer(customer_id, status="deactivation_pending")
+        ticket_id = self.store.add_ticket(
+            customer_id, "deactivation", f"{body['reason']} / {body.get('feedback') or '-'}"
+        )
+        return 200, {"ticket_id": ticket_id}
+
+    def export(self, path, query, body):
+        export_id = self.store.add_ticket(path["customer_id"], "export", body["data_types"])
+        return 200, {"export_id": export_id}
+
+    def app(self) -> Starlette:
+        def route(path, handler, method="POST"):
+            return Route(path, self.endpoint(handler), methods=[method])
+
+        return Starlette(
+            routes=[
+                Route("/healthz", lambda request: JSONResponse({"requests": self.requests})),
+                Mount(
+                    "/orders/{customer_id:int}",
+                    routes=[
+                        route("/orders/{order_number}", self.get_order, "GET"),
+                        route("/orders/{order_number}/return", self.create_return),
+                        route("/orders/{order_number}/expedite", self.expedite),
+                        route("/shipments/{tracking_number}/redelivery", self.redelivery),
+                    ],
+                ),
+                Mount(
+                    "/billing/{customer_id:int}",
+                    routes=[
+                        route("/invoices", self.get_invoices, "GET"),
+                        route("/refunds", self.create_refund),
+                        route("/credits", self.create_credit),
+                        route("/payment-method", self.payment_method),
+                    ],
+                ),
+                Mount(
+                    "/identity/{customer_id:int}",
+                    routes=[
+                        route("/password-reset", self.password_reset),
+                        route("/two-factor", self.two_factor),
+                        route("/email-change", self.email_change),
+                        route("/deactivation", self.deactivation),
+                        route("/exports", self.export),
+                    ],
+                ),
+            ]
+        )
+
+
+def serve_in_background(backend: MockBackend, host: str = DEFAULT_HOST, port: int = 0):
+    """
+    별도 스레드(자체 이벤트 루프)에서 서버를 띄우고 (uvicorn.Server, 주소)를 반환함.
+    port=0이면 빈 포트를 사용함. 종료는 server.should_exit = True.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(backend.app(), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="mock-backend", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("mock backend failed to start")
+        time.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://{host}:{bound_port}"
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="도메인 데이터 저장소 경로")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="응답 지연 중앙값(ms)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="지연 분포의 꼬리 (로그 정규 sigma)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="503으로 응답할 비율")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="--stall-seconds 동안 멈출 비율")
+    parser.add_argument("--stall-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    store = DomainStore(args.db) if args.db != DEFAULT_DB_PATH else get_domain_store()
+    profile = FaultProfile(args.latency_ms, args.jitter, args.failure_rate, args.stall_rate, args.stall_seconds)
+    uvicorn.run(MockBackend(store, profile).app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 from agents import Agent, RunContextWrapper
 from models import UserAccountContext
+from instruction_compiler import compile_instructions
+from tool_execution import PARALLEL_TOOL_SETTINGS, schedule_tools
+from async_tools import select_tools
 from tools import (
     reset_user_password,
     enable_two_factor_auth,
@@ -9,19 +12,10 @@ from tools import (
     AgentToolUsageLoggingHooks,
 )
 
-# 계정 관리(Account Management) 담당 에이전트의 프롬프트를 동적으로 생성하는 함수
-# wrapper: 실행 컨텍스트 객체로, 내부에 UserAccountContext를 포함함
-#           → 고객 이름(name), 등급(tier) 등의 정보를 가지고 있음
-# agent: 현재 실행 중인 Agent 객체 (여기서는 시그니처 일관성 유지를 위해 포함)
-def dynamic_account_agent_instructions(
-    wrapper: RunContextWrapper[UserAccountContext],
-    agent: Agent[UserAccountContext],
-):
-    # f-string을 사용하여 wrapper.context에 들어 있는 사용자 정보를 프롬프트 문자열에 삽입
-    # tier가 "basic"이 아닐 경우 "(Premium Account Services)" 문구를 추가로 포함함
+# 모든 고객이 공유하는 고정 본문 (등급(tier)별로 한 번만 생성됨)
+def _account_instructions_body(tier: str) -> str:
     return f"""
-    당신은 {wrapper.context.name} 님을 지원하는 계정 관리(Account Management) 전문 담당자입니다.
-    고객 등급: {wrapper.context.tier} {"(Premium Account Services)" if wrapper.context.tier != "basic" else ""}
+    당신은 고객을 지원하는 계정 관리(Account Management) 전문 담당자입니다.
 
     역할: 계정 접근, 보안, 프로필 관리 관련 문제를 처리하는 것입니다.
 
@@ -51,10 +45,38 @@ def dynamic_account_agent_instructions(
     - 데이터 내보내기(Export) 기능
     - 계정 백업 및 복구 기능
 
-    {"프리미엄 기능: 강화된 보안 옵션 및 우선 복구 서비스 제공." if wrapper.context.tier != "basic" else ""}
+    {"프리미엄 기능: 강화된 보안 옵션 및 우선 복구 서비스 제공." if tier != "basic" else ""}
+    """
+
+
+# 고객별 정보는 프롬프트 끝에 붙여 앞부분(prefix)을 고객 간에 동일하게 유지함
+def _account_instructions_suffix(context: UserAccountContext) -> str:
+    return f"""
+    고객 정보:
+    - 이름: {context.name} 님
+    - 고객 등급: {context.tier} {"(Premium Account Services)" if context.tier != "basic" else ""}
     """
 
 
+account_instructions = compile_instructions(
+    "Account Management Agent",
+    _account_instructions_body,
+    _account_instructions_suffix,
+)
+
+
+# 계정 관리(Account Management) 담당 에이전트의 프롬프트를 동적으로 생성하는 함수
+# wrapper: 실행 컨텍스트 객체로, 내부에 UserAccountContext를 포함함
+#           → 고객 이름(name), 등급(tier) 등의 정보를 가지고 있음
+# agent: 현재 실행 중인 Agent 객체 (여기서는 시그니처 일관성 유지를 위해 포함)
+def dynamic_account_agent_instructions(
+    wrapper: RunContextWrapper[UserAccountContext],
+    agent: Agent[UserAccountContext],
+):
+    # 등급별 본문 + 고객 정보를 이어 붙인 프롬프트 (고객 컨텍스트별로 메모이즈됨)
+    return account_instructions.render(wrapper.context)
+
+
 # 실제 계정 관리 에이전트 정의
 # instructions 인자로 dynamic_account_agent_instructions 함수를 전달함
 # 에이전트가 실행될 때 wrapper.context를 바탕으로 위 함수가 호출되어,
@@ -62,12 +84,19 @@ def dynamic_account_agent_instructions(
 account_agent = Agent(
     name="Account Management Agent",
     instructions=dynamic_account_agent_instructions,
-    tools=[
-        reset_user_password,
-        enable_two_factor_auth,
-        update_account_email,
-        deactivate_account,
-        export_account_data,
-    ],
+    # SUPPORT_BACKEND_URL이 있으면 HTTP 백엔드를 호출하는 비동기 버전을 사용함
+    tools=schedule_tools(
+        select_tools(
+            [
+                reset_user_password,
+                enable_two_factor_auth,
+                update_account_email,
+                deactivate_account,
+                export_account_data,
+            ]
+        )
+    ),
+    # 모델이 한 번에 여러 도구를 호출할 수 있도록 허용함
+    model_settings=PARALLEL_TOOL_SETTINGS,
     hooks=AgentToolUsageLoggingHooks(),
 )
@@ -1,5 +1,8 @@
 from agents import Agent, RunContextWrapper
 from models import UserAccountContext
+from instruction_compiler import compile_instructions
+from tool_execution import PARALLEL_TOOL_SETTINGS, schedule_tools
+from async_tools import select_tools
 from tools import (
     lookup_billing_history,
     process_refund_request,
@@ -8,19 +11,10 @@ from tools import (
     AgentToolUsageLoggingHooks,
 )
 
-# 결제 및 청구 관련 문제를 처리하는 Billing Support 에이전트의 프롬프트를 동적으로 생성하는 함수
-# wrapper: 실행 컨텍스트 객체 (UserAccountContext 포함)
-#          → 사용자 이름(name), 등급(tier) 등의 정보를 포함
-# agent: 현재 실행 중인 Agent 객체 (시그니처 일관성 유지용으로 전달)
-def dynamic_billing_agent_instructions(
-    wrapper: RunContextWrapper[UserAccountContext],
-    agent: Agent[UserAccountContext],
-):
-    # f-string을 사용해 사용자별 이름(name)과 tier(등급)를 프롬프트에 삽입함
-    # tier가 "basic"이 아닐 경우 "Premium Billing Support" 문구를 추가로 포함시킴
+# 모든 고객이 공유하는 고정 본문 (등급(tier)별로 한 번만 생성됨)
+def _billing_instructions_body(tier: str) -> str:
     return f"""
-    당신은 {wrapper.context.name} 님을 지원하는 결제 지원(Billing Support) 전문 담당자입니다.
-    고객 등급: {wrapper.context.tier} {"(Premium Billing Support)" if wrapper.context.tier != "basic" else ""}
+    당신은 고객을 지원하는 결제 지원(Billing Support) 전문 담당자입니다.
 
     역할: 고객의 결제, 환불, 구독 관련 문제를 해결하는 것입니다.
 
@@ -44,21 +38,56 @@ def dynamic_billing_agent_instructions(
     - 모든 청구 내역은 명확히 설명해야 함
     - 필요 시 할부 또는 결제 계획 옵션을 제시
 
-    {"프리미엄 혜택: 환불 우선 처리 및 유연한 결제 옵션 제공." if wrapper.context.tier != "basic" else ""}
+    {"프리미엄 혜택: 환불 우선 처리 및 유연한 결제 옵션 제공." if tier != "basic" else ""}
+    """
+
+
+# 고객별 정보는 프롬프트 끝에 붙여 앞부분(prefix)을 고객 간에 동일하게 유지함
+def _billing_instructions_suffix(context: UserAccountContext) -> str:
+    return f"""
+    고객 정보:
+    - 이름: {context.name} 님
+    - 고객 등급: {context.tier} {"(Premium Billing Support)" if context.tier != "basic" else ""}
     """
 
 
+billing_instructions = compile_instructions(
+    "Billing Support Agent",
+    _billing_instructions_body,
+    _billing_instructions_suffix,
+)
+
+
+# 결제 및 청구 관련 문제를 처리하는 Billing Support 에이전트의 프롬프트를 동적으로 생성하는 함수
+# wrapper: 실행 컨텍스트 객체 (UserAccountContext 포함)
+#          → 사용자 이름(name), 등급(tier) 등의 정보를 포함
+# agent: 현재 실행 중인 Agent 객체 (시그니처 일관성 유지용으로 전달)
+def dynamic_billing_agent_instructions(
+    wrapper: RunContextWrapper[UserAccountContext],
+    agent: Agent[UserAccountContext],
+):
+    # 등급별 본문 + 고객 정보를 이어 붙인 프롬프트 (고객 컨텍스트별로 메모이즈됨)
+    return billing_instructions.render(wrapper.context)
+
+
 # 실제 Billing Support 에이전트 정의
 # instructions로 위에서 정의한 dynamic_billing_agent_instructions 함수를 전달함
 # 실행 시 wrapper.context의 사용자 정보(name, tier 등)를 기반으로 프롬프트를 동적으로 구성함
 billing_agent = Agent(
     name="Billing Support Agent",
     instructions=dynamic_billing_agent_instructions,
-    tools=[
-        lookup_billing_history,
-        process_refund_request,
-        update_payment_method,
-        apply_billing_credit,
-    ],
+    # SUPPORT_BACKEND_URL이 있으면 HTTP 백엔드를 호출하는 비동기 버전을 사용함
+    tools=schedule_tools(
+        select_tools(
+            [
+                lookup_billing_history,
+                process_refund_request,
+                update_payment_method,
+                apply_billing_credit,
+            ]
+        )
+    ),
+    # 한 응답에 담긴 여러 도구 호출을 함께 실행함 (변경 도구는 순서대로)
+    model_settings=PARALLEL_TOOL_SETTINGS,
     hooks=AgentToolUsageLoggingHooks(),
 )
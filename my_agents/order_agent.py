@@ -1,5 +1,8 @@
 from agents import Agent, RunContextWrapper
 from models import UserAccountContext
+from instruction_compiler import compile_instructions
+from tool_execution import PARALLEL_TOOL_SETTINGS, schedule_tools
+from async_tools import select_tools
 from tools import (
     lookup_order_status,
     initiate_return_process,
@@ -9,19 +12,10 @@ from tools import (
 )
 
 
-# 주문 관리(Order Management) 에이전트의 프롬프트를 동적으로 생성하는 함수
-# wrapper: 실행 컨텍스트 객체로, UserAccountContext 타입을 포함함
-#          → 사용자 이름(name), 등급(tier) 등의 정보가 들어 있음
-# agent: 현재 실행 중인 Agent 객체 (함수 시그니처 일관성 유지용)
-def dynamic_order_agent_instructions(
-    wrapper: RunContextWrapper[UserAccountContext],
-    agent: Agent[UserAccountContext],
-):
-    # f-string을 이용해 사용자별 정보를 동적으로 삽입
-    # tier가 "basic"이 아닐 경우 "Premium Shipping" 문구를 함께 표시함
+# 모든 고객이 공유하는 고정 본문 (등급(tier)별로 한 번만 생성됨)
+def _order_instructions_body(tier: str) -> str:
     return f"""
-    당신은 {wrapper.context.name} 님을 지원하는 주문 관리(Order Management) 전문 담당자입니다.
-    고객 등급: {wrapper.context.tier} {"(Premium Shipping)" if wrapper.context.tier != "basic" else ""}
+    당신은 고객을 지원하는 주문 관리(Order Management) 전문 담당자입니다.
 
     역할: 고객의 주문 상태, 배송, 반품, 교환, 배송 관련 문제를 처리합니다.
 
@@ -44,21 +38,56 @@ def dynamic_order_agent_instructions(
     - 교환 서비스 가능
     - 환불 처리 기간: 영업일 기준 3~5일
 
-    {"프리미엄 혜택: 무료 특급 배송 및 반품, 우선 처리 대상." if wrapper.context.tier != "basic" else ""}
+    {"프리미엄 혜택: 무료 특급 배송 및 반품, 우선 처리 대상." if tier != "basic" else ""}
+    """
+
+
+# 고객별 정보는 프롬프트 끝에 붙여 앞부분(prefix)을 고객 간에 동일하게 유지함
+def _order_instructions_suffix(context: UserAccountContext) -> str:
+    return f"""
+    고객 정보:
+    - 이름: {context.name} 님
+    - 고객 등급: {context.tier} {"(Premium Shipping)" if context.tier != "basic" else ""}
     """
 
 
+order_instructions = compile_instructions(
+    "Order Management Agent",
+    _order_instructions_body,
+    _order_instructions_suffix,
+)
+
+
+# 주문 관리(Order Management) 에이전트의 프롬프트를 동적으로 생성하는 함수
+# wrapper: 실행 컨텍스트 객체로, UserAccountContext 타입을 포함함
+#          → 사용자 이름(name), 등급(tier) 등의 정보가 들어 있음
+# agent: 현재 실행 중인 Agent 객체 (함수 시그니처 일관성 유지용)
+def dynamic_order_agent_instructions(
+    wrapper: RunContextWrapper[UserAccountContext],
+    agent: Agent[UserAccountContext],
+):
+    # 등급별 본문 + 고객 정보를 이어 붙인 프롬프트 (고객 컨텍스트별로 메모이즈됨)
+    return order_instructions.render(wrapper.context)
+
+
 # 실제 주문 관리 에이전트 정의
 # instructions로 위에서 정의한 dynamic_order_agent_instructions를 전달함
 # 이 에이전트는 실행 시 wrapper.context를 기반으로 고객 맞춤형 프롬프트를 생성함
 order_agent = Agent(
     name="Order Management Agent",
     instructions=dynamic_order_agent_instructions,
-    tools=[
-        lookup_order_status,
-        initiate_return_process,
-        schedule_redelivery,
-        expedite_shipping,
-    ],
+    # SUPPORT_BACKEND_URL이 있으면 HTTP 백엔드를 호출하는 비동기 버전을 사용함
+    tools=schedule_tools(
+        select_tools(
+            [
+                lookup_order_status,
+                initiate_return_process,
+                schedule_redelivery,
+                expedite_shipping,
+            ]
+        )
+    ),
+    # 한 응답의 독립적인 조회(예: 여러 주문 조회)를 동시에 실행함
+    model_settings=PARALLEL_TOOL_SETTINGS,
     hooks=AgentToolUsageLoggingHooks(),
 )
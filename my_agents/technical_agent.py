@@ -1,5 +1,7 @@
 from agents import Agent, RunContextWrapper
 from models import UserAccountContext
+from instruction_compiler import compile_instructions
+from tool_execution import PARALLEL_TOOL_SETTINGS, schedule_tools
 from tools import (
     run_diagnostic_check,
     provide_troubleshooting_steps,
@@ -10,18 +12,10 @@ from output_guardrails import technical_output_guardrail
 
 
 
-# 기술 지원(Technical Support) 담당 에이전트의 프롬프트를 동적으로 생성하는 함수
-# wrapper: 실행 컨텍스트, 여기서 wrapper.context는 UserAccountContext 타입이며
-# name, tier 등 사용자 정보가 들어 있음
-# agent: 현재 실행 중인 Agent 객체 (여기서는 사용되지 않지만 시그니처 일관성 유지용)
-def dynamic_technical_agent_instructions_kr(
-    wrapper: RunContextWrapper[UserAccountContext],
-    agent: Agent[UserAccountContext],
-):
-    # tier가 "basic"이 아니면 Premium Support 문구 추가
+# 모든 고객이 공유하는 고정 본문 (등급(tier)별로 한 번만 생성됨)
+def _technical_instructions_body(tier: str) -> str:
     return f"""
-    당신은 {wrapper.context.name} 님을 지원하는 기술 지원(Technical Support) 전문 담당자입니다.
-    고객 등급: {wrapper.context.tier} {"(Premium Support)" if wrapper.context.tier != "basic" else ""}
+    당신은 고객을 지원하는 기술 지원(Technical Support) 전문 담당자입니다.
 
     역할: 당사 제품과 서비스와 관련된 기술적 문제를 해결합니다.
 
@@ -45,21 +39,53 @@ def dynamic_technical_agent_instructions_kr(
     - 다음 단계로 넘어가기 전 각 단계가 작동하는지 확인합니다.
     - 향후 참고를 위해 해결 절차를 문서화합니다.
 
-    {"프리미엄 우선 처리: 표준 해결책이 효과가 없을 때는 선임 엔지니어로 직접 에스컬레이션을 제안합니다." if wrapper.context.tier != "basic" else ""}
+    {"프리미엄 우선 처리: 표준 해결책이 효과가 없을 때는 선임 엔지니어로 직접 에스컬레이션을 제안합니다." if tier != "basic" else ""}
+    """
+
+
+# 고객별 정보는 프롬프트 끝에 붙여 앞부분(prefix)을 고객 간에 동일하게 유지함
+def _technical_instructions_suffix(context: UserAccountContext) -> str:
+    return f"""
+    고객 정보:
+    - 이름: {context.name} 님
+    - 고객 등급: {context.tier} {"(Premium Support)" if context.tier != "basic" else ""}
     """
 
 
+technical_instructions = compile_instructions(
+    "Technical Support Agent",
+    _technical_instructions_body,
+    _technical_instructions_suffix,
+)
+
+
+# 기술 지원(Technical Support) 담당 에이전트의 프롬프트를 동적으로 생성하는 함수
+# wrapper: 실행 컨텍스트, 여기서 wrapper.context는 UserAccountContext 타입이며
+# name, tier 등 사용자 정보가 들어 있음
+# agent: 현재 실행 중인 Agent 객체 (여기서는 사용되지 않지만 시그니처 일관성 유지용)
+def dynamic_technical_agent_instructions_kr(
+    wrapper: RunContextWrapper[UserAccountContext],
+    agent: Agent[UserAccountContext],
+):
+    # 등급별 본문 + 고객 정보를 이어 붙인 프롬프트 (고객 컨텍스트별로 메모이즈됨)
+    return technical_instructions.render(wrapper.context)
+
+
 # 실제 기술 지원 에이전트 정의
 # instructions에 위에서 정의한 dynamic_technical_agent_instructions_kr 함수를 전달함
 # 이 에이전트는 실행 시 wrapper.context를 받아, 그에 맞는 개인화된 프롬프트를 생성함
 technical_agent = Agent(
     name="Technical Support Agent",
     instructions=dynamic_technical_agent_instructions_kr,
-    tools=[
-        run_diagnostic_check,
-        provide_troubleshooting_steps,
-        escalate_to_engineering,
-    ],
+    tools=schedule_tools(
+        [
+            run_diagnostic_check,
+            provide_troubleshooting_steps,
+            escalate_to_engineering,
+        ]
+    ),
+    # 진단/트러블슈팅 안내를 한 응답에서 함께 요청할 수 있음
+    model_settings=PARALLEL_TOOL_SETTINGS,
     hooks=AgentToolUsageLoggingHooks(),
     output_guardrails=[
         technical_output_guardrail,
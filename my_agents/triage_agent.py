@@ -1,4 +1,3 @@
-import streamlit as st
 from agents import (
     Agent,
     RunContextWrapper,
@@ -15,6 +14,12 @@ from my_agents.account_agent import account_agent
 from my_agents.technical_agent import technical_agent
 from my_agents.order_agent import order_agent
 from my_agents.billing_agent import billing_agent
+from guardrail_cache import get_guardrail_cache, guardrail_version
+from providers import get_run_config
+from fast_router import FastRouter
+from instruction_compiler import compile_instructions
+from topic_classifier import TopicClassifier, parse_instruction_seeds
+from turn_tracing import current_turn, stage_span
 
 # 입력 필터 역할을 하는 에이전트 정의
 # 사용자의 입력이 서비스 범위(계정/결제/주문/기술지원)에 포함되는지 확인함
@@ -44,35 +49,56 @@ async def off_topic_guardrail(
     # agent: 현재 호출 중인 에이전트
     # input: 사용자의 입력 텍스트
 
-    # Runner.run을 통해 Guardrail Agent 실행
-    result = await Runner.run(
-        input_guardrail_agent,
-        input,
-        context=wrapper.context,
-    )
+    # 로컬 분류기가 확신하는 입력은 LLM 호출 없이 바로 판정함
+    if isinstance(input, str):
+        with stage_span("input_guardrail", "topic_classifier") as span:
+            verdict = topic_classifier.classify(input)
+            if span is not None:
+                span.attributes.update(label=verdict.label, source=verdict.source)
+        if verdict.is_confident:
+            output = InputGuardRailOutput(
+                is_off_topic=verdict.label == "off_topic",
+                reason=verdict.reason,
+            )
+            return GuardrailFunctionOutput(
+                output_info=output,
+                tripwire_triggered=output.is_off_topic,
+            )
+
+    # 같은 입력(정규화 기준)에 대한 이전 판정이 있으면 재사용함
+    cache = get_guardrail_cache()
+    run_config = get_run_config()
+    version = guardrail_version(input_guardrail_agent, run_config)
+    verdict_output = None
+    if isinstance(input, str):
+        verdict_output = await cache.aget("off_topic", version, input, InputGuardRailOutput)
+
+    if verdict_output is None:
+        # 애매한 입력만 Runner.run을 통해 Guardrail Agent 실행
+        with stage_span("input_guardrail", "off_topic_guardrail"):
+            result = await Runner.run(
+                input_guardrail_agent,
+                input,
+                context=wrapper.context,
+                run_config=run_config,
+            )
+        verdict_output = result.final_output
+        if isinstance(input, str):
+            await cache.aput("off_topic", version, input, verdict_output)
 
     # 결과를 GuardrailFunctionOutput 형태로 변환하여 반환
     # tripwire_triggered가 True면 off-topic으로 간주됨
     return GuardrailFunctionOutput(
-        output_info=result.final_output,
-        tripwire_triggered=result.final_output.is_off_topic,
+        output_info=verdict_output,
+        tripwire_triggered=verdict_output.is_off_topic,
     )
 
 
-# 고객 요청을 받아 적절한 담당 에이전트로 라우팅하기 위한 메인 지침 생성 함수
-def dynamic_triage_agent_instructions(
-    wrapper: RunContextWrapper[UserAccountContext],
-    agent: Agent[UserAccountContext],
-):
-    # wrapper.context에는 사용자 이름, 이메일, tier 등의 정보가 포함됨
-    # 이 정보를 이용해 프롬프트를 동적으로 구성함
+# 모든 고객이 공유하는 분류 지침 본문 (고객 정보가 없어 등급과 무관하게 동일함)
+def _triage_instructions_body(tier: str) -> str:
     return f"""
     당신은 고객 지원 에이전트입니다. 당신의 임무는 **사용자 계정, 결제, 주문, 기술 지원과 관련된 고객 문의만** 돕는 것입니다.
-    고객을 부를 때는 반드시 이름을 사용하세요.
-    
-    고객의 이름: {wrapper.context.name}
-    고객의 이메일: {wrapper.context.email}
-    고객의 서비스 등급(tier): {wrapper.context.tier}
+    고객을 부를 때는 반드시 이름을 사용하세요. (고객 정보는 지침 마지막에 있습니다)
     
     주요 역할:
     고객의 문제를 정확히 분류하여 올바른 전문 담당자에게 연결하는 것
@@ -122,19 +148,53 @@ def dynamic_triage_agent_instructions(
     - 불분명한 경우 1~2개의 명확한 질문으로 확인 후 분류
     """
 
+
+# 고객별 정보는 프롬프트 끝에 붙여 앞부분(prefix)을 고객 간에 동일하게 유지함
+def _triage_instructions_suffix(context: UserAccountContext) -> str:
+    return f"""
+    고객의 이름: {context.name}
+    고객의 이메일: {context.email}
+    고객의 서비스 등급(tier): {context.tier}
+    """
+
+
+triage_instructions = compile_instructions(
+    "Triage Agent",
+    _triage_instructions_body,
+    _triage_instructions_suffix,
+)
+
+
+# 고객 요청을 받아 적절한 담당 에이전트로 라우팅하기 위한 메인 지침 생성 함수
+def dynamic_triage_agent_instructions(
+    wrapper: RunContextWrapper[UserAccountContext],
+    agent: Agent[UserAccountContext],
+):
+    # 분류 지침 본문 + 고객 정보(이름, 이메일, tier)를 이어 붙인 프롬프트 (고객 컨텍스트별로 메모이즈됨)
+    return triage_instructions.render(wrapper.context)
+
+
+# 분류 지침 본문의 카테고리 설명/예시 (고객 정보는 분류와 무관)
+triage_instruction_seeds = parse_instruction_seeds(triage_instructions.body("basic"))
+
+# 로컬 사전 분류기 구성
+topic_classifier = TopicClassifier(triage_instruction_seeds)
+
+
 def handle_handoff(
     wrapper: RunContextWrapper[UserAccountContext],
     input_data: HandoffData,
 ):
-
-    with st.sidebar:
-        st.write(
-            f"""
-            Handing off to {input_data.to_agent_name}
-            Reason: {input_data.reason}
-            Issue Type: {input_data.issue_type}
-            Description: {input_data.issue_description}
-        """
+    # 핸드오프 사유를 현재 턴의 span으로 기록 (사이드바 워터폴에서 확인)
+    turn = current_turn()
+    if turn is not None:
+        turn.event(
+            "handoff",
+            f"→ {input_data.to_agent_name}",
+            to_agent=input_data.to_agent_name,
+            reason=input_data.reason,
+            issue_type=input_data.issue_type,
+            issue_description=input_data.issue_description,
         )
 
 
@@ -154,7 +214,8 @@ def make_handoff(agent):
 
 
 # 실제 분류 담당 에이전트 정의
-# 입력 전에 off_topic_guardrail을 실행하여 유효성 검사 수행
+# off_topic_guardrail은 CustomWorkflow가 Agent 실행과 병렬로 실행하고
+# tripwire 발동 시 즉시 취소하므로 여기서는 등록하지 않음 (중복 호출 방지)
 triage_agent = Agent(
     name="Triage Agent",
     instructions=dynamic_triage_agent_instructions,
@@ -173,4 +234,18 @@ triage_agent = Agent(
         make_handoff(account_agent),
         make_handoff(order_agent),
     ],
-)
\ No newline at end of file
+)
+
+
+# 명확한 요청은 triage LLM 턴 없이 바로 전문 에이전트로 전환하는 로컬 라우터
+fast_router = FastRouter(
+    triage_instruction_seeds,
+    {
+        "TECHNICAL SUPPORT": technical_agent,
+        "BILLING SUPPORT": billing_agent,
+        "ORDER MANAGEMENT": order_agent,
+        "ACCOUNT MANAGEMENT": account_agent,
+    },
+    entry_agent=triage_agent,
+    topic_classifier=topic_classifier,
+)
@@ -0,0 +1,575 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+from agents import Model, ModelProvider, ModelResponse, Usage
+from agents.voice import (
+    AudioInput,
+    StreamedAudioInput,
+    StreamedTranscriptionSession,
+    STTModel,
+    STTModelSettings,
+    TTSModel,
+    TTSModelSettings,
+    VoiceModelProvider,
+)
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import (
+    InputTokensDetails,
+    OutputTokensDetails,
+)
+
+from tool_cache import is_read_only
+
+
+# =============================================================================
+# LATENCY PROFILE
+# =============================================================================
+
+
+@dataclass
+class LatencyProfile:
+    # 오프라인 모델이 흉내 낼 지연 시간 설정 (0이면 즉시 응답)
+    llm_first_token_ms: float = 350.0
+    llm_tokens_per_second: float = 60.0
+    stt_base_ms: float = 150.0
+    stt_ms_per_audio_second: float = 40.0
+    tts_first_byte_ms: float = 200.0
+    # TTS가 실시간 대비 몇 배 빠르게 오디오를 생성하는지
+    tts_realtime_factor: float = 4.0
+
+    @classmethod
+    def instant(cls) -> "LatencyProfile":
+        return cls(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+async def _sleep_ms(ms: float):
+    if ms > 0:
+        await asyncio.sleep(ms / 1000)
+
+
+# =============================================================================
+# RULES (분류/도구 선택 규칙)
+# =============================================================================
+
+
+# 카테고리별 키워드와 담당 에이전트 이름의 일부
+CATEGORY_RULES = {
+    "billing": (
+        "Billing",
+        ["결제", "환불", "요금", "구독", "청구", "카드", "크레딧", "billing", "refund", "charge", "invoice"],
+    ),
+    "order": (
+        "Order",
+        ["주문", "배송", "반품", "교환", "운송장", "택배", "상품", "order", "shipping", "delivery", "return"],
+    ),
+    "account": (
+        "Account",
+        ["비밀번호", "로그인", "계정", "이메일", "2단계", "탈퇴", "password", "login", "account", "email"],
+    ),
+    "technical": (
+        "Technical",
+        ["오류", "에러", "버그", "앱", "안 켜", "느려", "충돌", "설치", "작동", "error", "bug", "crash", "install"],
+    ),
+}
+
+# 도구 이름별 트리거 키워드 (구체적인 도구가 앞에 오도록 정렬)
+TOOL_RULES = [
+    ("process_refund_request", ["환불", "refund"]),
+    ("apply_billing_credit", ["크레딧", "보상", "credit"]),
+    ("update_payment_method", ["결제 수단", "카드 변경", "payment method"]),
+    ("lookup_billing_history", ["결제", "청구", "요금", "두 번", "중복", "billing", "charge"]),
+    ("initiate_return_process", ["반품", "교환", "return"]),
+    ("schedule_redelivery", ["재배송", "redeliver"]),
+    ("expedite_shipping", ["빠른 배송", "빨리", "expedite"]),
+    ("lookup_order_status", ["주문", "배송", "어디", "order", "tracking"]),
+    ("enable_two_factor_auth", ["2단계", "2fa", "two-factor"]),
+    ("update_account_email", ["이메일 변경", "이메일 주소", "change email"]),
+    ("deactivate_account", ["탈퇴", "비활성화", "계정 삭제", "deactivate"]),
+    ("export_account_data", ["데이터 내보내기", "데이터 요청", "export"]),
+    ("reset_user_password", ["비밀번호", "로그인", "password", "login"]),
+    ("escalate_to_engineering", ["엔지니어", "에스컬레이션", "escalate"]),
+    ("run_diagnostic_check", ["진단", "오류", "에러", "error", "diagnos"]),
+    ("provide_troubleshooting_steps", ["안 켜", "느려", "충돌", "멈춰", "crash", "slow"]),
+]
+
+# 출력 가드레일이 검사하는 다른 부서 데이터 키워드
+BILLING_TERMS = ["결제", "환불", "요금", "구독", "청구", "billing", "refund"]
+ORDER_TERMS = ["배송", "주문", "반품", "운송장", "shipping", "order"]
+ACCOUNT_TERMS = ["비밀번호", "이메일 변경", "계정 설정", "password"]
+
+ORDER_NUMBER_PATTERN = re.compile(r"\b(?:ORD-?)?\d{5,}\b", re.IGNORECASE)
+TRACKING_NUMBER_PATTERN = re.compile(r"\b1Z[0-9A-Z]{6,}\b")
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+SMALL_TALK = ["안녕", "감사", "고마", "hello", "hi", "thanks"]
+
+
+def _contains_any(text: str, terms) -> bool:
+    lowered = text.lower()
+    return any(term in lowered for term in terms)
+
+
+def classify_category(text: str) -> str | None:
+    # 키워드가 가장 많이 일치하는 카테고리를 반환 (동점이면 정의 순서)
+    lowered = text.lower()
+    scores = {
+        category: sum(lowered.count(keyword) for keyword in keywords)
+        for category, (_, keywords) in CATEGORY_RULES.items()
+    }
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else None
+
+
+# =============================================================================
+# LLM STAND-IN
+# =============================================================================
+
+
+def _item_get(item, key, default=None):
+    if isinstance(item, dict):
+        return item.get(key, default)
+    return getattr(item, key, default)
+
+
+def _message_text(item) -> str:
+    content = _item_get(item, "content", "")
+    if isinstance(content, str):
+        return content
+    return "".join(
+        _item_get(part, "text", "") or "" for part in content or []
+    )
+
+
+def _split_turn(input) -> tuple[str, list]:
+    # 마지막 사용자 메시지와 그 이후의 아이템(도구 호출/결과)을 분리함
+    if isinstance(input, str):
+        return input, []
+    for index in range(len(input) - 1, -1, -1):
+        if _item_get(input[index], "role") == "user":
+            return _message_text(input[index]), list(input[index + 1 :])
+    return "", list(input)
+
+
+def _resolve(schema: dict, root: dict) -> dict:
+    ref = schema.get("$ref")
+    if ref:
+        for part in ref.lstrip("#/").split("/"):
+            root = root[part]
+        return root
+    return schema
+
+
+def synthesize_arguments(schema: dict, user_text: str, root: dict | None = None) -> dict:
+    """
+    도구의 JSON 스키마를 보고 사용자 발화에서 값을 추출해 인자를 만듦.
+    추출할 수 없는 값은 타입별 기본값으로 채움.
+    """
+    root = root or schema
+    schema = _resolve(schema, root)
+    arguments = {}
+    for name, prop in schema.get("properties", {}).items():
+        prop = _resolve(prop, root)
+        types = [prop.get("type")] + [
+            option.get("type") for option in prop.get("anyOf", [])
+        ]
+        if "default" in prop:
+            arguments[name] = prop["default"]
+        elif "object" in types:
+            arguments[name] = synthesize_arguments(prop, user_text, root)
+        elif "integer" in types:
+            arguments[name] = 1 if name.endswith("_id") else 6
+        elif "number" in types:
+            arguments[name] = 10.0
+        elif "boolean" in types:
+            arguments[name] = False
+        elif name == "order_number":
+            match = ORDER_NUMBER_PATTERN.search(user_text)
+            arguments[name] = match.group(0) if match else "ORD-10001"
+        elif name == "tracking_number":
+            match = TRACKING_NUMBER_PATTERN.search(user_text)
+            arguments[name] = match.group(0) if match else "1Z100001"
+        elif "email" in name:
+            match = EMAIL_PATTERN.search(user_text)
+            arguments[name] = match.group(0) if match else "customer@example.com"
+        else:
+            arguments[name] = user_text[:200]
+    return arguments
+
+
+def _guardrail_output(schema_name: str, text: str) -> dict:
+    # 가드레일 에이전트의 구조화 출력 (규칙 기반 판정)
+    if schema_name == "InputGuardRailOutput":
+        on_topic = classify_category(text) is not None or _contains_any(text, SMALL_TALK)
+        return {
+            "is_off_topic": not on_topic,
+            "reason": "지원 범위 내 요청" if on_topic else "지원 범위를 벗어난 요청",
+        }
+    if schema_name == "TechnicalOutputGuardRailOutput":
+        billing = _contains_any(text, BILLING_TERMS)
+        account = _contains_any(text, ACCOUNT_TERMS)
+        off_topic = _contains_any(text, ORDER_TERMS)
+        return {
+            "contains_off_topic": off_topic,
+            "contains_billing_data": billing,
+            "contains_account_data": account,
+            "reason": "다른 부서 정보 포함" if billing or account or off_topic else "기술 지원 내용만 포함",
+        }
+    raise ValueError(f"오프라인 모델이 지원하지 않는 출력 스키마: {schema_name}")
+
+
+def _tokens(text: str) -> list[str]:
+    # 스트리밍용 토큰 분할 (공백 포함 단어 단위)
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 3)
+
+
+class OfflineModel(Model):
+    """
+    네트워크 없이 동작하는 규칙 기반 LLM 대체 모델.
+    - triage: 키워드로 카테고리를 분류해 해당 전문 에이전트로 핸드오프 호출
+    - 전문 에이전트: 발화에 맞는 tools.py 도구를 호출한 뒤 결과를 요약해 응답
+    - 가드레일 에이전트: 키워드 규칙으로 구조화된 판정 결과 반환
+    결과는 입력에 대해 결정적(deterministic)이며 지연 시간은 LatencyProfile로 조절함.
+    """
+
+    def __init__(self, latency: LatencyProfile | None = None):
+        self.latency = latency or LatencyProfile()
+        self._ids = 0
+
+    def _next_id(self, prefix: str) -> str:
+        self._ids += 1
+        return f"{prefix}_{self._ids}"
+
+    def _plan(self, input, tools, output_schema, handoffs, parallel: bool = False) -> tuple[str | None, list]:
+        """응답 텍스트 또는 함수 호출 목록을 결정함."""
+        user_text, after_user = _split_turn(input)
+        tool_outputs = [
+            item for item in after_user if _item_get(item, "type") == "function_call_output"
+        ]
+
+        if output_schema is not None and not output_schema.is_plain_text():
+            output = _guardrail_output(output_schema.name(), user_text)
+            return json.dumps(output, ensure_ascii=False), []
+
+        if handoffs and not tool_outputs:
+            category = classify_category(user_text)
+            if category is not None:
+                agent_hint = CATEGORY_RULES[category][0]
+                for handoff in handoffs:
+                    if agent_hint in handoff.agent_name:
+                        arguments = {
+                            "to_agent_name": handoff.agent_name,
+                            "issue_type": category,
+                            "issue_description": user_text[:200],
+                            "reason": f"{category} 관련 문의",
+                        }
+                        return None, [(handoff.tool_name, arguments)]
+            return (
+                "어떤 도움이 필요하신가요? 계정, 결제, 주문, 기술 지원 중 하나를 말씀해 주세요.",
+                [],
+            )
+
+        if tools and not tool_outputs:
+            tools_by_name = {tool.name: tool for tool in tools}
+            matched = [
+                tool_name
+                for tool_name, keywords in TOOL_RULES
+                if tool_name in tools_by_name and _contains_any(user_text, keywords)
+            ]
+            if matched:
+                # 병렬 호출이 허용되고 첫 도구가 조회라면, 함께 필요한 조회를 한 응답에 모두 담음
+                # (발화에 주문 번호가 여러 개면 주문마다 한 번씩 조회함)
+                names = [matched[0]]
+                if parallel and is_read_only(matched[0]):
+                    names = [tool_name for tool_name in matched if is_read_only(tool_name)]
+                calls = []
+                for tool_name in names:
+                    schema = getattr(tools_by_name[tool_name], "params_json_schema", {})
+                    arguments = synthesize_arguments(schema, user_text)
+                    order_numbers = ORDER_NUMBER_PATTERN.findall(user_text) if parallel else []
+                    if "order_number" in arguments and len(order_numbers) > 1:
+                        calls += [(tool_name, {**arguments, "order_number": number}) for number in order_numbers]
+                    else:
+                        calls.append((tool_name, arguments))
+                return None, calls
+
+        if tool_outputs:
+            # 병렬 호출 결과는 호출 순서대로 들어옴
+            result = "\n".join(str(_item_get(item, "output", "")) for item in tool_outputs)
+            return f"확인해 봤어요. {result}", []
+
+        return "네, 말씀하신 내용을 확인했어요. 조금 더 자세히 알려주시겠어요?", []
+
+    def _build_response(self, input, text, calls, parallel: bool = False) -> Response:
+        output = []
+        if text is not None:
+            output.append(
+                ResponseOutputMessage(
+                    id=self._next_id("msg"),
+                    type="message",
+                    role="assistant",
+                    status="completed",
+                    content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+                )
+            )
+        for name, arguments in calls:
+            output.append(
+                ResponseFunctionToolCall(
+                    id=self._next_id("fc"),
+                    call_id=self._next_id("call"),
+                    type="function_call",
+                    name=name,
+                    arguments=json.dumps(arguments, ensure_ascii=False),
+                )
+            )
+        input_tokens = _estimate_tokens(json.dumps(input, ensure_ascii=False, default=str))
+        output_tokens = _estimate_tokens(text or json.dumps([c[1] for c in calls]))
+        return Response(
+            id=self._next_id("resp"),
+            created_at=time.time(),
+            model="offline",
+            object="response",
+            output=output,
+            tool_choice="auto",
+            tools=[],
+            parallel_tool_calls=parallel,
+            usage=ResponseUsage(
+                input_tokens=input_tokens,
+                input_tokens_details=InputTokensDetails(cached_tokens=0),
+                output_tokens=output_tokens,
+                output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+                total_tokens=input_tokens + output_tokens,
+            ),
+        )
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *,
+        previous_response_id=None,
+        conversation_id=None,
+        prompt=None,
+    ) -> ModelResponse:
+        parallel = bool(model_settings.parallel_tool_calls)
+        text, calls = self._plan(input, tools, output_schema, handoffs, parallel)
+        response = self._build_response(input, text, calls, parallel)
+        await _sleep_ms(self.latency.llm_first_token_ms)
+        if self.latency.llm_tokens_per_second:
+            await asyncio.sleep(response.usage.output_tokens / self.latency.llm_tokens_per_second)
+        return ModelResponse(
+            output=response.output,
+            usage=Usage(
+                requests=1,
+                input_tokens=response.usage.input_tokens,
+                output_tokens=response.usage.output_tokens,
+                total_tokens=response.usage.total_tokens,
+            ),
+            response_id=response.id,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *,
+        previous_response_id=None,
+        conversation_id=None,
+        prompt=None,
+    ):
+        parallel = bool(model_settings.parallel_tool_calls)
+        text, calls = self._plan(input, tools, output_schema, handoffs, parallel)
+        response = self._build_response(input, text, calls, parallel)
+        await _sleep_ms(self.latency.llm_first_token_ms)
+
+        sequence = 0
+        if text is not None:
+            message_id = response.output[0].id
+            delay = 1 / self.latency.llm_tokens_per_second if self.latency.llm_tokens_per_second else 0
+            for token in _tokens(text):
+                yield ResponseTextDeltaEvent(
+                    type="response.output_text.delta",
+                    item_id=message_id,
+                    output_index=0,
+                    content_index=0,
+                    delta=token,
+                    logprobs=[],
+                    sequence_number=sequence,
+                )
+                sequence += 1
+                if delay:
+                    await asyncio.sleep(delay)
+
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            response=response,
+            sequence_number=sequence,
+        )
+
+
+class OfflineModelProvider(ModelProvider):
+    # 모든 모델 이름에 대해 같은 오프라인 모델을 반환함
+    def __init__(self, latency: LatencyProfile | None = None):
+        self.latency = latency or LatencyProfile()
+
+    def get_model(self, model_name: str | None) -> Model:
+        return OfflineModel(self.latency)
+
+
+# =============================================================================
+# STT / TTS STAND-IN
+# =============================================================================
+
+
+def audio_fingerprint(buffer: np.ndarray) -> str:
+    # 오디오 버퍼 내용으로 전사 스크립트를 찾기 위한 키
+    return hashlib.sha1(np.ascontiguousarray(buffer).tobytes()).hexdigest()
+
+
+class OfflineSTTModel(STTModel):
+    """
+    스크립트 기반 STT 대체 모델.
+    등록된 오디오는 등록한 전사를, 그 외에는 대기열(script) 또는 기본 전사를 반환함.
+    """
+
+    def __init__(
+        self,
+        latency: LatencyProfile | None = None,
+        default_transcript: str = "안녕하세요",
+    ):
+        self.latency = latency or LatencyProfile()
+        self.default_transcript = default_transcript
+        self.transcripts: dict[str, str] = {}
+        self.script: deque[str] = deque()
+
+    @property
+    def model_name(self) -> str:
+        return "offline-stt"
+
+    def register(self, buffer: np.ndarray, transcript: str):
+        self.transcripts[audio_fingerprint(buffer)] = transcript
+
+    def _lookup(self, buffer: np.ndarray) -> str:
+        transcript = self.transcripts.get(audio_fingerprint(buffer))
+        if transcript is not None:
+            return transcript
+        if self.script:
+            return self.script.popleft()
+        return self.default_transcript
+
+    async def transcribe(
+        self,
+        input: AudioInput,
+        settings: STTModelSettings,
+        trace_include_sensitive_data: bool,
+        trace_include_sensitive_audio_data: bool,
+    ) -> str:
+        audio_seconds = len(input.buffer) / input.frame_rate
+        await _sleep_ms(
+            self.latency.stt_base_ms + self.latency.stt_ms_per_audio_second * audio_seconds
+        )
+        return self._lookup(input.buffer)
+
+    async def create_session(
+        self,
+        input: StreamedAudioInput,
+        settings: STTModelSettings,
+        trace_include_sensitive_data: bool,
+        trace_include_sensitive_audio_data: bool,
+    ) -> StreamedTranscriptionSession:
+        return OfflineTranscriptionSession(self, input)
+
+
+class OfflineTranscriptionSession(StreamedTranscriptionSession):
+    # 입력 스트림이 끝나면(None) 모인 오디오 전체를 한 턴으로 전사함
+    def __init__(self, model: OfflineSTTModel, input: StreamedAudioInput):
+        self.model = model
+        self.input = input
+        self._closed = False
+
+    async def transcribe_turns(self):
+        chunks = []
+        while not self._closed:
+            chunk = await self.input.queue.get()
+            if chunk is None:
+                break
+            chunks.append(chunk)
+        if chunks:
+            buffer = np.concatenate(chunks)
+            await _sleep_ms(self.model.latency.stt_base_ms)
+            yield self.model._lookup(buffer)
+
+    async def close(self) -> None:
+        self._closed = True
+
+
+class OfflineTTSModel(TTSModel):
+    """
+    텍스트 길이에 비례하는 길이의 PCM(24kHz, int16, 모노) 톤을 생성하는 TTS 대체 모델.
+    첫 바이트 지연과 실시간 대비 생성 속도를 LatencyProfile로 조절함.
+    """
+
+    sample_rate = 24000
+    chunk_ms = 100
+    # 한국어 발화 속도 근사치 (초당 글자 수)
+    chars_per_second = 12
+
+    def __init__(self, latency: LatencyProfile | None = None):
+        self.latency = latency or LatencyProfile()
+
+    @property
+    def model_name(self) -> str:
+        return "offline-tts"
+
+    async def run(self, text: str, settings: TTSModelSettings):
+        seconds = max(len(text.strip()), 1) / self.chars_per_second
+        total = int(seconds * self.sample_rate)
+        chunk = self.sample_rate * self.chunk_ms // 1000
+        tone = (np.sin(np.arange(total) * (2 * np.pi * 220 / self.sample_rate)) * 3000).astype(
+            np.int16
+        )
+
+        await _sleep_ms(self.latency.tts_first_byte_ms)
+        for start in range(0, total, chunk):
+            yield tone[start : start + chunk].tobytes()
+            if self.latency.tts_realtime_factor:
+                await _sleep_ms(self.chunk_ms / self.latency.tts_realtime_factor)
+
+
+class OfflineVoiceModelProvider(VoiceModelProvider):
+    def __init__(self, latency: LatencyProfile | None = None):
+        self.latency = latency or LatencyProfile()
+        self.stt_model = OfflineSTTModel(self.latency)
+        self.tts_model = OfflineTTSModel(self.latency)
+
+    def get_stt_model(self, model_name: str | None) -> STTModel:
+        return self.stt_model
+
+    def get_tts_model(self, model_name: str | None) -> TTSModel:
+        return self.tts_model
@@ -1,3 +1,8 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from agents import (
     Agent,
     output_guardrail,
@@ -6,6 +11,109 @@ from agents import (
     GuardrailFunctionOutput,
 )
 from models import TechnicalOutputGuardRailOutput, UserAccountContext
+from guardrail_cache import get_guardrail_cache, guardrail_version
+from providers import get_run_config
+from turn_tracing import stage_span
+
+
+# 문장 경계: 문장 부호 뒤의 공백 또는 줄바꿈 (소수점 "3.5" 등은 경계로 보지 않음)
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。…])\s+|\n+")
+
+# 기술 지원 응답에 나오면 안 되는 다른 부서 용어 (사전 검사용)
+BILLING_TERMS = [
+    "결제", "환불", "요금", "구독", "청구", "영수증", "인보이스", "카드", "크레딧", "쿠폰", "할인",
+    "billing", "payment", "refund", "charge", "invoice", "subscription", "credit card",
+]
+ORDER_TERMS = [
+    "주문", "배송", "배달", "택배", "운송장", "반품", "교환", "재고", "출고",
+    "order", "shipping", "shipment", "delivery", "tracking number",
+]
+# "로그인"은 일반적인 트러블슈팅 단계에도 쓰이므로 계정 관리 전용 표현만 포함함
+ACCOUNT_TERMS = [
+    "비밀번호", "이메일 변경", "이메일 주소", "계정 설정", "계정 삭제", "탈퇴", "2단계 인증", "프로필",
+    "password", "change email", "account settings", "delete account", "two-factor", "2fa",
+]
+# 용어가 없더라도 금액/이메일/주문번호가 보이면 확신할 수 없으므로 LLM 검사로 넘김
+LOW_CONFIDENCE_PATTERN = re.compile(
+    r"[$₩]\s*\d|\d[\d,]*\s*(?:원|달러|usd|krw)\b|[\w.+-]+@[\w-]+\.[\w.]+|\b(?:ORD-?)?\d{6,}\b",
+    re.IGNORECASE,
+)
+
+
+def _term_group(name: str, terms: list[str]) -> str:
+    alternatives = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return f"(?P<{name}>{alternatives})"
+
+
+# 세 분류의 용어를 하나의 정규식으로 컴파일하여 텍스트를 한 번만 훑음
+TERM_PATTERN = re.compile(
+    "|".join(
+        [
+            _term_group("billing", BILLING_TERMS),
+            _term_group("order", ORDER_TERMS),
+            _term_group("account", ACCOUNT_TERMS),
+        ]
+    ),
+    re.IGNORECASE,
+)
+
+# 사전 검사 결과별 횟수 (clean: LLM 생략, term/low_confidence: LLM 검사로 넘김)
+prescreen_counts = Counter()
+
+# 음성 스트리밍 모드에서 워크플로우가 문장 단위로 검사 중인 실행인지 여부
+# (Runner 실행 태스크에만 설정되므로 워크플로우의 문장 검사 호출에는 영향 없음)
+_checked_by_sentence: ContextVar[bool] = ContextVar("checked_by_sentence", default=False)
+
+
+def split_sentences(text: str) -> tuple[list[str], str]:
+    # 완성된 문장 목록과 아직 끝나지 않은 나머지 텍스트를 반환함
+    sentences = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        sentences.append(text[start : match.end()])
+        start = match.end()
+    return sentences, text[start:]
+
+
+def prescreen_technical_output(text: str) -> tuple[TechnicalOutputGuardRailOutput, bool]:
+    """
+    LLM 가드레일 전에 용어 사전으로 응답을 검사하여 잠정 판정과 확신 여부를 반환함.
+    다른 부서 용어가 없고 금액/이메일/주문번호 같은 흔적도 없을 때만 확신함.
+    """
+    found = {"billing": [], "order": [], "account": []}
+    for match in TERM_PATTERN.finditer(text):
+        found[match.lastgroup].append(match.group(0))
+    low_confidence = LOW_CONFIDENCE_PATTERN.search(text) is not None
+    hits = [term for terms in found.values() for term in terms]
+
+    if hits:
+        reason = f"사전 검사 용어: {', '.join(hits)}"
+    elif low_confidence:
+        reason = "금액/이메일/주문번호 형식 포함"
+    else:
+        reason = "사전 검사 통과"
+    validation = TechnicalOutputGuardRailOutput(
+        contains_off_topic=bool(found["order"]),
+        contains_billing_data=bool(found["billing"]),
+        contains_account_data=bool(found["account"]),
+        reason=reason,
+    )
+    confident = not hits and not low_confidence
+    prescreen_counts["clean" if confident else "term" if hits else "low_confidence"] += 1
+    return validation, confident
+
+
+@contextmanager
+def sentence_checked_run():
+    """
+    이 블록 안에서 시작한 Runner 실행은 최종 출력 가드레일 검사를 건너뜀.
+    워크플로우가 스트리밍되는 응답을 문장 단위로 같은 가드레일로 검사할 때 사용함.
+    """
+    token = _checked_by_sentence.set(True)
+    try:
+        yield
+    finally:
+        _checked_by_sentence.reset(token)
 
 
 # 기술 지원 응답 내의 부적절한 내용을 검증하는 에이전트 정의
@@ -31,15 +139,37 @@ async def technical_output_guardrail(
     agent: Agent,
     output: str,
 ):
-    # 기술 지원 검증 에이전트를 실행하여 결과를 받음
-    result = await Runner.run(
-        technical_output_guardrail_agent,
-        output,
-        context=wrapper.context,
-    )
+    # 문장 단위로 이미 검사한 음성 스트리밍 실행이면 최종 출력 검사를 생략함
+    if _checked_by_sentence.get():
+        return GuardrailFunctionOutput(output_info=None, tripwire_triggered=False)
+
+    # 용어 사전으로 명백히 깨끗한 응답은 LLM 호출 없이 통과시킴
+    with stage_span("output_guardrail", "technical_prescreen") as span:
+        provisional, confident = prescreen_technical_output(output)
+        if span is not None:
+            span.attributes["confident"] = confident
+    if confident:
+        return GuardrailFunctionOutput(output_info=provisional, tripwire_triggered=False)
+
+    # 같은 응답(정규화 기준)을 이미 검증했다면 캐시된 판정을 사용함
+    cache = get_guardrail_cache()
+    run_config = get_run_config()
+    version = guardrail_version(technical_output_guardrail_agent, run_config)
+    validation = await cache.aget("technical_output", version, output, TechnicalOutputGuardRailOutput)
+
+    if validation is None:
+        # 기술 지원 검증 에이전트를 실행하여 결과를 받음
+        with stage_span("output_guardrail", "technical_output_guardrail"):
+            result = await Runner.run(
+                technical_output_guardrail_agent,
+                output,
+                context=wrapper.context,
+                run_config=run_config,
+            )
 
-    # 에이전트의 최종 결과를 가져옴
-    validation = result.final_output
+        # 에이전트의 최종 결과를 가져옴
+        validation = result.final_output
+        await cache.aput("technical_output", version, output, validation)
 
     # 결과 중 하나라도 부적절한 내용이 있으면 tripwire를 작동시킴
     # TechnicalOutputGuardRailOutput의 필드들을 검사
@@ -0,0 +1,133 @@
+import threading
+import time
+from dataclasses import dataclass, field
+
+from agents.voice import (
+    STTModel,
+    STTModelSettings,
+    TTSModel,
+    VoiceModelProvider,
+    VoicePipeline,
+    VoicePipelineConfig,
+)
+from providers import get_voice_model_provider, is_offline
+from turn_tracing import TracedSTTModel, TracedTTSModel, TurnTracingHooks
+from workflow import DEFAULT_GUARDRAIL_GRACE_SECONDS, CustomWorkflow
+
+
+# 유휴 상태로 이 시간(초)이 지나면 세션의 파이프라인을 풀에서 제거함
+DEFAULT_IDLE_TTL_SECONDS = 15 * 60
+
+
+@dataclass
+class PooledPipeline:
+    # 하나의 대화 세션이 재사용하는 워크플로우/파이프라인 묶음
+    workflow: CustomWorkflow
+    pipeline: VoicePipeline
+    last_used: float = field(default_factory=time.monotonic)
+    turns: int = 0
+
+
+class VoicePipelinePool:
+    """
+    세션별로 CustomWorkflow와 VoicePipeline을 한 번만 만들고 매 턴 재사용하는 풀.
+    - STT/TTS 모델과 OpenAI 클라이언트는 모든 세션이 공유함
+    - 턴마다 컨텍스트와 대화 상태만 교체(reset)함
+    - 일정 시간 사용되지 않은 세션은 제거(evict)함
+    """
+
+    # 세션마다 만들 워크플로우 (벤치마크 등에서 계측용 하위 클래스로 바꿀 수 있음)
+    workflow_class = CustomWorkflow
+
+    def __init__(
+        self,
+        model_provider: VoiceModelProvider | None = None,
+        idle_ttl: float = DEFAULT_IDLE_TTL_SECONDS,
+        stt_settings: STTModelSettings | None = None,
+        input_guardrails=None,
+        guardrail_grace_seconds: float | None = DEFAULT_GUARDRAIL_GRACE_SECONDS,
+        sentence_guardrails=None,
+        router=None,
+    ):
+        self.model_provider = model_provider or get_voice_model_provider()
+        self.idle_ttl = idle_ttl
+        # 스트리밍 모드에서는 턴 감지(turn_detection) 설정을 전달하기 위해 사용함
+        self.stt_settings = stt_settings or STTModelSettings()
+        # Agent 실행과 병렬로 검사할 입력 가드레일 (워크플로우에 전달)
+        self.input_guardrails = input_guardrails or []
+        self.guardrail_grace_seconds = guardrail_grace_seconds
+        # 응답을 문장 단위로 검사할 출력 가드레일 (워크플로우에 전달)
+        self.sentence_guardrails = sentence_guardrails or []
+        # triage 턴을 건너뛰는 로컬 라우터 (워크플로우에 전달)
+        self.router = router
+        self._entries: dict[str, PooledPipeline] = {}
+        self._lock = threading.Lock()
+        self._stt_model: STTModel | None = None
+        self._tts_model: TTSModel | None = None
+
+    def _models(self) -> tuple[STTModel, TTSModel]:
+        # 모델 객체는 최초 요청 시 한 번만 생성하여 공유함 (턴 단계 span 기록용으로 감쌈)
+        if self._stt_model is None:
+            self._stt_model = TracedSTTModel(self.model_provider.get_stt_model(None))
+        if self._tts_model is None:
+            self._tts_model = TracedTTSModel(self.model_provider.get_tts_model(None))
+        return self._stt_model, self._tts_model
+
+    def _create(self, context, state=None) -> PooledPipeline:
+        stt_model, tts_model = self._models()
+        workflow = self.workflow_class(
+            context=context,
+            state=state,
+            hooks=TurnTracingHooks(),
+            input_guardrails=self.input_guardrails,
+            guardrail_grace_seconds=self.guardrail_grace_seconds,
+            sentence_guardrails=self.sentence_guardrails,
+            router=self.router,
+        )
+        pipeline = VoicePipeline(
+            workflow=workflow,
+            stt_model=stt_model,
+            tts_model=tts_model,
+            config=VoicePipelineConfig(
+                model_provider=self.model_provider,
+                stt_settings=self.stt_settings,
+                tracing_disabled=is_offline(),
+            ),
+        )
+        return PooledPipeline(workflow=workflow, pipeline=pipeline)
+
+    def acquire(self, session_key: str, context, state=None) -> VoicePipeline:
+        """
+        세션 키에 해당하는 파이프라인을 반환함. 없으면 새로 생성함.
+        반환 전에 워크플로우 컨텍스트/대화 상태를 이번 턴의 것으로 교체함.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(session_key)
+            if entry is None:
+                entry = self._create(context, state)
+                self._entries[session_key] = entry
+            entry.workflow.context = context
+            entry.workflow.state = state
+            entry.last_used = now
+            entry.turns += 1
+            return entry.pipeline
+
+    def release(self, session_key: str):
+        # 세션 종료(예: 메모리 초기화) 시 명시적으로 제거
+        with self._lock:
+            self._entries.pop(session_key, None)
+
+    def _evict_idle(self, now: float):
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if now - entry.last_used > self.idle_ttl
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
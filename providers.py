@@ -0,0 +1,60 @@
+import os
+
+from agents import RunConfig
+from agents.voice import OpenAIVoiceModelProvider, VoiceModelProvider
+
+
+# 이 환경 변수가 설정되면 모든 LLM/STT/TTS 호출을 오프라인 대체 모델로 실행함
+OFFLINE_ENV_VAR = "SUPPORT_AGENT_OFFLINE"
+
+_run_config: RunConfig | None = None
+_voice_model_provider: VoiceModelProvider | None = None
+
+
+def is_offline() -> bool:
+    return os.environ.get(OFFLINE_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+
+def get_run_config() -> RunConfig:
+    """
+    Runner.run / Runner.run_streamed에 전달할 공통 RunConfig.
+    워크플로우와 가드레일이 같은 모델 제공자를 사용하도록 한 곳에서 관리함.
+    """
+    global _run_config
+    if _run_config is None:
+        if is_offline():
+            from offline_provider import OfflineModelProvider
+
+            # 오프라인 모드에서는 트레이스 전송(네트워크)도 끔
+            _run_config = RunConfig(
+                model_provider=OfflineModelProvider(),
+                tracing_disabled=True,
+            )
+        else:
+            _run_config = RunConfig()
+    return _run_config
+
+
+def get_voice_model_provider() -> VoiceModelProvider:
+    # VoicePipeline이 사용할 STT/TTS 모델 제공자
+    global _voice_model_provider
+    if _voice_model_provider is None:
+        if is_offline():
+            from offline_provider import OfflineVoiceModelProvider
+
+            _voice_model_provider = OfflineVoiceModelProvider()
+        else:
+            _voice_model_provider = OpenAIVoiceModelProvider()
+    return _voice_model_provider
+
+
+def configure(
+    run_config: RunConfig | None = None,
+    voice_model_provider: VoiceModelProvider | None = None,
+):
+    # 벤치마크 등에서 지연 시간 프로필이 다른 제공자를 직접 주입할 때 사용함
+    global _run_config, _voice_model_provider
+    if run_config is not None:
+        _run_config = run_config
+    if voice_model_provider is not None:
+        _voice_model_provider = voice_model_provider
@@ -0,0 +1,254 @@
+"""
+고객 지원 음성 에이전트를 Streamlit 없이 실행하는 비동기(ASGI) 서비스.
+
+하나의 프로세스가 여러 대화를 동시에 처리하며, 대화별 활성 Agent/세션/컨텍스트는
+ConversationStateStore가 관리함. 활성 Agent와 기록은 세션 저장소(SQLite shard)에
+저장되고 매 턴 시작 시 다시 읽으므로, 로드 밸런서 뒤에 여러 워커 프로세스를 띄워도
+(같은 세션 저장소 파일을 공유하는 한) 어느 워커든 다음 턴을 이어받음.
+
+실행: python service.py --port 8765 --workers 4
+턴별 단계 span은 turn-spans.jsonl에 기록함 (SUPPORT_SPAN_EXPORT=sqlite:turn-spans.db 로 SQLite에 저장)
+
+WebSocket 프로토콜 (/ws/conversations/{conversation_id}):
+- 클라이언트 → 서버
+  - {"type": "start", "context": {...UserAccountContext}}  (연결 후 첫 메시지)
+  - 바이너리 메시지: 한 턴의 발화 (WAV 파일 바이트)
+  - {"type": "reset"}: 대화 기록 초기화
+- 서버 → 클라이언트
+  - {"type": "turn_started", "turn_id": ...}
+  - 바이너리 메시지: 응답 음성 (int16 모노 PCM, TTS_SAMPLE_RATE)
+  - {"type": "turn_ended", "agent": ..., "trimmed_seconds": ...}
+  - {"type": "no_speech"} / {"type": "blocked", "guardrail": "input" | "output"}
+  - {"type": "reset_done"} / {"type": "error", "message": ...}
+"""
+import argparse
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from agents import InputGuardrailTripwireTriggered, OutputGuardrailTripwireTriggered
+from agents.voice import AudioInput
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from audio_ingest import STT_SAMPLE_RATE, convert_audio
+from conversation_state import ConversationState, ConversationStateStore
+from guardrail_cache import GuardrailCache, configure_guardrail_cache
+from models import UserAccountContext
+from my_agents.triage_agent import fast_router, off_topic_guardrail, triage_agent
+from output_guardrails import technical_output_guardrail
+from pipeline_pool import VoicePipelinePool
+from providers import is_offline
+from session_sharding import ShardedSessionStore
+from turn_tracing import build_span_exporter, stage_span, start_turn
+from voice_activity import trim_silence
+
+
+logger = logging.getLogger(__name__)
+
+ROUTING_INDEX_PATH = "routing-index.npz"
+SESSION_DB_PATH = "customer-support-memory.db"
+# 대화 기록은 고객 ID 기준으로 여러 SQLite 파일에 나누어 저장함
+# (기존 단일 파일 기록은 python session_sharding.py migrate customer-support-memory.db 로 옮기고,
+#  shard 추가는 python session_sharding.py add-shard 로 실행함. 워커는 manifest.json을 다시 읽어 따라감)
+SESSION_SHARD_DIR = "session-shards"
+SESSION_SHARD_COUNT = 4
+# VoicePipeline 기본 TTS 출력 포맷 (int16 모노)
+TTS_SAMPLE_RATE = 24000
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def build_session_store() -> ShardedSessionStore:
+    # 프로세스 전체가 공유하는 대화 기록 저장소 (shard별 커넥션 풀 + 쓰기 배치)
+    # shard 목록은 shard 디렉터리의 manifest를 따름 (없으면 SESSION_SHARD_COUNT개로 새로 만듦)
+    return ShardedSessionStore.open(SESSION_SHARD_DIR, SESSION_SHARD_COUNT)
+
+
+def build_conversation_states(session_store) -> ConversationStateStore:
+    return ConversationStateStore(
+        session_store,
+        agents=list(fast_router.agents.values()),
+        entry_agent=triage_agent,
+    )
+
+
+def build_pipeline_pool(pool_class=VoicePipelinePool, **kwargs) -> VoicePipelinePool:
+    # 서비스/Streamlit/벤치마크가 같은 가드레일과 라우터 구성을 사용하도록 여기서만 만듦
+    return pool_class(
+        input_guardrails=[off_topic_guardrail],
+        sentence_guardrails=[technical_output_guardrail],
+        router=fast_router,
+        **kwargs,
+    )
+
+
+def build_guardrail_cache() -> GuardrailCache:
+    # 가드레일 판정 캐시 (SQLite 파일에 영속화)
+    cache = GuardrailCache(path=SESSION_DB_PATH)
+    configure_guardrail_cache(cache)
+    # 미리 계산한 라우팅 임베딩 인덱스가 있으면 사용함 (python fast_router.py로 생성)
+    if os.path.exists(ROUTING_INDEX_PATH) and not is_offline() and fast_router.index is None:
+        fast_router.load_index(ROUTING_INDEX_PATH)
+    return cache
+
+
+class SupportService:
+    """
+    전송 계층(WebSocket, Streamlit 등)과 무관하게 대화 턴을 실행하는 서비스.
+    run_turn()은 클라이언트에 보낼 이벤트(dict)와 응답 음성(bytes)을 차례로 내보냄.
+    """
+
+    def __init__(self, states: ConversationStateStore, pool: VoicePipelinePool, span_exporter=None):
+        self.states = states
+        self.pool = pool
+        self.span_exporter = span_exporter
+
+    def conversation(self, context: UserAccountContext, conversation_id: str) -> ConversationState:
+        return self.states.get(context, conversation_id)
+
+    async def run_turn(self, state: ConversationState, wav_audio):
+        # wav_audio: WAV bytes/memoryview 또는 getbuffer()가 있는 파일 객체(Streamlit UploadedFile, 복사하지 않음)
+        # 같은 대화의 턴은 순서대로 하나씩 처리함 (다른 대화는 동시에 진행됨)
+        async with state.lock:
+            await self.states.refresh(state)
+            turn = start_turn()
+            yield {"type": "turn_started", "turn_id": turn.turn_id}
+            try:
+                with stage_span("ingest", "convert_audio + trim_silence"):
+                    vad = trim_silence(convert_audio(wav_audio), STT_SAMPLE_RATE)
+                if vad.is_empty:
+                    yield {"type": "no_speech"}
+                    return
+
+                pipeline = self.pool.acquire(
+                    f"{state.context.customer_id}:{state.conversation_id}",
+                    state.context,
+                    state,
+                )
+                result = await pipeline.run(AudioInput(buffer=vad.audio, frame_rate=STT_SAMPLE_RATE))
+                async for event in result.stream():
+                    if event.type == "voice_stream_event_audio" and event.data is not None:
+                        yield event.data.tobytes()
+                yield {
+                    "type": "turn_ended",
+                    "agent": state.agent.name,
+                    "trimmed_seconds": round(vad.dropped_seconds, 3),
+                }
+
+            except InputGuardrailTripwireTriggered:
+                yield {"type": "blocked", "guardrail": "input"}
+
+            except OutputGuardrailTripwireTriggered:
+                yield {"type": "blocked", "guardrail": "output"}
+
+            finally:
+                await self.states.save(state)
+                turn.finish()
+                if self.span_exporter is not None:
+                    self.span_exporter.export(turn)
+
+    async def reset(self, state: ConversationState):
+        async with state.lock:
+            await self.states.reset(state)
+            self.pool.release(f"{state.context.customer_id}:{state.conversation_id}")
+
+
+# =============================================================================
+# ASGI
+# =============================================================================
+
+
+async def healthz(request):
+    service: SupportService = request.app.state.service
+    return JSONResponse({"conversations": len(service.states), "pipelines": len(service.pool)})
+
+
+async def conversation_socket(websocket: WebSocket):
+    service: SupportService = websocket.app.state.service
+    await websocket.accept()
+    try:
+        start = await websocket.receive_json()
+        if start.get("type") != "start":
+            await websocket.close(code=1008, reason="first message must be start")
+            return
+        context = UserAccountContext(**start["context"])
+        state = service.conversation(context, websocket.path_params["conversation_id"])
+
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                async for event in service.run_turn(state, message["bytes"]):
+                    if isinstance(event, bytes):
+                        await websocket.send_bytes(event)
+                    else:
+                        await websocket.send_json(event)
+            elif message.get("text") is not None:
+                # 텍스트 메시지는 제어용 (현재는 reset만 지원)
+                control = json.loads(message["text"])
+                if control.get("type") != "reset":
+                    await websocket.send_json({"type": "error", "message": f"unknown message: {control.get('type')}"})
+                    continue
+                await service.reset(state)
+                await websocket.send_json({"type": "reset_done"})
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.exception("conversation socket failed")
+        await websocket.send_json({"type": "error", "message": str(e)})
+        await websocket.close(code=1011)
+
+
+def create_app(service: SupportService | None = None) -> Starlette:
+    @asynccontextmanager
+    async def lifespan(app):
+        session_store = None
+        if service is None:
+            build_guardrail_cache()
+            session_store = build_session_store()
+            app.state.service = SupportService(
+                build_conversation_states(session_store),
+                build_pipeline_pool(),
+                span_exporter=build_span_exporter(),
+            )
+        else:
+            app.state.service = service
+        try:
+            yield
+        finally:
+            if session_store is not None:
+                session_store.close()
+
+    return Starlette(
+        routes=[
+            Route("/healthz", healthz),
+            WebSocketRoute("/ws/conversations/{conversation_id}", conversation_socket),
+        ],
+        lifespan=lifespan,
+    )
+
+
+app = create_app()
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    # 워커마다 독립된 이벤트 루프/파이프라인 풀을 가짐 (대화 상태는 공유 저장소에서 복원함)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    uvicorn.run("service:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import json
+
+from models import UserAccountContext
+
+
+async def _connect(url: str, conversation_id: str, context: UserAccountContext):
+    import websockets
+
+    websocket = await websockets.connect(f"{url.rstrip('/')}/ws/conversations/{conversation_id}", max_size=None)
+    await websocket.send(json.dumps({"type": "start", "context": context.model_dump()}))
+    return websocket
+
+
+async def remote_turn(url: str, conversation_id: str, context: UserAccountContext, wav_bytes):
+    """
+    음성 서비스(service.py)에 한 턴의 발화를 보내고 응답 이벤트를 차례로 내보냄.
+    wav_bytes는 bytes 또는 memoryview (UploadedFile.getbuffer()를 복사 없이 그대로 전송함).
+    SupportService.run_turn()과 같은 형식(dict 이벤트, 응답 음성 bytes)을 사용함.
+    """
+    websocket = await _connect(url, conversation_id, context)
+    try:
+        await websocket.send(wav_bytes)
+        async for message in websocket:
+            if isinstance(message, bytes):
+                yield message
+                continue
+            event = json.loads(message)
+            yield event
+            if event["type"] in ("turn_ended", "no_speech", "blocked", "error"):
+                return
+    finally:
+        await websocket.close()
+
+
+async def remote_reset(url: str, conversation_id: str, context: UserAccountContext):
+    websocket = await _connect(url, conversation_id, context)
+    try:
+        await websocket.send(json.dumps({"type": "reset"}))
+        await websocket.recv()
+    finally:
+        await websocket.close()
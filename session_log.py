@@ -0,0 +1,89 @@
+import json
+import sqlite3
+
+from session_memory import item_text
+
+
+# 사이드바 기록 뷰어 한 페이지에 표시할 항목 수
+DEFAULT_PAGE_SIZE = 10
+# 한 번에 읽어올 최대 새 항목 수
+FETCH_BATCH = 500
+
+
+class SessionLogReader:
+    """
+    세션 메시지 테이블을 커서(마지막으로 읽은 id) 기준으로 증분 조회하는 리더.
+    이미 읽은 항목은 메모리에 보관하므로 rerun마다 새로 추가된 항목만 읽고 역직렬화함.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.cursor = 0
+        self.items: list[tuple[int, dict]] = []
+
+    def reset(self):
+        # 세션이 초기화되면 커서와 캐시를 비움
+        self.cursor = 0
+        self.items.clear()
+
+    def _fetch_since(self, after_id: int) -> list[tuple[int, str]]:
+        session = self.session
+        if hasattr(session, "items_since"):
+            return session.items_since(after_id, FETCH_BATCH)
+        # SQLiteSession: 세션 메시지 테이블을 직접 조회함
+        with sqlite3.connect(str(session.db_path)) as conn:
+            return conn.execute(
+                f"""
+                SELECT id, message_data FROM {session.messages_table}
+                WHERE session_id = ? AND id > ?
+                ORDER BY id ASC
+                LIMIT ?
+                """,
+                (session.session_id, after_id, FETCH_BATCH),
+            ).fetchall()
+
+    def refresh(self) -> int:
+        # 커서 이후의 새 항목만 읽어 캐시에 추가하고 추가된 개수를 반환함
+        added = 0
+        while True:
+            rows = self._fetch_since(self.cursor)
+            for row_id, message_data in rows:
+                try:
+                    self.items.append((row_id, json.loads(message_data)))
+                except json.JSONDecodeError:
+                    pass
+                self.cursor = row_id
+            added += len(rows)
+            if len(rows) < FETCH_BATCH:
+                return added
+
+    def page(self, page: int, page_size: int = DEFAULT_PAGE_SIZE) -> list[tuple[int, dict]]:
+        # page 0이 가장 최근 페이지 (각 페이지 내부는 시간순)
+        end = len(self.items) - page * page_size
+        return self.items[max(0, end - page_size) : max(0, end)]
+
+    def page_count(self, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+        return max(1, -(-len(self.items) // page_size))
+
+
+def _item_label(item: dict) -> str:
+    kind = item.get("role") or item.get("type", "item")
+    text = item_text(item).replace("\n", " ")
+    return f"{kind}: {text[:60]}{'…' if len(text) > 60 else ''}"
+
+
+def render_session_log(reader: SessionLogReader, page_size: int = DEFAULT_PAGE_SIZE):
+    """세션 기록을 페이지 단위의 접을 수 있는 목록으로 사이드바에 표시함."""
+    import streamlit as st
+
+    reader.refresh()
+    st.caption(f"Session log · {len(reader.items)} items")
+    if not reader.items:
+        return
+    pages = reader.page_count(page_size)
+    page = 0
+    if pages > 1:
+        page = st.number_input("Page (0 = latest)", min_value=0, max_value=pages - 1, value=0, step=1)
+    for row_id, item in reader.page(int(page), page_size):
+        with st.expander(_item_label(item)):
+            st.json(item, expanded=False)
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import logging
+import threading
+
+from agents import Agent, Runner
+from agents.memory import SessionABC
+from instruction_compiler import count_tokens
+from providers import get_run_config
+
+
+logger = logging.getLogger(__name__)
+
+# 최근 몇 개의 턴(사용자 메시지 기준)을 요약 없이 그대로 유지할지
+DEFAULT_KEEP_TURNS = 6
+# Agent별 기록(history) 토큰 예산 (지정되지 않은 Agent는 DEFAULT_TOKEN_BUDGET)
+DEFAULT_TOKEN_BUDGET = 3000
+AGENT_TOKEN_BUDGETS = {
+    # triage는 분류만 하므로 최근 맥락만 있으면 충분함
+    "Triage Agent": 1200,
+}
+# 오래된 턴을 누적 요약하는 에이전트
+summarizer_agent = Agent(
+    name="Conversation Summarizer",
+    instructions="""
+    고객 지원 대화의 이전 요약과 새로 추가된 대화 기록을 받아 하나의 누적 요약으로 합칩니다.
+    - 고객의 문제, 확인된 정보(주문 번호, 오류 메시지 등), 이미 안내한 조치와 결과를 유지합니다.
+    - 인사말이나 반복되는 내용은 생략합니다.
+    - 한국어로 10문장 이내로 작성합니다.
+    """,
+)
+
+
+def item_text(item) -> str:
+    content = item.get("content") if isinstance(item, dict) else None
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    # 도구 호출/결과 등은 원본 JSON으로 표시함
+    return json.dumps(item, ensure_ascii=False, default=str)
+
+
+def _item_tokens(item) -> int:
+    return count_tokens(json.dumps(item, ensure_ascii=False, default=str))
+
+
+def _turn_starts(items) -> list[int]:
+    # 사용자 메시지가 시작되는 위치 (턴 경계, 도구 호출/결과 쌍을 끊지 않기 위해 사용)
+    starts = [
+        index
+        for index, item in enumerate(items)
+        if isinstance(item, dict) and item.get("role") == "user"
+    ]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return starts
+
+
+class SummarizingSession(SessionABC):
+    """
+    다른 세션(SQLiteSession 등)을 감싸 기록을 토큰 예산 안으로 유지하는 세션.
+    - 최근 keep_turns개의 턴은 그대로 전달함
+    - 그보다 오래된 턴은 백그라운드 스레드에서 요약해 하나의 요약 메시지로 대체함
+    - 전달하는 기록은 Agent별 토큰 예산을 넘지 않도록 오래된 턴부터 제외함
+    원본 기록은 내부 세션에 그대로 남으므로 로그 조회에는 영향이 없음.
+    내부 세션이 load_summary()/save_summary()를 제공하면(TenantSession, ShardedSession) 요약 상태를
+    같은 저장소에 기록하므로, 커넥션과 writer 스레드를 공유하고 shard 이동도 그대로 따라감.
+    """
+
+    def __init__(
+        self,
+        session,
+        keep_turns: int = DEFAULT_KEEP_TURNS,
+        token_budgets: dict[str, int] | None = None,
+        default_budget: int = DEFAULT_TOKEN_BUDGET,
+    ):
+        self.session = session
+        self.session_id = session.session_id
+        self.keep_turns = keep_turns
+        self.token_budgets = AGENT_TOKEN_BUDGETS if token_budgets is None else token_budgets
+        self.default_budget = default_budget
+        # 요약 상태를 내부 세션의 저장소에 기록할 수 있는지 (없으면 메모리에만 유지함)
+        self.persistent = hasattr(session, "load_summary") and hasattr(session, "save_summary")
+        self.summary = ""
+        # 요약에 반영된 앞쪽 기록 개수
+        self.summarized_items = 0
+        # clear_session()마다 증가함 (요약 도중 초기화되었는지 판단하는 데 사용함)
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        if self.persistent:
+            self.reload_summary()
+
+    def for_agent(self, agent_name: str) -> SessionABC:
+        # 해당 Agent의 토큰 예산으로 기록을 조회하는 세션 뷰
+        return _AgentSessionView(self, self.token_budgets.get(agent_name, self.default_budget))
+
+    async def get_items(self, limit: int | None = None) -> list:
+        return await self._budgeted_items(self.default_budget, limit)
+
+    async def _budgeted_items(self, budget: int, limit: int | None = None) -> list:
+        items = await self.session.get_items()
+        with self._lock:
+            summary = self.summary
+            summarized = min(self.summarized_items, len(items))
+        pending = items[summarized:]
+
+        # 최신 턴부터 예산이 허락하는 만큼 포함함 (가장 최근 턴은 항상 포함)
+        summary_item = (
+            {"role": "system", "content": f"이전 대화 요약:\n{summary}"} if summary else None
+        )
+        remaining = budget - (_item_tokens(summary_item) if summary_item else 0)
+        starts = _turn_starts(pending)
+        kept_from = len(pending)
+        for start in reversed(starts):
+            tokens = sum(_item_tokens(item) for item in pending[start:kept_from])
+            if kept_from != len(pending) and tokens > remaining:
+                break
+            remaining -= tokens
+            kept_from = start
+        result = ([summary_item] if summary_item else []) + pending[kept_from:]
+        if limit is not None:
+            result = result[-limit:]
+        return result
+
+    async def add_items(self, items: list) -> None:
+        await self.session.add_items(items)
+        self._schedule_summary()
+
+    async def pop_item(self):
+        return await self.session.pop_item()
+
+    async def clear_session(self) -> None:
+        with self._lock:
+            self.generation += 1
+        await self.session.clear_session()
+        with self._lock:
+            self.summary = ""
+            self.summarized_items = 0
+        await self._save_summary()
+
+    def _schedule_summary(self):
+        # 요약은 응답 경로 밖(별도 스레드의 이벤트 루프)에서 실행하며 동시에 하나만 실행함
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=lambda: asyncio.run(self._summarize()),
+                name=f"summarize-{self.session_id}",
+                daemon=True,
+            )
+            self._worker.start()
+
+    async def _summarize(self):
+        try:
+            with self._lock:
+                generation = self.generation
+            items = await self.session.get_items()
+            with self._lock:
+                summary, summarized = self.summary, self.summarized_items
+            starts = _turn_starts(items)
+            if len(starts) <= self.keep_turns:
+                return
+            cut = starts[-self.keep_turns]
+            if cut <= summarized:
+                return
+
+            transcript = "\n".join(
+                f"{item.get('role', item.get('type', 'item')) if isinstance(item, dict) else 'item'}: {item_text(item)}"
+                for item in items[summarized:cut]
+            )
+            result = await Runner.run(
+                summarizer_agent,
+                f"이전 요약:\n{summary or '(없음)'}\n\n새 대화 기록:\n{transcript}",
+                run_config=get_run_config(),
+            )
+            with self._lock:
+                # 요약 중 기록이 초기화되었으면(첫 요약이라 요약/개수가 그대로여도) 결과를 버림
+                if self.generation != generation or self.summarized_items != summarized:
+                    return
+                self.summary = str(result.final_output)
+                self.summarized_items = cut
+            await self._save_summary()
+        except Exception:
+            logger.exception("session summary failed: %s", self.session_id)
+
+    def reload_summary(self):
+        # 다른 프로세스가 갱신한 요약을 다시 읽음 (행이 없으면 초기화된 대화로 봄)
+        if not self.persistent:
+            return
+        row = self.session.load_summary()
+        with self._lock:
+            if row != (self.summary, self.summarized_items):
+                # 다른 프로세스가 요약하거나 초기화함: 진행 중인 요약 결과는 버림
+                self.generation += 1
+                self.summary, self.summarized_items = row
+
+    async def _save_summary(self):
+        if not self.persistent:
+            return
+        with self._lock:
+            summary, summarized = self.summary, self.summarized_items
+        await self.session.save_summary(summary, summarized)
+
+
+class _AgentSessionView(SessionABC):
+    # 같은 요약 세션을 공유하되 Agent별 토큰 예산으로 기록을 조회함
+    def __init__(self, parent: SummarizingSession, budget: int):
+        self.parent = parent
+        self.session_id = parent.session_id
+        self.budget = budget
+
+    async def get_items(self, limit: int | None = None) -> list:
+        return await self.parent._budgeted_items(self.budget, limit)
+
+    async def add_items(self, items: list) -> None:
+        await self.parent.add_items(items)
+
+    async def pop_item(self):
+        return await self.parent.pop_item()
+
+    async def clear_session(self) -> None:
+        await self.parent.clear_session()
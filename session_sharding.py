@@ -0,0 +1,713 @@
+"""
+고객 ID를 consistent hashing으로 여러 SQLite 파일(shard)에 나누어 저장하는 세션 저장소.
+
+기존 단일 파일 DB를 shard로 옮기기:
+    python session_sharding.py migrate customer-support-memory.db --dir session-shards --shards 4
+
+shard 추가 / 중단된 이동 재개 (서비스 워커는 shard 디렉터리의 manifest.json을 다시 읽어 따라옴):
+    python session_sharding.py add-shard --dir session-shards
+    python session_sharding.py rebalance --dir session-shards
+"""
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from agents.memory import SessionABC
+from session_store import AGENTS_TABLE, CONVERSATIONS_TABLE, MESSAGES_TABLE, SUMMARY_TABLE, SessionStore
+
+
+# 물리 shard 하나당 링 위에 배치하는 가상 노드 수 (키 분포를 고르게 함)
+DEFAULT_VNODES = 64
+DEFAULT_SHARD_DIR = "session-shards"
+DEFAULT_SHARD_COUNT = 4
+# shard 목록과 이동 상태를 기록하는 파일 (shard 디렉터리 안에 둠)
+MANIFEST_NAME = "manifest.json"
+# 워커가 manifest 변경을 확인하는 최소 간격 (초)
+MANIFEST_CHECK_INTERVAL = 0.2
+# 이동 상태를 manifest에 기록한 뒤 다른 워커가 다시 읽고 진행 중인 작업을 끝낼 때까지 기다리는 시간 (초)
+MANIFEST_GRACE = 1.0
+# manifest에 한 번에 이동 중으로 표시하는 고객 수
+MOVE_BATCH = 32
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+def shard_paths(directory: str, count: int) -> list[str]:
+    return [os.path.join(directory, f"shard-{index:02d}.db") for index in range(count)]
+
+
+def read_manifest(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_manifest(path: str, manifest: dict):
+    # 임시 파일에 쓴 뒤 교체하므로 다른 워커가 반쯤 쓴 파일을 읽지 않음
+    temp = f"{path}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp, path)
+
+
+class HashRing:
+    # consistent hashing 링: shard를 추가/제거하면 해당 구간의 키만 이동함
+
+    def __init__(self, nodes=(), vnodes: int = DEFAULT_VNODES):
+        self.vnodes = vnodes
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str):
+        for replica in range(self.vnodes):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str):
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def copy(self) -> "HashRing":
+        ring = HashRing(vnodes=self.vnodes)
+        ring._points = list(self._points)
+        ring._owners = list(self._owners)
+        return ring
+
+    def node_for(self, key) -> str:
+        if not self._points:
+            raise ValueError("hash ring is empty")
+        index = bisect.bisect(self._points, _hash(str(key))) % len(self._points)
+        return self._owners[index]
+
+
+class ShardedSessionStore:
+    """
+    customer_id → shard(SessionStore) 라우팅을 담당하는 저장소.
+    - 각 shard는 독립된 파일/writer 스레드를 가지므로 쓰기 락이 shard 단위로 나뉨
+    - add_shard()는 서비스 중에도 실행 가능함: 이동 대상 고객은 옮기는 동안만 잠시 대기하고,
+      아직 옮기지 않은 고객은 기존 shard에서 계속 처리됨
+    - 요청은 route()로 shard를 찾은 뒤 작업이 끝날 때까지 고객별 사용 중 표시를 유지하고,
+      이동은 진행 중인 요청이 모두 끝난 뒤 시작하므로 이동 중에는 기존 shard에 쓰지 않음
+    - manifest를 주면 shard 목록/이동 상태를 파일에 기록하고, 다른 프로세스가 바꾼 manifest를
+      route() 때 다시 읽어 따라감 (shard 추가/재배치는 한 번에 한 프로세스만 실행함)
+    shard를 나누면 SQLite 쓰기 락이 shard 단위로 나뉘므로 여러 워커 프로세스가 같은
+    디렉터리를 공유할 때 효과가 큼 (한 프로세스 안의 쓰기는 shard별 writer 스레드가 이미 모아서 처리함)
+    """
+
+    def __init__(
+        self,
+        paths: list[str],
+        vnodes: int = DEFAULT_VNODES,
+        manifest: str | None = None,
+        manifest_grace: float = MANIFEST_GRACE,
+        **store_kwargs,
+    ):
+        self.store_kwargs = store_kwargs
+        self.stores: dict[str, SessionStore] = {}
+        for path in paths:
+            self.stores[path] = self._open(path)
+        self.ring = HashRing(paths, vnodes=vnodes)
+        self.manifest = manifest
+        self.manifest_grace = manifest_grace
+        # 링은 바뀌었지만 아직 옮기지 않은 고객 → 기존 shard 경로
+        self._pending: dict[int, str] = {}
+        # 이동 중인 고객 → 완료 이벤트
+        self._migrating: dict[int, threading.Event] = {}
+        # 고객 → shard를 찾은 뒤 아직 끝나지 않은 요청 수
+        self._active: dict[int, int] = {}
+        # add_shard()가 이동 대상 고객을 찾는 동안: (새 링, 새 shard 경로, 완료 이벤트)
+        self._resharding: tuple[HashRing, str, threading.Event] | None = None
+        # 다른 프로세스가 manifest에 기록한 이동 상태 (이 고객들은 manifest가 바뀔 때까지 기다림)
+        self._remote_migrating: set[int] = set()
+        self._remote_resharding: tuple[HashRing, str] | None = None
+        self._remote_wait = threading.Event()
+        self._manifest_mtime: int | None = None
+        self._manifest_checked = 0.0
+        self._manifest_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        if manifest is not None:
+            if os.path.exists(manifest):
+                self._refresh_manifest(force=True)
+            else:
+                with self._lock:
+                    self._save_manifest()
+
+    @classmethod
+    def open(cls, directory: str, count: int = DEFAULT_SHARD_COUNT, **kwargs) -> "ShardedSessionStore":
+        # 디렉터리의 manifest를 기준으로 엶 (없으면 count개의 shard로 새로 만듦)
+        manifest = os.path.join(directory, MANIFEST_NAME)
+        data = read_manifest(manifest)
+        if data is not None:
+            kwargs.setdefault("vnodes", data.get("vnodes", DEFAULT_VNODES))
+            paths = data["shards"]
+        else:
+            paths = shard_paths(directory, count)
+        return cls(paths, manifest=manifest, **kwargs)
+
+    def _open(self, path: str) -> SessionStore:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return SessionStore(path, **self.store_kwargs)
+
+    def _save_manifest(self):
+        # self._lock을 잡은 상태에서 호출함
+        if self.manifest is None:
+            return
+        write_manifest(
+            self.manifest,
+            {
+                "vnodes": self.ring.vnodes,
+                "shards": list(self.stores),
+                "pending": {str(customer_id): path for customer_id, path in self._pending.items()},
+                "migrating": sorted(self._migrating),
+                "adding": self._resharding[1] if self._resharding is not None else None,
+            },
+        )
+        # 직접 쓴 내용은 다시 읽지 않음
+        self._manifest_mtime = os.stat(self.manifest).st_mtime_ns
+
+    def _refresh_manifest(self, force: bool = False):
+        # 다른 프로세스가 manifest를 바꿨으면 shard 목록/이동 상태를 다시 읽음
+        if self.manifest is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._manifest_checked < MANIFEST_CHECK_INTERVAL:
+            return
+        if not self._manifest_lock.acquire(blocking=force):
+            return
+        try:
+            self._manifest_checked = now
+            try:
+                mtime = os.stat(self.manifest).st_mtime_ns
+            except FileNotFoundError:
+                return
+            if mtime == self._manifest_mtime:
+                return
+            data = read_manifest(self.manifest)
+            if data is None:
+                return
+            opened = {path: self._open(path) for path in data["shards"] if path not in self.stores}
+            ring = HashRing(data["shards"], vnodes=data.get("vnodes", self.ring.vnodes))
+            adding = data.get("adding")
+            with self._lock:
+                # 읽는 동안 이 프로세스가 manifest를 새로 썼으면 읽은 내용을 버림
+                if os.stat(self.manifest).st_mtime_ns != mtime:
+                    return
+                self._manifest_mtime = mtime
+                self.stores.update(opened)
+                self.ring = ring
+                self._pending = {int(customer_id): path for customer_id, path in data.get("pending", {}).items()}
+                self._remote_migrating = set(data.get("migrating", []))
+                if adding:
+                    new_ring = ring.copy()
+                    new_ring.add(adding)
+                    self._remote_resharding = (new_ring, adding)
+                else:
+                    self._remote_resharding = None
+        finally:
+            self._manifest_lock.release()
+
+    async def _wait_grace(self):
+        # manifest에 기록한 이동 상태를 다른 워커가 읽고 진행 중인 작업을 끝낼 시간을 줌
+        if self.manifest is not None and self.manifest_grace > 0:
+            await asyncio.sleep(self.manifest_grace)
+
+    def path_for(self, customer_id: int) -> str:
+        self._refresh_manifest()
+        with self._lock:
+            return self._path_for(customer_id)
+
+    def _path_for(self, customer_id: int) -> str:
+        return self._pending.get(customer_id) or self.ring.node_for(customer_id)
+
+    def _enter(self, customer_id: int):
+        # 이동 중이 아니면 사용 중으로 표시하고 (shard, None), 이동 중이면 (None, 완료 이벤트)를 반환함
+        self._refresh_manifest()
+        with self._lock:
+            event = self._migrating.get(customer_id)
+            if event is None and self._resharding is not None:
+                new_ring, new_path, resharding = self._resharding
+                if new_ring.node_for(customer_id) == new_path:
+                    event = resharding
+            if event is None and customer_id in self._remote_migrating:
+                event = self._remote_wait
+            if event is None and self._remote_resharding is not None:
+                new_ring, new_path = self._remote_resharding
+                if new_ring.node_for(customer_id) == new_path:
+                    event = self._remote_wait
+            if event is not None:
+                return None, event
+            self._active[customer_id] = self._active.get(customer_id, 0) + 1
+            return self.stores[self._path_for(customer_id)], None
+
+    def _exit(self, customer_id: int):
+        with self._idle:
+            remaining = self._active[customer_id] - 1
+            if remaining:
+                self._active[customer_id] = remaining
+            else:
+                del self._active[customer_id]
+                self._idle.notify_all()
+
+    @asynccontextmanager
+    async def route(self, customer_id: int):
+        # 고객의 shard를 반환하고, 블록이 끝날 때까지 해당 고객의 이동을 미룸
+        # (다른 프로세스의 이동은 완료 이벤트가 없으므로 manifest를 다시 확인하며 기다림)
+        store, event = self._enter(customer_id)
+        while store is None:
+            await asyncio.to_thread(event.wait, MANIFEST_CHECK_INTERVAL)
+            store, event = self._enter(customer_id)
+        try:
+            yield store
+        finally:
+            self._exit(customer_id)
+
+    @contextmanager
+    def route_sync(self, customer_id: int):
+        # route()의 동기 버전 (호출한 스레드에서 이동 완료를 기다림)
+        store, event = self._enter(customer_id)
+        while store is None:
+            event.wait(MANIFEST_CHECK_INTERVAL)
+            store, event = self._enter(customer_id)
+        try:
+            yield store
+        finally:
+            self._exit(customer_id)
+
+    async def store_for(self, customer_id: int) -> SessionStore:
+        # 이동이 끝난 뒤의 shard (사용 중 표시는 남기지 않으므로 이동과 겹치지 않는 작업에만 사용함)
+        async with self.route(customer_id) as store:
+            return store
+
+    def session(self, customer_id: int, conversation_id: str) -> "ShardedSession":
+        return ShardedSession(self, customer_id, conversation_id)
+
+    async def _customers(self, store: SessionStore) -> list[int]:
+        return [
+            customer_id
+            for (customer_id,) in await store.read(
+                lambda conn: conn.execute(
+                    f"SELECT customer_id FROM {CONVERSATIONS_TABLE} UNION SELECT customer_id FROM {AGENTS_TABLE}"
+                ).fetchall()
+            )
+        ]
+
+    async def add_shard(self, path: str) -> int:
+        """shard를 추가하고 새 링 기준으로 소유자가 바뀐 고객을 옮김. 옮긴 고객 수를 반환함."""
+        if path in self.stores:
+            return 0
+        new_store = self._open(path)
+        new_ring = self.ring.copy()
+        new_ring.add(path)
+        resharding = threading.Event()
+        # 대상 고객을 찾는 동안 새 요청을 잠시 멈추고 진행 중인 요청이 끝나기를 기다림
+        # (찾은 뒤에 기존 shard에 처음 기록된 고객이 옮겨지지 않고 남는 일을 막음)
+        with self._lock:
+            self._resharding = (new_ring, path, resharding)
+            self._save_manifest()
+        try:
+            await self._wait_grace()
+            await asyncio.to_thread(
+                self._wait_idle, lambda customer_id: new_ring.node_for(customer_id) == path
+            )
+            moving = {}
+            for old_path, store in list(self.stores.items()):
+                for customer_id in await self._customers(store):
+                    if new_ring.node_for(customer_id) == path:
+                        moving[customer_id] = old_path
+            with self._lock:
+                self.stores[path] = new_store
+                self._pending.update(moving)
+                self.ring = new_ring
+                self._resharding = None
+                self._save_manifest()
+        finally:
+            with self._lock:
+                if self._resharding is not None:
+                    self._resharding = None
+                    self._save_manifest()
+            resharding.set()
+
+        return await self._move_customers(moving)
+
+    async def rebalance(self) -> int:
+        """
+        링 기준 소유 shard가 아닌 곳에 기록이 남은 고객을 옮김 (중단된 add_shard 재개용).
+        옮긴 고객 수를 반환함.
+        """
+        with self._lock:
+            # 이전 실행이 남긴 이동 표시를 지움 (재배치는 한 번에 한 프로세스만 실행함)
+            self._save_manifest()
+        moving = {}
+        for old_path, store in list(self.stores.items()):
+            for customer_id in await self._customers(store):
+                if self.ring.node_for(customer_id) != old_path:
+                    moving[customer_id] = old_path
+        with self._lock:
+            self._pending.update(moving)
+            self._save_manifest()
+        return await self._move_customers(moving)
+
+    async def _move_customers(self, moving: dict[int, str]) -> int:
+        # MOVE_BATCH명씩 이동 중으로 표시하고 옮김. 실패한 고객은 기존 shard에 남겨 rebalance()로 다시 옮김
+        items = list(moving.items())
+        moved = 0
+        for start in range(0, len(items), MOVE_BATCH):
+            batch = items[start : start + MOVE_BATCH]
+            events = {customer_id: threading.Event() for customer_id, _ in batch}
+            done = set()
+            with self._lock:
+                self._migrating.update(events)
+                self._save_manifest()
+            try:
+                await self._wait_grace()
+                # 이동 표시 전에 기존 shard를 찾은 요청이 끝날 때까지 기다린 뒤 옮김
+                # (이후의 요청은 event를 기다리므로 복사/삭제 도중 기존 shard에 쓰는 요청이 없음)
+                await asyncio.to_thread(self._wait_idle, lambda active_id: active_id in events)
+                for customer_id, old_path in batch:
+                    source = self.stores[old_path]
+                    await copy_customer(source, self.stores[self.ring.node_for(customer_id)], customer_id)
+                    await delete_customer(source, customer_id)
+                    done.add(customer_id)
+            finally:
+                with self._lock:
+                    for customer_id in events:
+                        self._migrating.pop(customer_id, None)
+                        if customer_id in done:
+                            self._pending.pop(customer_id, None)
+                    self._save_manifest()
+                for event in events.values():
+                    event.set()
+            moved += len(done)
+        return moved
+
+    def _wait_idle(self, matches):
+        # matches(customer_id)가 참인 고객의 진행 중인 요청이 모두 끝날 때까지 기다림
+        with self._idle:
+            self._idle.wait_for(lambda: not any(matches(customer_id) for customer_id in self._active))
+
+    def close(self):
+        for store in self.stores.values():
+            store.close()
+
+
+class ShardedSession(SessionABC):
+    # 호출할 때마다 고객의 현재 shard를 찾아 TenantSession으로 위임함
+
+    def __init__(self, sharded: ShardedSessionStore, customer_id: int, conversation_id: str):
+        self.sharded = sharded
+        self.customer_id = customer_id
+        self.conversation_id = conversation_id
+        self.session_id = f"{customer_id}:{conversation_id}"
+
+    @property
+    def db_path(self) -> str:
+        return self.sharded.path_for(self.customer_id)
+
+    @asynccontextmanager
+    async def _session(self):
+        # 작업이 끝날 때까지 고객 이동을 미룸 (이동 직전의 shard에 쓰고 기록이 사라지는 일을 막음)
+        async with self.sharded.route(self.customer_id) as store:
+            yield store.session(self.customer_id, self.conversation_id)
+
+    @contextmanager
+    def _session_sync(self):
+        with self.sharded.route_sync(self.customer_id) as store:
+            yield store.session(self.customer_id, self.conversation_id)
+
+    async def get_items(self, limit: int | None = None) -> list:
+        async with self._session() as session:
+            return await session.get_items(limit)
+
+    def items_since(self, after_id: int, limit: int) -> list[tuple[int, str]]:
+        with self._session_sync() as session:
+            return session.items_since(after_id, limit)
+
+    def active_agent(self) -> str | None:
+        with self._session_sync() as session:
+            return session.active_agent()
+
+    async def save_active_agent(self, agent_name: str) -> None:
+        async with self._session() as session:
+            await session.save_active_agent(agent_name)
+
+    def load_summary(self) -> tuple[str, int]:
+        with self._session_sync() as session:
+            return session.load_summary()
+
+    async def save_summary(self, summary: str, summarized_items: int) -> None:
+        async with self._session() as session:
+            await session.save_summary(summary, summarized_items)
+
+    async def add_items(self, items: list) -> None:
+        async with self._session() as session:
+            await session.add_items(items)
+
+    async def pop_item(self):
+        async with self._session() as session:
+            return await session.pop_item()
+
+    async def clear_session(self) -> None:
+        async with self._session() as session:
+            await session.clear_session()
+
+
+# =============================================================================
+# MIGRATION
+# =============================================================================
+
+
+def _table_exists(conn, table: str) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row is not None
+
+
+async def copy_customer(source, target: SessionStore, customer_id: int) -> int:
+    """
+    고객의 대화/메시지/활성 Agent/요약을 대상 shard로 복사함 (메시지는 id 순서를 유지함).
+    대화 하나를 한 트랜잭션으로 쓰고 대상에 이미 있는 대화는 건너뛰므로 다시 실행해도
+    메시지가 중복되지 않음. 새로 복사한 대화 수를 반환함.
+    """
+    conversations = await source.read(
+        lambda conn: conn.execute(
+            f"SELECT customer_id, conversation_id, created_at, updated_at FROM {CONVERSATIONS_TABLE} WHERE customer_id = ?",
+            (customer_id,),
+        ).fetchall()
+    )
+    copied = 0
+    for conversation in conversations:
+        conversation_id = conversation[1]
+        key = (customer_id, conversation_id)
+        active_agents = await source.read(
+            lambda conn: conn.execute(
+                f"""
+                SELECT customer_id, conversation_id, agent_name, updated_at FROM {AGENTS_TABLE}
+                WHERE customer_id = ? AND conversation_id = ?
+                """,
+                key,
+            ).fetchall()
+        )
+        summaries = await source.read(
+            lambda conn: conn.execute(
+                f"SELECT session_id, summary, summarized_items, updated_at FROM {SUMMARY_TABLE} WHERE session_id = ?",
+                (f"{customer_id}:{conversation_id}",),
+            ).fetchall()
+            if _table_exists(conn, SUMMARY_TABLE)
+            else []
+        )
+        messages = await source.read(
+            lambda conn: conn.execute(
+                f"""
+                SELECT customer_id, conversation_id, message_data, created_at FROM {MESSAGES_TABLE}
+                WHERE customer_id = ? AND conversation_id = ?
+                ORDER BY id ASC
+                """,
+                key,
+            ).fetchall()
+        )
+
+        def _write(conn):
+            if _conversation_exists(conn, *key):
+                return False
+            conn.execute(f"INSERT INTO {CONVERSATIONS_TABLE} VALUES (?, ?, ?, ?)", conversation)
+            conn.executemany(f"INSERT OR REPLACE INTO {AGENTS_TABLE} VALUES (?, ?, ?, ?)", active_agents)
+            if summaries:
+                conn.executemany(f"INSERT OR REPLACE INTO {SUMMARY_TABLE} VALUES (?, ?, ?, ?)", summaries)
+            conn.executemany(
+                f"""
+                INSERT INTO {MESSAGES_TABLE} (customer_id, conversation_id, message_data, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                messages,
+            )
+            return True
+
+        copied += await target.write(_write)
+
+    # 메시지 없이 활성 Agent만 저장된 대화도 옮김 (이미 있으면 건너뜀)
+    active_agents = await source.read(
+        lambda conn: conn.execute(
+            f"SELECT customer_id, conversation_id, agent_name, updated_at FROM {AGENTS_TABLE} WHERE customer_id = ?",
+            (customer_id,),
+        ).fetchall()
+    )
+    await target.write(
+        lambda conn: conn.executemany(f"INSERT OR IGNORE INTO {AGENTS_TABLE} VALUES (?, ?, ?, ?)", active_agents)
+    )
+    return copied
+
+
+async def delete_customer(store: SessionStore, customer_id: int):
+    # 고객의 대화/메시지/활성 Agent/요약을 모두 지움
+    def _delete(conn):
+        conn.execute(f"DELETE FROM {MESSAGES_TABLE} WHERE customer_id = ?", (customer_id,))
+        conn.execute(f"DELETE FROM {CONVERSATIONS_TABLE} WHERE customer_id = ?", (customer_id,))
+        conn.execute(f"DELETE FROM {AGENTS_TABLE} WHERE customer_id = ?", (customer_id,))
+        conn.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE session_id LIKE ?", (f"{customer_id}:%",))
+
+    await store.write(_delete)
+
+
+def _conversation_exists(conn, customer_id: int, conversation_id: str) -> bool:
+    row = conn.execute(
+        f"SELECT 1 FROM {CONVERSATIONS_TABLE} WHERE customer_id = ? AND conversation_id = ?",
+        (customer_id, conversation_id),
+    ).fetchone()
+    return row is not None
+
+
+class ReadOnlySource:
+    # 원본 파일을 읽기 전용으로 열어 SessionStore.read()와 같은 방식으로 조회함
+    # (SessionStore로 열면 DDL 실행, WAL 전환, 자동 체크포인트 해제로 원본 파일이 바뀜)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def _read(self, fn):
+        with self._lock:
+            return fn(self._conn)
+
+    async def read(self, fn):
+        return await asyncio.to_thread(self._read, fn)
+
+    def close(self):
+        self._conn.close()
+
+
+async def migrate_single_file(
+    source_path: str,
+    sharded: ShardedSessionStore,
+    legacy_customer_id: int | None = None,
+) -> int:
+    """
+    단일 파일 DB의 대화를 shard로 복사함 (원본 기록은 지우지 않음). 옮긴 고객 수를 반환함.
+    shard에 이미 있는 대화는 건너뛰므로 중단된 뒤 다시 실행해도 기록이 중복되지 않음.
+    legacy_customer_id를 주면 Agents SDK SQLiteSession 테이블(agent_messages)의 기록도
+    해당 고객의 대화(세션 ID = 대화 ID)로 옮김.
+    원본은 읽기 전용으로 열므로 파일이 바뀌지 않음.
+    """
+    source = ReadOnlySource(source_path)
+    try:
+        customers = [
+            customer_id
+            for (customer_id,) in await source.read(
+                lambda conn: conn.execute(f"SELECT DISTINCT customer_id FROM {CONVERSATIONS_TABLE}").fetchall()
+                if _table_exists(conn, CONVERSATIONS_TABLE)
+                else []
+            )
+        ]
+        for customer_id in customers:
+            async with sharded.route(customer_id) as target:
+                await copy_customer(source, target, customer_id)
+
+        if legacy_customer_id is not None:
+            legacy = await source.read(
+                lambda conn: conn.execute(
+                    "SELECT session_id, message_data, created_at FROM agent_messages ORDER BY id ASC"
+                ).fetchall()
+                if _table_exists(conn, "agent_messages")
+                else []
+            )
+            if legacy:
+                # SQLiteSession의 세션 ID를 대화 ID로 사용하고 직렬화된 항목은 그대로 옮김
+                conversations = sorted({session_id for session_id, _, _ in legacy})
+
+                def _write_legacy(conn):
+                    # 이미 옮긴 대화는 건너뜀
+                    new = {
+                        conversation_id
+                        for conversation_id in conversations
+                        if not _conversation_exists(conn, legacy_customer_id, conversation_id)
+                    }
+                    conn.executemany(
+                        f"INSERT INTO {CONVERSATIONS_TABLE} (customer_id, conversation_id) VALUES (?, ?)",
+                        [(legacy_customer_id, conversation_id) for conversation_id in sorted(new)],
+                    )
+                    conn.executemany(
+                        f"""
+                        INSERT INTO {MESSAGES_TABLE} (customer_id, conversation_id, message_data, created_at)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        [(legacy_customer_id, *row) for row in legacy if row[0] in new],
+                    )
+
+                async with sharded.route(legacy_customer_id) as target:
+                    await target.write(_write_legacy)
+                if legacy_customer_id not in customers:
+                    customers.append(legacy_customer_id)
+        return len(customers)
+    finally:
+        source.close()
+
+
+def _next_shard_path(sharded: ShardedSessionStore, directory: str) -> str:
+    index = 0
+    while True:
+        path = os.path.join(directory, f"shard-{index:02d}.db")
+        if path not in sharded.stores:
+            return path
+        index += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    migrate = subcommands.add_parser("migrate", help="단일 파일 DB를 shard로 옮김")
+    migrate.add_argument("source")
+    migrate.add_argument(
+        "--legacy-customer-id",
+        type=int,
+        default=None,
+        help="SQLiteSession(agent_messages) 기록을 이 고객의 대화로 옮김",
+    )
+    add_shard = subcommands.add_parser("add-shard", help="shard를 추가하고 소유자가 바뀐 고객을 옮김")
+    add_shard.add_argument("--path", default=None, help="새 shard 파일 (기본값: 디렉터리의 다음 shard-NN.db)")
+    rebalance = subcommands.add_parser("rebalance", help="소유 shard가 아닌 곳에 남은 고객을 옮김")
+    for subcommand in (migrate, add_shard, rebalance):
+        subcommand.add_argument("--dir", default=DEFAULT_SHARD_DIR)
+        subcommand.add_argument(
+            "--shards",
+            type=int,
+            default=DEFAULT_SHARD_COUNT,
+            help="manifest가 없을 때 만들 shard 수",
+        )
+    args = parser.parse_args()
+
+    sharded = ShardedSessionStore.open(args.dir, args.shards)
+    try:
+        if args.command == "migrate":
+            moved = asyncio.run(migrate_single_file(args.source, sharded, args.legacy_customer_id))
+            print(f"migrated {moved} customers into {len(sharded.stores)} shards under {args.dir}")
+        elif args.command == "add-shard":
+            path = args.path or _next_shard_path(sharded, args.dir)
+            moved = asyncio.run(sharded.add_shard(path))
+            print(f"added {path}: moved {moved} customers ({len(sharded.stores)} shards)")
+        else:
+            moved = asyncio.run(sharded.rebalance())
+            print(f"rebalanced {moved} customers across {len(sharded.stores)} shards")
+    finally:
+        sharded.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.memory import SessionABC
+
+
+logger = logging.getLogger(__name__)
+
+# 읽기 전용 커넥션 풀 크기 (쓰기는 전용 스레드 하나가 담당함)
+DEFAULT_POOL_SIZE = 4
+# 쓰기 배치: 먼저 들어온 요청 뒤로 이 시간(초) 동안 모인 요청을 한 트랜잭션으로 처리함
+DEFAULT_BATCH_WINDOW = 0.005
+DEFAULT_BATCH_SIZE = 256
+# 이 횟수만큼 커밋할 때마다 WAL 체크포인트를 실행함 (자동 체크포인트는 끔)
+DEFAULT_CHECKPOINT_EVERY = 200
+BUSY_TIMEOUT_MS = 5000
+
+CONVERSATIONS_TABLE = "conversations"
+MESSAGES_TABLE = "conversation_messages"
+# 대화별 현재 활성 Agent (다른 프로세스가 다음 턴을 이어받을 수 있도록 저장함)
+AGENTS_TABLE = "conversation_agents"
+# 대화별 누적 요약 상태 (SummarizingSession이 사용함, session_id = "고객 ID:대화 ID")
+SUMMARY_TABLE = "session_summaries"
+
+SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {CONVERSATIONS_TABLE} (
+        customer_id INTEGER NOT NULL,
+        conversation_id TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (customer_id, conversation_id)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {MESSAGES_TABLE} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        customer_id INTEGER NOT NULL,
+        conversation_id TEXT NOT NULL,
+        message_data TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {AGENTS_TABLE} (
+        customer_id INTEGER NOT NULL,
+        conversation_id TEXT NOT NULL,
+        agent_name TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (customer_id, conversation_id)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+        session_id TEXT PRIMARY KEY,
+        summary TEXT NOT NULL,
+        summarized_items INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # 대화별 기록 조회 (id 순서 = 시간 순서)
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_{MESSAGES_TABLE}_conversation
+    ON {MESSAGES_TABLE} (customer_id, conversation_id, id)
+    """,
+    # 고객별 최근 대화 조회
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_{CONVERSATIONS_TABLE}_recent
+    ON {CONVERSATIONS_TABLE} (customer_id, updated_at DESC)
+    """,
+]
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA wal_autocheckpoint=0")
+    return conn
+
+
+class SessionStore:
+    """
+    여러 고객/대화의 기록을 하나의 SQLite 파일에 저장하는 멀티 테넌트 저장소.
+    - 읽기: 커넥션 풀 + 스레드 풀에서 실행하여 이벤트 루프를 막지 않음
+    - 쓰기: 전용 writer 스레드가 요청을 모아 한 트랜잭션으로 커밋함 (쓰기 락 경합 없음)
+    - WAL: 자동 체크포인트 대신 커밋 횟수 기준으로 PASSIVE 체크포인트, 종료 시 TRUNCATE
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    ):
+        self.path = path
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self.commits = 0
+        self.batched_writes = 0
+
+        writer = _connect(path)
+        for statement in SCHEMA:
+            writer.execute(statement)
+        self._writer = writer
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue()
+        for _ in range(pool_size):
+            self._readers.put(_connect(path))
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="session-read")
+
+        self._writes: queue.Queue = queue.Queue()
+        self._closed = False
+        self._writer_thread = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+        self._writer_thread.start()
+
+    # -------------------------------------------------------------------------
+    # 읽기
+    # -------------------------------------------------------------------------
+
+    def read_sync(self, fn):
+        # 풀에서 커넥션을 빌려 호출한 스레드에서 바로 실행함
+        conn = self._readers.get()
+        try:
+            return fn(conn)
+        finally:
+            self._readers.put(conn)
+
+    async def read(self, fn):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.read_sync, fn)
+
+    # -------------------------------------------------------------------------
+    # 쓰기
+    # -------------------------------------------------------------------------
+
+    async def write(self, fn):
+        # writer 스레드가 다른 요청과 함께 한 트랜잭션으로 실행하고 결과를 돌려줌
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._writes.put((fn, loop, future))
+        return await future
+
+    def _write_loop(self):
+        while True:
+            first = self._writes.get()
+            if first is None:
+                break
+            batch = [first]
+            # 첫 요청 뒤로 짧은 시간 동안 들어온 요청을 모음
+            time.sleep(self.batch_window)
+            while len(batch) < self.batch_size:
+                try:
+                    request = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._writes.put(None)
+                    break
+                batch.append(request)
+            try:
+                self._commit_batch(batch)
+            except Exception as e:
+                # BEGIN/COMMIT/ROLLBACK 자체가 실패해도 writer 스레드는 계속 돌아야 함
+                # (이 배치의 요청만 실패로 돌려주고 다음 배치를 처리함)
+                logger.exception("session write batch failed: %s", self.path)
+                self._abort_batch(batch, e)
+        self._checkpoint("TRUNCATE")
+
+    def _commit_batch(self, batch):
+        conn = self._writer
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        for index, (fn, _, _) in enumerate(batch):
+            # 요청마다 savepoint를 두어 하나가 실패해도 나머지는 커밋함
+            conn.execute(f"SAVEPOINT w{index}")
+            try:
+                results.append((True, fn(conn)))
+                conn.execute(f"RELEASE w{index}")
+            except Exception as e:
+                conn.execute(f"ROLLBACK TO w{index}")
+                conn.execute(f"RELEASE w{index}")
+                results.append((False, e))
+        try:
+            conn.execute("COMMIT")
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            results = [(False, e)] * len(batch)
+
+        self.commits += 1
+        self.batched_writes += len(batch)
+        if self.commits % self.checkpoint_every == 0:
+            self._checkpoint("PASSIVE")
+
+        for (_, loop, future), (ok, value) in zip(batch, results):
+            _resolve_threadsafe(loop, future, ok, value)
+
+    def _abort_batch(self, batch, error: Exception):
+        if self._writer.in_transaction:
+            try:
+                self._writer.execute("ROLLBACK")
+            except sqlite3.Error:
+                logger.exception("rollback failed: %s", self.path)
+        for _, loop, future in batch:
+            _resolve_threadsafe(loop, future, False, error)
+
+    def _checkpoint(self, mode: str):
+        try:
+            self._writer.execute(f"PRAGMA wal_checkpoint({mode})")
+        except sqlite3.Error:
+            logger.exception("wal checkpoint failed: %s", self.path)
+
+    # -------------------------------------------------------------------------
+    # 대화
+    # -------------------------------------------------------------------------
+
+    def session(self, customer_id: int, conversation_id: str) -> "TenantSession":
+        return TenantSession(self, customer_id, conversation_id)
+
+    async def list_conversations(self, customer_id: int, limit: int = 20) -> list[tuple[str, str]]:
+        # 고객의 최근 대화 (conversation_id, updated_at)
+        return await self.read(
+            lambda conn: conn.execute(
+                f"""
+                SELECT conversation_id, updated_at FROM {CONVERSATIONS_TABLE}
+                WHERE customer_id = ?
+                ORDER BY updated_at DESC
+                LIMIT ?
+                """,
+                (customer_id, limit),
+            ).fetchall()
+        )
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer_thread.join()
+        self._executor.shutdown(wait=True)
+        self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+
+def _resolve(future, ok, value):
+    if future.done():
+        return
+    if ok:
+        future.set_result(value)
+    else:
+        future.set_exception(value)
+
+
+def _resolve_threadsafe(loop, future, ok, value):
+    # 요청한 이벤트 루프가 이미 닫혔으면 결과를 받을 곳이 없으므로 무시함
+    try:
+        loop.call_soon_threadsafe(_resolve, future, ok, value)
+    except RuntimeError:
+        pass
+
+
+class TenantSession(SessionABC):
+    # 고객 ID + 대화 ID로 구분되는 세션 (Agents SDK Session 인터페이스 구현)
+
+    def __init__(self, store: SessionStore, customer_id: int, conversation_id: str):
+        self.store = store
+        self.customer_id = customer_id
+        self.conversation_id = conversation_id
+        self.session_id = f"{customer_id}:{conversation_id}"
+        # 요약 상태 등 부가 정보를 같은 파일에 저장할 수 있도록 노출함
+        self.db_path = store.path
+
+    async def get_items(self, limit: int | None = None) -> list:
+        key = (self.customer_id, self.conversation_id)
+
+        def _read(conn):
+            if limit is None:
+                rows = conn.execute(
+                    f"""
+                    SELECT message_data FROM {MESSAGES_TABLE}
+                    WHERE customer_id = ? AND conversation_id = ?
+                    ORDER BY id ASC
+                    """,
+                    key,
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    f"""
+                    SELECT message_data FROM {MESSAGES_TABLE}
+                    WHERE customer_id = ? AND conversation_id = ?
+                    ORDER BY id DESC
+                    LIMIT ?
+                    """,
+                    (*key, limit),
+                ).fetchall()
+                rows.reverse()
+            return rows
+
+        items = []
+        for (message_data,) in await self.store.read(_read):
+            try:
+                items.append(json.loads(message_data))
+            except json.JSONDecodeError:
+                continue
+        return items
+
+    def items_since(self, after_id: int, limit: int) -> list[tuple[int, str]]:
+        # 세션 로그 뷰어용 증분 조회 (id, 직렬화된 항목)
+        return self.store.read_sync(
+            lambda conn: conn.execute(
+                f"""
+                SELECT id, message_data FROM {MESSAGES_TABLE}
+                WHERE customer_id = ? AND conversation_id = ? AND id > ?
+                ORDER BY id ASC
+                LIMIT ?
+                """,
+                (self.customer_id, self.conversation_id, after_id, limit),
+            ).fetchall()
+        )
+
+    def active_agent(self) -> str | None:
+        # 마지막 턴이 끝났을 때의 활성 Agent 이름 (없으면 None)
+        row = self.store.read_sync(
+            lambda conn: conn.execute(
+                f"SELECT agent_name FROM {AGENTS_TABLE} WHERE customer_id = ? AND conversation_id = ?",
+                (self.customer_id, self.conversation_id),
+            ).fetchone()
+        )
+        return row[0] if row else None
+
+    async def save_active_agent(self, agent_name: str) -> None:
+        await self.store.write(
+            lambda conn: conn.execute(
+                f"""
+                INSERT INTO {AGENTS_TABLE} (customer_id, conversation_id, agent_name) VALUES (?, ?, ?)
+                ON CONFLICT (customer_id, conversation_id)
+                DO UPDATE SET agent_name = excluded.agent_name, updated_at = CURRENT_TIMESTAMP
+                """,
+                (self.customer_id, self.conversation_id, agent_name),
+            )
+        )
+
+    def load_summary(self) -> tuple[str, int]:
+        # 저장된 (요약, 요약에 반영된 기록 개수). 없으면 ("", 0)
+        row = self.store.read_sync(
+            lambda conn: conn.execute(
+                f"SELECT summary, summarized_items FROM {SUMMARY_TABLE} WHERE session_id = ?",
+                (self.session_id,),
+            ).fetchone()
+        )
+        return tuple(row) if row is not None else ("", 0)
+
+    async def save_summary(self, summary: str, summarized_items: int) -> None:
+        await self.store.write(
+            lambda conn: conn.execute(
+                f"""
+                INSERT INTO {SUMMARY_TABLE} (session_id, summary, summarized_items) VALUES (?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    summary = excluded.summary,
+                    summarized_items = excluded.summarized_items,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (self.session_id, summary, summarized_items),
+            )
+        )
+
+    async def add_items(self, items: list) -> None:
+        if not items:
+            return
+        key = (self.customer_id, self.conversation_id)
+        rows = [(*key, json.dumps(item)) for item in items]
+
+        def _write(conn):
+            conn.execute(
+                f"""
+                INSERT INTO {CONVERSATIONS_TABLE} (customer_id, conversation_id) VALUES (?, ?)
+                ON CONFLICT (customer_id, conversation_id) DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+                """,
+                key,
+            )
+            conn.executemany(
+                f"INSERT INTO {MESSAGES_TABLE} (customer_id, conversation_id, message_data) VALUES (?, ?, ?)",
+                rows,
+            )
+
+        await self.store.write(_write)
+
+    async def pop_item(self):
+        key = (self.customer_id, self.conversation_id)
+
+        def _pop(conn):
+            row = conn.execute(
+                f"""
+                DELETE FROM {MESSAGES_TABLE}
+                WHERE id = (
+                    SELECT id FROM {MESSAGES_TABLE}
+                    WHERE customer_id = ? AND conversation_id = ?
+                    ORDER BY id DESC
+                    LIMIT 1
+                )
+                RETURNING message_data
+                """,
+                key,
+            ).fetchone()
+            return row[0] if row else None
+
+        message_data = await self.store.write(_pop)
+        if message_data is None:
+            return None
+        try:
+            return json.loads(message_data)
+        except json.JSONDecodeError:
+            return None
+
+    async def clear_session(self) -> None:
+        key = (self.customer_id, self.conversation_id)
+
+        def _clear(conn):
+            conn.execute(
+                f"DELETE FROM {MESSAGES_TABLE} WHERE customer_id = ? AND conversation_id = ?",
+                key,
+            )
+            conn.execute(
+                f"DELETE FROM {CONVERSATIONS_TABLE} WHERE customer_id = ? AND conversation_id = ?",
+                key,
+            )
+            conn.execute(
+                f"DELETE FROM {AGENTS_TABLE} WHERE customer_id = ? AND conversation_id = ?",
+                key,
+            )
+
+        await self.store.write(_clear)
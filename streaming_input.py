@@ -0,0 +1,112 @@
+import asyncio
+
+import numpy as np
+from agents.voice import StreamedAudioInput, STTModelSettings, VoicePipeline
+
+from audio_ingest import STT_SAMPLE_RATE
+from audio_playback import AudioPlayer
+
+
+# 스트리밍 모드의 서버 측 턴 감지 설정
+# semantic_vad는 문장이 끝났는지를 의미 기준으로 판단하므로 말 사이 쉼에 덜 민감함
+STREAMING_STT_SETTINGS = STTModelSettings(
+    turn_detection={"type": "semantic_vad", "eagerness": "high"},
+)
+
+# 마이크에서 한 번에 읽어 STT로 보내는 청크 길이
+CHUNK_MS = 40
+
+
+class MicrophoneStream:
+    """
+    마이크 입력을 녹음이 끝나기를 기다리지 않고 청크 단위로 StreamedAudioInput에 밀어넣음.
+    sounddevice 콜백은 오디오 스레드에서 실행되므로 call_soon_threadsafe로 이벤트 루프에 전달함.
+    """
+
+    def __init__(
+        self,
+        audio_input: StreamedAudioInput,
+        samplerate: int = STT_SAMPLE_RATE,
+        chunk_ms: int = CHUNK_MS,
+    ):
+        self.audio_input = audio_input
+        self.samplerate = samplerate
+        self.blocksize = samplerate * chunk_ms // 1000
+        # 에이전트 음성이 재생되는 동안에는 마이크 입력을 보내지 않음 (자기 음성 전사 방지)
+        self.muted = False
+        self._stream = None
+        self._loop = None
+
+    def start(self):
+        import sounddevice as sd
+
+        self._loop = asyncio.get_running_loop()
+        self._stream = sd.InputStream(
+            samplerate=self.samplerate,
+            channels=1,
+            dtype=np.int16,
+            blocksize=self.blocksize,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def _callback(self, indata, frames, time_info, status):
+        if self.muted:
+            return
+        # indata 버퍼는 콜백 이후 재사용되므로 복사해서 넘김
+        chunk = indata[:, 0].copy()
+        self._loop.call_soon_threadsafe(self.audio_input.queue.put_nowait, chunk)
+
+    def stop(self):
+        if self._stream is None:
+            return
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+        # None은 입력 스트림 종료 신호
+        self._loop.call_soon_threadsafe(self.audio_input.queue.put_nowait, None)
+
+
+async def run_streaming_conversation(
+    pipeline: VoicePipeline,
+    player: AudioPlayer,
+    max_turns: int = 1,
+    timeout: float = 60.0,
+) -> int:
+    """
+    마이크를 열고 VoicePipeline을 스트리밍 입력으로 실행함.
+    발화의 끝은 STT 세션의 턴 감지가 결정하며, 전사가 확정되는 즉시
+    CustomWorkflow.run이 시작됨. 처리한 턴 수를 반환함.
+    """
+    audio_input = StreamedAudioInput()
+    microphone = MicrophoneStream(audio_input)
+    turns = 0
+
+    result = await pipeline.run(audio_input)
+    microphone.start()
+    player.start()
+    try:
+        async with asyncio.timeout(timeout):
+            async for event in result.stream():
+                if event.type == "voice_stream_event_audio":
+                    await player.feed(event.data)
+                elif event.type == "voice_stream_event_lifecycle":
+                    if event.event == "turn_started":
+                        microphone.muted = True
+                        player.begin_turn()
+                    elif event.event == "turn_ended":
+                        player.end_turn()
+                        await player.drain()
+                        microphone.muted = False
+                        turns += 1
+                        if turns >= max_turns:
+                            break
+                    elif event.event == "session_ended":
+                        break
+    except TimeoutError:
+        # 제한 시간 안에 발화가 끝나지 않으면 세션을 종료함
+        pass
+    finally:
+        player.end_turn()
+        microphone.stop()
+    return turns
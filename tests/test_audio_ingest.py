@@ -0,0 +1,109 @@
+import io
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from audio_ingest import WAVE_FORMAT_IEEE_FLOAT, convert_audio, parse_wav, resample
+
+
+def _wav(samples: np.ndarray, rate: int, channels: int = 1) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def _riff(chunks: list[tuple[bytes, bytes]]) -> bytes:
+    body = b"WAVE" + b"".join(
+        chunk_id + struct.pack("<I", len(data)) + data + (b"\0" if len(data) & 1 else b"")
+        for chunk_id, data in chunks
+    )
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def test_parse_wav_skips_unknown_chunks_without_copying():
+    pcm = np.arange(8, dtype="<i2").tobytes()
+    fmt = struct.pack("<HHIIHH", 1, 1, 16000, 32000, 2, 16)
+    # 홀수 길이 청크 뒤의 패딩 바이트도 건너뛰어야 함
+    data = bytearray(_riff([(b"fmt ", fmt), (b"LIST", b"abc"), (b"data", pcm)]))
+
+    payload = parse_wav(data)
+    assert (payload.channels, payload.sample_width, payload.sample_rate) == (1, 2, 16000)
+    assert payload.frames == 8
+    assert bytes(payload.pcm) == pcm
+    # 원본 버퍼의 뷰이므로 원본을 바꾸면 그대로 보임
+    data[-2:] = b"\x00\x7f"
+    assert bytes(payload.pcm[-2:]) == b"\x00\x7f"
+
+
+def test_parse_wav_streaming_data_size_uses_rest_of_buffer():
+    pcm = np.arange(5, dtype="<i2").tobytes()
+    fmt = struct.pack("<HHIIHH", 1, 1, 16000, 32000, 2, 16)
+    data = bytearray(_riff([(b"fmt ", fmt), (b"data", pcm)]))
+    # data 크기를 0xFFFFFFFF로 기록한 스트리밍 녹음 + 뒤에 잘린 반쪽 샘플
+    size_at = data.index(b"data") + 4
+    data[size_at : size_at + 4] = struct.pack("<I", 0xFFFFFFFF)
+    data += b"\x01"
+
+    assert parse_wav(data).frames == 5
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"not a wav file", "RIFF"),
+        (_riff([(b"data", b"\0\0")]), "fmt"),
+        (_riff([(b"fmt ", struct.pack("<HHIIHH", 1, 1, 16000, 32000, 2, 16))]), "data"),
+    ],
+)
+def test_parse_wav_rejects_malformed_input(data, message):
+    with pytest.raises(ValueError, match=message):
+        parse_wav(data)
+
+
+def test_convert_audio_returns_view_for_target_format():
+    samples = (np.sin(np.arange(240) / 5) * 1000).astype(np.int16)
+    data = _wav(samples, 24000)
+    uploaded = io.BytesIO(data)
+
+    audio = convert_audio(uploaded)
+    assert audio.dtype == np.int16
+    np.testing.assert_array_equal(audio, samples)
+    # 16-bit 모노 + 목표 레이트면 복사하지 않음
+    assert not audio.flags.owndata
+
+
+def test_convert_audio_downmixes_and_resamples():
+    left = np.full(480, 1000, dtype=np.int16)
+    right = np.full(480, 3000, dtype=np.int16)
+    stereo = np.column_stack([left, right]).reshape(-1)
+
+    audio = convert_audio(_wav(stereo, 48000, channels=2), target_rate=24000)
+    assert audio.dtype == np.int16
+    assert len(audio) == 240
+    assert np.all(audio == 2000)
+
+
+def test_convert_audio_float_format():
+    samples = np.array([0.0, 0.5, -0.5, 2.0], dtype="<f4")
+    fmt = struct.pack("<HHIIHH", WAVE_FORMAT_IEEE_FLOAT, 1, 24000, 96000, 4, 32)
+    audio = convert_audio(_riff([(b"fmt ", fmt), (b"data", samples.tobytes())]))
+    assert audio.tolist() == [0, 16383, -16383, 32767]
+
+
+def test_resample_integer_factor_averages_blocks():
+    samples = np.array([0, 2, 4, 6, 8, 10, 12], dtype=np.int16)
+    assert resample(samples, 48000, 24000).tolist() == [1.0, 5.0, 9.0]
+
+
+def test_resample_linear_interpolation_length():
+    samples = np.arange(441, dtype=np.int16)
+    result = resample(samples, 44100, 24000)
+    assert len(result) == 240
+    assert result[0] == 0
+    assert np.all(np.diff(result) > 0)
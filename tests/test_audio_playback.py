@@ -0,0 +1,80 @@
+import asyncio
+
+import numpy as np
+
+from audio_playback import AudioPlayer, RingBuffer
+
+
+def test_ring_buffer_wraps_around():
+    buffer = RingBuffer(8)
+    assert buffer.write(np.arange(6, dtype=np.int16)) == 6
+    out = np.zeros(4, dtype=np.int16)
+    assert buffer.read_into(out) == 4
+    assert out.tolist() == [0, 1, 2, 3]
+
+    # 쓰기 위치가 끝을 넘어 앞쪽으로 이어짐
+    assert buffer.write(np.arange(10, 16, dtype=np.int16)) == 6
+    assert len(buffer) == 8
+    out = np.zeros(8, dtype=np.int16)
+    assert buffer.read_into(out) == 8
+    assert out.tolist() == [4, 5, 10, 11, 12, 13, 14, 15]
+    assert len(buffer) == 0
+
+
+def test_ring_buffer_writes_only_free_space():
+    buffer = RingBuffer(4)
+    assert buffer.write(np.arange(6, dtype=np.int16)) == 4
+    assert buffer.free() == 0
+    assert buffer.write(np.ones(2, dtype=np.int16)) == 0
+
+
+def test_ring_buffer_partial_read_and_clear():
+    buffer = RingBuffer(4)
+    buffer.write(np.array([7, 8], dtype=np.int16))
+    out = np.full(4, -1, dtype=np.int16)
+    assert buffer.read_into(out) == 2
+    assert out[:2].tolist() == [7, 8]
+
+    buffer.write(np.array([1, 2, 3], dtype=np.int16))
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.free() == 4
+
+
+def _play(player, frames):
+    out = np.full((frames, 1), -1, dtype=np.int16)
+    player._callback(out, frames, None, None)
+    return out.reshape(-1)
+
+
+def test_player_waits_for_preroll_then_counts_underrun():
+    player = AudioPlayer(samplerate=1000, preroll_ms=10, blocksize=4)
+    player.begin_turn()
+    asyncio.run(player.feed(np.arange(1, 6, dtype=np.int16)))
+
+    # pre-roll(10개) 전에는 무음
+    assert _play(player, 4).tolist() == [0, 0, 0, 0]
+    assert player.stats.samples_played == 0
+
+    asyncio.run(player.feed(np.arange(6, 13, dtype=np.int16)))
+    assert _play(player, 8).tolist() == [1, 2, 3, 4, 5, 6, 7, 8]
+    # 응답 도중 데이터가 모자라면 underrun
+    assert _play(player, 8).tolist() == [9, 10, 11, 12, 0, 0, 0, 0]
+    assert player.stats.underruns == 1
+
+
+def test_player_flushes_tail_after_turn_ends():
+    player = AudioPlayer(samplerate=1000, preroll_ms=10, blocksize=4)
+    player.begin_turn()
+    asyncio.run(player.feed(np.array([1, 2, 3], dtype=np.int16)))
+    player.end_turn()
+    # 턴이 끝나면 pre-roll보다 적어도 남은 샘플을 재생하고 underrun으로 세지 않음
+    assert _play(player, 4).tolist() == [1, 2, 3, 0]
+    assert player.stats.underruns == 0
+
+
+def test_feed_without_stream_drops_overflow():
+    player = AudioPlayer(samplerate=1000, buffer_seconds=0.004)
+    asyncio.run(player.feed(np.arange(10, dtype=np.int16)))
+    assert len(player.buffer) == 4
+    assert player.stats.samples_dropped == 6
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+import fast_router
+from fast_router import FastRouter
+from my_agents.triage_agent import topic_classifier, triage_instruction_seeds
+
+AGENTS = {
+    "TECHNICAL SUPPORT": "technical",
+    "BILLING SUPPORT": "billing",
+    "ORDER MANAGEMENT": "order",
+    "ACCOUNT MANAGEMENT": "account",
+}
+
+
+def _router(**kwargs):
+    return FastRouter(triage_instruction_seeds, AGENTS, entry_agent="triage", decision_log=None, **kwargs)
+
+
+def _route(router, text):
+    return asyncio.run(router.route(text))
+
+
+@pytest.mark.parametrize(
+    "text, category",
+    [
+        ("두 번 결제됐어요", "BILLING SUPPORT"),
+        ("비밀번호를 잊어버렸어요", "ACCOUNT MANAGEMENT"),
+        ("주문한 상품이 아직 안 왔어요", "ORDER MANAGEMENT"),
+    ],
+)
+def test_clear_requests_are_routed(text, category):
+    router = _router(topic_classifier=topic_classifier)
+    decision = _route(router, text)
+    assert decision.category == category
+    assert decision.source == "ngram"
+    assert decision.confidence >= router.threshold
+    assert router.agent_for(decision) == AGENTS[category]
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["카드 게임 규칙 알려줘", "로그인 페이지 코드 짜줘", "결제 시스템 설계 방법 알려줘", "오늘 날씨 어때요?"],
+)
+def test_classifier_gates_routing(text):
+    decision = _route(_router(topic_classifier=topic_classifier), text)
+    assert not decision.routed
+    assert decision.source == "classifier"
+    assert _router(topic_classifier=topic_classifier).agent_for(decision) is None
+
+
+def test_keywords_alone_do_not_route():
+    # 키워드가 여러 개여도 카테고리 예시와의 유사도가 낮으면 triage Agent에 맡김
+    decision = _route(_router(), "카드 결제 요금 구독")
+    assert decision.keywords == ["결제", "요금", "구독", "카드"]
+    assert not decision.routed
+    assert decision.reason == "low category similarity"
+
+
+def test_category_similarity_threshold(monkeypatch):
+    router = _router()
+    assert _route(router, "두 번 결제됐어요").routed
+
+    monkeypatch.setitem(fast_router.MIN_CATEGORY_SIMILARITY, "ngram", 1.01)
+    decision = _route(router, "두 번 결제됐어요")
+    assert not decision.routed
+    assert decision.reason == "low category similarity"
+
+
+def test_min_score_and_confidence_thresholds(monkeypatch):
+    decision = _route(_router(), "두 번 결제됐어요")
+    top = max(decision.scores.values())
+
+    monkeypatch.setattr(fast_router, "MIN_SCORE", top + 0.01)
+    assert _route(_router(), "두 번 결제됐어요").reason == "low score"
+    monkeypatch.undo()
+
+    strict = _route(_router(threshold=decision.confidence + 0.01), "두 번 결제됐어요")
+    assert not strict.routed
+    assert strict.reason == "low confidence"
+
+
+def test_decision_log_is_written(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    router = FastRouter(triage_instruction_seeds, AGENTS, entry_agent="triage", decision_log=str(path))
+    _route(router, "두 번 결제됐어요")
+    _route(router, "카드 게임 규칙 알려줘")
+    router.close()
+
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+import guardrail_cache
+from guardrail_cache import GuardrailCache, normalize_text
+
+
+class Verdict(BaseModel):
+    is_off_topic: bool
+    reason: str = ""
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(guardrail_cache.time, "time", clock)
+    return clock
+
+
+def test_normalized_text_shares_entry():
+    cache = GuardrailCache()
+    cache.put("topic", "v1", "환불해 주세요.", Verdict(is_off_topic=False))
+
+    assert normalize_text("  환불해   주세요!! ") == normalize_text("환불해 주세요")
+    assert cache.get("topic", "v1", "환불해  주세요!", Verdict) == Verdict(is_off_topic=False)
+    # 버전이 다르면 이전 판정을 사용하지 않음
+    assert cache.get("topic", "v2", "환불해 주세요", Verdict) is None
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = GuardrailCache(ttl=10)
+    cache.put("topic", "v1", "hello", Verdict(is_off_topic=True))
+
+    clock.now += 10
+    assert cache.get("topic", "v1", "hello", Verdict) is not None
+
+    clock.now += 0.5
+    assert cache.get("topic", "v1", "hello", Verdict) is None
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+    assert cache._bytes == 0
+
+
+def test_lru_evicts_least_recently_used():
+    cache = GuardrailCache(max_entries=2)
+    cache.put("topic", "v1", "a", Verdict(is_off_topic=False))
+    cache.put("topic", "v1", "b", Verdict(is_off_topic=False))
+    # a를 조회하면 가장 최근 항목이 되므로 b가 밀려남
+    cache.get("topic", "v1", "a", Verdict)
+    cache.put("topic", "v1", "c", Verdict(is_off_topic=False))
+
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    assert cache.get("topic", "v1", "a", Verdict) is not None
+    assert cache.get("topic", "v1", "b", Verdict) is None
+    assert cache.get("topic", "v1", "c", Verdict) is not None
+
+
+def test_byte_limit_evicts_oldest():
+    entry_bytes = 64 + len(Verdict(is_off_topic=False, reason="x" * 100).model_dump_json())
+    cache = GuardrailCache(max_bytes=entry_bytes * 2)
+    for text in ("a", "b", "c"):
+        cache.put("topic", "v1", text, Verdict(is_off_topic=False, reason="x" * 100))
+
+    assert len(cache) == 2
+    assert cache._bytes == entry_bytes * 2
+    assert cache.get("topic", "v1", "a", Verdict) is None
+
+
+def test_replacing_entry_keeps_byte_count():
+    cache = GuardrailCache()
+    cache.put("topic", "v1", "a", Verdict(is_off_topic=False, reason="long reason"))
+    cache.put("topic", "v1", "a", Verdict(is_off_topic=True))
+
+    key = cache.make_key("topic", "v1", "a")
+    assert cache._bytes == len(key) + len(Verdict(is_off_topic=True).model_dump_json())
+    assert cache.get("topic", "v1", "a", Verdict).is_off_topic
+
+
+def test_sqlite_persists_and_respects_ttl(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    GuardrailCache(ttl=10, path=path).put("topic", "v1", "hello", Verdict(is_off_topic=True))
+
+    restarted = GuardrailCache(ttl=10, path=path)
+    assert asyncio.run(restarted.aget("topic", "v1", "hello", Verdict)) == Verdict(is_off_topic=True)
+    assert restarted.stats.disk_hits == 1
+    # 메모리에 올라온 뒤에는 메모리에서 조회함
+    assert restarted.get("topic", "v1", "hello", Verdict) is not None
+    assert restarted.stats.disk_hits == 1
+
+    clock.now += 11
+    assert GuardrailCache(ttl=10, path=path).get("topic", "v1", "hello", Verdict) is None
+
+
+def test_new_version_removes_old_rows(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = GuardrailCache(path=path)
+    cache.put("topic", "v1", "hello", Verdict(is_off_topic=True))
+    asyncio.run(cache.aput("topic", "v2", "bye", Verdict(is_off_topic=False)))
+
+    rows = cache._conn().execute("SELECT version FROM guardrail_verdicts").fetchall()
+    assert rows == [("v2",)]
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import os
+from collections import Counter
+
+import pytest
+
+from session_sharding import HashRing, ShardedSessionStore, migrate_single_file, read_manifest
+from session_store import CONVERSATIONS_TABLE, SessionStore
+
+CUSTOMERS = range(1, 41)
+
+
+def _open(directory, count=2):
+    return ShardedSessionStore.open(str(directory), count, manifest_grace=0, batch_window=0)
+
+
+async def _fill(sharded, customers=CUSTOMERS):
+    await asyncio.gather(*(sharded.session(c, "c1").add_items([{"customer": c}]) for c in customers))
+    await asyncio.gather(*(sharded.session(c, "c1").save_active_agent(f"agent-{c}") for c in customers))
+
+
+async def _items(sharded, customers=CUSTOMERS):
+    return {c: await sharded.session(c, "c1").get_items() for c in customers}
+
+
+def _customers_in(store):
+    return {
+        customer_id
+        for (customer_id,) in store.read_sync(
+            lambda conn: conn.execute(f"SELECT customer_id FROM {CONVERSATIONS_TABLE}").fetchall()
+        )
+    }
+
+
+def test_hash_ring_distributes_keys_evenly():
+    ring = HashRing([f"shard-{i}" for i in range(4)])
+    counts = Counter(ring.node_for(key) for key in range(4000))
+
+    assert set(counts) == {f"shard-{i}" for i in range(4)}
+    assert all(600 < count < 1400 for count in counts.values())
+
+
+def test_hash_ring_moves_only_keys_of_changed_node():
+    ring = HashRing([f"shard-{i}" for i in range(4)])
+    before = {key: ring.node_for(key) for key in range(4000)}
+
+    grown = ring.copy()
+    grown.add("shard-4")
+    moved = [key for key in before if grown.node_for(key) != before[key]]
+    # 추가한 shard로 가는 키만 이동하고, 이동량은 대략 1/5
+    assert all(grown.node_for(key) == "shard-4" for key in moved)
+    assert 400 < len(moved) < 1200
+    # copy()한 링은 원본에 영향을 주지 않음
+    assert all(ring.node_for(key) == before[key] for key in before)
+
+    grown.remove("shard-4")
+    assert all(grown.node_for(key) == before[key] for key in before)
+
+    with pytest.raises(ValueError):
+        HashRing().node_for(1)
+
+
+def test_add_shard_moves_only_reassigned_customers(tmp_path):
+    sharded = _open(tmp_path)
+    try:
+        asyncio.run(_fill(sharded))
+        before = {c: sharded.path_for(c) for c in CUSTOMERS}
+        new_path = str(tmp_path / "shard-02.db")
+
+        moved = asyncio.run(sharded.add_shard(new_path))
+
+        reassigned = {c for c in CUSTOMERS if sharded.path_for(c) != before[c]}
+        assert moved == len(reassigned) > 0
+        assert all(sharded.path_for(c) == new_path for c in reassigned)
+        assert _customers_in(sharded.stores[new_path]) == reassigned
+        for path, store in sharded.stores.items():
+            if path != new_path:
+                assert not _customers_in(store) & reassigned
+        assert asyncio.run(_items(sharded)) == {c: [{"customer": c}] for c in CUSTOMERS}
+        assert all(sharded.session(c, "c1").active_agent() == f"agent-{c}" for c in CUSTOMERS)
+
+        manifest = read_manifest(str(tmp_path / "manifest.json"))
+        assert manifest["shards"] == [str(tmp_path / "shard-00.db"), str(tmp_path / "shard-01.db"), new_path]
+        assert manifest["pending"] == {} and manifest["migrating"] == [] and manifest["adding"] is None
+    finally:
+        sharded.close()
+
+
+def test_second_instance_follows_manifest(tmp_path):
+    first = _open(tmp_path)
+    second = _open(tmp_path)
+    try:
+        asyncio.run(_fill(first))
+        new_path = str(tmp_path / "shard-02.db")
+        asyncio.run(first.add_shard(new_path))
+
+        second._refresh_manifest(force=True)
+        assert list(second.stores) == list(first.stores)
+        assert all(second.path_for(c) == first.path_for(c) for c in CUSTOMERS)
+        assert asyncio.run(_items(second)) == {c: [{"customer": c}] for c in CUSTOMERS}
+    finally:
+        first.close()
+        second.close()
+
+    # 다시 열면 manifest의 shard 목록을 따름
+    reopened = _open(tmp_path, count=8)
+    try:
+        assert len(reopened.stores) == 3
+    finally:
+        reopened.close()
+
+
+def test_rebalance_moves_misplaced_customers(tmp_path):
+    sharded = _open(tmp_path, count=3)
+    try:
+        asyncio.run(_fill(sharded))
+        # 중단된 add_shard처럼 소유 shard가 아닌 곳에 기록을 남김
+        misplaced = list(CUSTOMERS)[:5]
+        paths = list(sharded.stores)
+
+        async def misplace():
+            for c in misplaced:
+                wrong = next(path for path in paths if path != sharded.ring.node_for(c))
+                await sharded.stores[wrong].session(c, "c2").add_items([{"misplaced": c}])
+
+        asyncio.run(misplace())
+
+        assert asyncio.run(sharded.rebalance()) == len(misplaced)
+        for path, store in sharded.stores.items():
+            assert all(sharded.ring.node_for(c) == path for c in _customers_in(store))
+        for c in misplaced:
+            assert asyncio.run(sharded.session(c, "c2").get_items()) == [{"misplaced": c}]
+            assert asyncio.run(sharded.session(c, "c1").get_items()) == [{"customer": c}]
+        assert asyncio.run(sharded.rebalance()) == 0
+    finally:
+        sharded.close()
+
+
+def test_migrate_single_file_leaves_source_untouched(tmp_path):
+    source_path = str(tmp_path / "single.db")
+    source = SessionStore(source_path, batch_window=0)
+
+    async def fill_source():
+        for c in CUSTOMERS:
+            await source.session(c, "c1").add_items([{"customer": c}])
+
+    asyncio.run(fill_source())
+    source.close()
+    with open(source_path, "rb") as f:
+        digest = hashlib.md5(f.read()).hexdigest()
+
+    sharded = _open(tmp_path / "shards")
+    try:
+        assert asyncio.run(migrate_single_file(source_path, sharded)) == len(CUSTOMERS)
+        # 다시 실행해도 기록이 중복되지 않음
+        asyncio.run(migrate_single_file(source_path, sharded))
+        assert asyncio.run(_items(sharded)) == {c: [{"customer": c}] for c in CUSTOMERS}
+    finally:
+        sharded.close()
+
+    with open(source_path, "rb") as f:
+        assert hashlib.md5(f.read()).hexdigest() == digest
+    assert not os.path.exists(f"{source_path}-wal") or os.path.getsize(f"{source_path}-wal") == 0
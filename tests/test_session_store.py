@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from session_store import MESSAGES_TABLE, SessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), batch_window=0.05)
+    yield store
+    store.close()
+
+
+def test_concurrent_writes_share_one_commit(store):
+    async def main():
+        sessions = [store.session(customer_id, "c1") for customer_id in range(20)]
+        await asyncio.gather(*(s.add_items([{"role": "user", "content": str(i)}]) for i, s in enumerate(sessions)))
+        return [await s.get_items() for s in sessions]
+
+    items = asyncio.run(main())
+
+    assert store.batched_writes == 20
+    # 배치 창(batch_window) 안에 들어온 요청은 한 트랜잭션으로 커밋됨
+    assert store.commits <= 2
+    assert items == [[{"role": "user", "content": str(i)}] for i in range(20)]
+
+
+def test_batch_size_limits_requests_per_commit(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), batch_window=0.05, batch_size=4)
+    try:
+        session = store.session(1, "c1")
+
+        async def main():
+            await asyncio.gather(*(session.add_items([{"n": i}]) for i in range(10)))
+
+        asyncio.run(main())
+        assert store.batched_writes == 10
+        assert store.commits >= 3
+    finally:
+        store.close()
+
+
+def test_failed_request_does_not_roll_back_batch(store):
+    session = store.session(1, "c1")
+
+    def broken(conn):
+        conn.execute(f"INSERT INTO {MESSAGES_TABLE} (customer_id, conversation_id, message_data) VALUES (1, 'c1', 'x')")
+        raise ValueError("broken write")
+
+    async def main():
+        return await asyncio.gather(
+            session.add_items([{"n": 1}]),
+            store.write(broken),
+            session.add_items([{"n": 2}]),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], ValueError)
+    assert store.commits == 1
+    # 실패한 요청의 변경만 savepoint로 되돌림
+    assert asyncio.run(session.get_items()) == [{"n": 1}, {"n": 2}]
+
+
+def test_aborted_batch_fails_requests_and_writer_keeps_running(store, monkeypatch):
+    session = store.session(1, "c1")
+    commit_batch = store._commit_batch
+
+    def failing_commit(batch):
+        store._writer.execute("BEGIN IMMEDIATE")
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(store, "_commit_batch", failing_commit)
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(session.add_items([{"n": 1}]))
+    assert not store._writer.in_transaction
+
+    monkeypatch.setattr(store, "_commit_batch", commit_batch)
+    asyncio.run(session.add_items([{"n": 2}]))
+    assert asyncio.run(session.get_items()) == [{"n": 2}]
+
+
+def test_tenant_session_operations(store):
+    first = store.session(1, "c1")
+    other = store.session(2, "c1")
+
+    async def main():
+        await first.add_items([{"n": 1}, {"n": 2}, {"n": 3}])
+        await other.add_items([{"n": 9}])
+        popped = await first.pop_item()
+        await first.save_active_agent("Billing Agent")
+        await first.save_summary("요약", 2)
+        return popped
+
+    assert asyncio.run(main()) == {"n": 3}
+    assert asyncio.run(first.get_items(limit=1)) == [{"n": 2}]
+    assert [row[1] for row in first.items_since(0, 10)] == ['{"n": 1}', '{"n": 2}']
+    assert first.active_agent() == "Billing Agent"
+    assert first.load_summary() == ("요약", 2)
+    assert asyncio.run(store.list_conversations(1))[0][0] == "c1"
+
+    asyncio.run(first.clear_session())
+    assert asyncio.run(first.get_items()) == []
+    assert first.active_agent() is None
+    assert asyncio.run(other.get_items()) == [{"n": 9}]
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from agents import function_tool
+
+import tool_cache
+from tool_cache import ToolCache, configure_tool_cache, invalidates, is_read_only, read_only
+
+calls = []
+
+
+@read_only(ttl=60)
+@function_tool
+def lookup_order(order_number: str, detail: bool = False) -> str:
+    """주문 상태 조회 (테스트용)"""
+    calls.append(order_number)
+    if order_number == "broken":
+        raise RuntimeError("lookup failed")
+    return f"{order_number}:{len(calls)}"
+
+
+@invalidates("lookup_order", match=("order_number",))
+@function_tool
+def cancel_order(order_number: str) -> str:
+    """주문 취소 (테스트용)"""
+    return f"cancelled {order_number}"
+
+
+@invalidates("lookup_order")
+@function_tool
+def update_address(address: str) -> str:
+    """배송지 변경 (테스트용)"""
+    return "updated"
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    previous = tool_cache.get_tool_cache()
+    cache = ToolCache()
+    configure_tool_cache(cache)
+    calls.clear()
+    yield cache
+    configure_tool_cache(previous)
+
+
+def _context(customer_id):
+    return SimpleNamespace(context=SimpleNamespace(customer_id=customer_id))
+
+
+def _call(tool, customer_id=1, **arguments):
+    return asyncio.run(tool.on_invoke_tool(_context(customer_id), json.dumps(arguments)))
+
+
+def test_read_only_caches_per_customer_and_canonical_arguments(cache):
+    first = _call(lookup_order, order_number="A1", detail=True)
+    # 인자 순서가 달라도 같은 항목
+    again = asyncio.run(lookup_order.on_invoke_tool(_context(1), '{"detail": true, "order_number": "A1"}'))
+
+    assert first == again
+    assert calls == ["A1"]
+    assert is_read_only("lookup_order")
+    assert not is_read_only("cancel_order")
+
+    _call(lookup_order, customer_id=2, order_number="A1", detail=True)
+    assert calls == ["A1", "A1"]
+    assert cache.stats.hits == 1
+
+
+def test_failures_and_missing_customer_are_not_cached(cache):
+    _call(lookup_order, order_number="broken")
+    _call(lookup_order, order_number="broken")
+    assert calls == ["broken", "broken"]
+
+    _call(lookup_order, customer_id=None, order_number="A1")
+    assert len(cache) == 0
+
+
+def test_invalidate_matches_argument(cache):
+    _call(lookup_order, order_number="A1")
+    _call(lookup_order, order_number="B2")
+
+    _call(cancel_order, order_number="A1")
+
+    assert cache.stats.invalidations == 1
+    _call(lookup_order, order_number="A1")
+    _call(lookup_order, order_number="B2")
+    assert calls == ["A1", "B2", "A1"]
+
+
+def test_invalidate_without_match_clears_customer_entries_only(cache):
+    _call(lookup_order, order_number="A1")
+    _call(lookup_order, order_number="B2")
+    _call(lookup_order, customer_id=2, order_number="A1")
+
+    _call(update_address, address="Seoul")
+
+    assert len(cache) == 1
+    assert cache.get(("lookup_order", 2, json.dumps({"order_number": "A1"})))[0]
+
+
+def test_result_fetched_before_invalidation_is_not_stored(cache):
+    key = ("lookup_order", 1, "{}")
+    generation = cache.generation(1)
+    cache.invalidate(1, ["lookup_order"])
+
+    cache.put(key, {}, "stale", generation=generation)
+
+    assert cache.get(key) == (False, None)
+
+
+def test_ttl_and_lru(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(tool_cache.time, "monotonic", lambda: now[0])
+    cache = ToolCache(max_entries=2, ttl=10)
+    cache.put(("t", 1, "a"), {}, "a")
+    cache.put(("t", 1, "b"), {}, "b", ttl=1)
+
+    now[0] += 2
+    assert cache.get(("t", 1, "b")) == (False, None)
+    assert cache.stats.expirations == 1
+
+    cache.put(("t", 1, "c"), {}, "c")
+    cache.get(("t", 1, "a"))
+    cache.put(("t", 1, "d"), {}, "d")
+    assert cache.stats.evictions == 1
+    assert cache.get(("t", 1, "c")) == (False, None)
+    assert cache.get(("t", 1, "a")) == (True, "a")
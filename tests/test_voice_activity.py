@@ -0,0 +1,68 @@
+import numpy as np
+
+from voice_activity import PADDING_MS, trim_silence
+
+RATE = 16000
+
+
+def _tone(seconds: float, amplitude: float, rate: int = RATE) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def _noise(seconds: float, amplitude: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(seconds * RATE)) * amplitude).astype(np.int16)
+
+
+def test_trims_leading_and_trailing_silence_with_padding():
+    samples = np.concatenate([np.zeros(RATE, np.int16), _tone(1.0, 8000), np.zeros(RATE, np.int16)])
+
+    result = trim_silence(samples, RATE)
+
+    padding = RATE * PADDING_MS // 1000
+    assert len(result.audio) == RATE + 2 * padding
+    assert result.speech_samples == RATE
+    assert result.original_samples == len(samples)
+    assert abs(result.dropped_seconds - (2.0 - 2 * PADDING_MS / 1000)) < 1e-9
+    # 잘라낸 결과는 원본의 뷰
+    assert np.shares_memory(result.audio, samples)
+
+
+def test_noise_floor_adapts_to_background_noise():
+    # 배경 소음이 있는 녹음에서도 소음 구간은 잘라냄
+    samples = np.concatenate([_noise(1.0, 300), _tone(0.5, 10000) + _noise(0.5, 300, 1), _noise(1.0, 300, 2)])
+
+    result = trim_silence(samples, RATE, padding_ms=0)
+
+    assert abs(result.kept_seconds - 0.5) <= 0.02
+    assert result.dropped_ratio > 0.75
+
+
+def test_all_speech_recording_is_kept():
+    samples = _tone(1.0, 8000)
+
+    result = trim_silence(samples, RATE)
+
+    assert len(result.audio) == len(samples)
+    assert result.dropped_seconds == 0
+
+
+def test_short_blip_is_empty():
+    # MIN_SPEECH_MS보다 짧은 소리는 발화가 없는 녹음으로 취급함
+    samples = np.concatenate([np.zeros(RATE, np.int16), _tone(0.1, 8000), np.zeros(RATE, np.int16)])
+
+    result = trim_silence(samples, RATE)
+
+    assert result.is_empty
+    assert result.speech_samples == RATE // 10
+    assert result.dropped_ratio == 1.0
+
+
+def test_silence_and_too_short_input_are_empty():
+    assert trim_silence(np.zeros(RATE, np.int16), RATE).is_empty
+    # 한 프레임보다 짧은 입력
+    result = trim_silence(np.zeros(10, np.int16), RATE)
+    assert result.is_empty
+    assert result.dropped_ratio == 1.0
+    assert trim_silence(np.zeros(0, np.int16), RATE).dropped_ratio == 0.0
@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+from agents import FunctionTool
+from agents.tool import default_tool_error_function
+
+
+# 캐시 기본 설정
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 5 * 60
+# function_tool은 예외를 이 문구로 시작하는 문자열로 바꿔 반환함 (실패 결과는 캐시하지 않음)
+TOOL_ERROR_PREFIX = default_tool_error_function(None, Exception(""))
+
+
+@dataclass
+class ToolCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _canonical_arguments(input_json: str) -> tuple[str, dict]:
+    # 인자 순서/공백과 무관한 키를 만듦
+    try:
+        arguments = json.loads(input_json or "{}")
+    except json.JSONDecodeError:
+        return input_json, {}
+    if not isinstance(arguments, dict):
+        return input_json, {}
+    return json.dumps(arguments, ensure_ascii=False, sort_keys=True), arguments
+
+
+def _failed(value) -> bool:
+    return isinstance(value, str) and value.startswith(TOOL_ERROR_PREFIX)
+
+
+def _customer_id(tool_context):
+    # 실행 컨텍스트(UserAccountContext)의 고객 ID (없으면 None: 모든 고객이 공유하지 않도록 캐시하지 않음)
+    return getattr(getattr(tool_context, "context", None), "customer_id", None)
+
+
+class ToolCache:
+    """
+    읽기 전용 도구의 결과 캐시.
+    - 키: 도구 이름 + 고객 ID + 정규화된 인자
+    - LRU + TTL (도구마다 TTL을 다르게 지정할 수 있음)
+    - 변경 도구가 실행되면 같은 고객의 관련 항목을 지움 (필요하면 특정 인자가 같은 항목만)
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = ToolCacheStats()
+        # (도구, 고객 ID, 인자 JSON) -> (만료 시각, 인자, 결과)
+        self._entries: OrderedDict[tuple, tuple[float, dict, object]] = OrderedDict()
+        # 고객별 무효화 세대: 조회 중에 무효화가 일어나면 그 결과는 저장하지 않음
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return True, entry[2]
+                del self._entries[key]
+                self.stats.expirations += 1
+            self.stats.misses += 1
+            return False, None
+
+    def generation(self, customer_id) -> int:
+        with self._lock:
+            return self._generations.get(customer_id, 0)
+
+    def put(self, key: tuple, arguments: dict, value, ttl: float | None = None, generation: int | None = None):
+        with self._lock:
+            if generation is not None and self._generations.get(key[1], 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), arguments, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, customer_id, tool_names, match: dict | None = None) -> int:
+        """
+        고객의 tool_names 도구 항목을 지우고 지운 개수를 반환함.
+        match를 주면 해당 인자 값이 모두 같은 항목만 지움 (예: 같은 주문 번호).
+        """
+        with self._lock:
+            self._generations[customer_id] = self._generations.get(customer_id, 0) + 1
+            removed = [
+                key
+                for key, (_, arguments, _) in self._entries.items()
+                if key[0] in tool_names
+                and key[1] == customer_id
+                and all(arguments.get(name) == value for name, value in (match or {}).items())
+            ]
+            for key in removed:
+                del self._entries[key]
+            self.stats.invalidations += len(removed)
+            return len(removed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_cache = ToolCache()
+
+
+def get_tool_cache() -> ToolCache:
+    return _cache
+
+
+def configure_tool_cache(cache: ToolCache):
+    global _cache
+    _cache = cache
+
+
+# read_only로 표시된 도구 이름 (tool_execution이 동시에 실행해도 되는 도구를 구분할 때 사용함)
+_read_only_tools: set[str] = set()
+
+
+def is_read_only(tool_name: str) -> bool:
+    return tool_name in _read_only_tools
+
+
+def read_only(ttl: float | None = None):
+    """
+    @function_tool로 만든 도구를 읽기 전용으로 표시하고 결과를 고객/인자별로 캐시함.
+
+        @read_only(ttl=60)
+        @function_tool
+        def lookup_order_status(...): ...
+    """
+
+    def decorate(tool: FunctionTool) -> FunctionTool:
+        invoke = tool.on_invoke_tool
+        _read_only_tools.add(tool.name)
+
+        async def on_invoke_tool(tool_context, input_json: str):
+            customer_id = _customer_id(tool_context)
+            if customer_id is None:
+                return await invoke(tool_context, input_json)
+            cache = get_tool_cache()
+            arguments_key, arguments = _canonical_arguments(input_json)
+            key = (tool.name, customer_id, arguments_key)
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            generation = cache.generation(customer_id)
+            value = await invoke(tool_context, input_json)
+            if not _failed(value):
+                cache.put(key, arguments, value, ttl=ttl, generation=generation)
+            return value
+
+        return replace(tool, on_invoke_tool=on_invoke_tool)
+
+    return decorate
+
+
+def invalidates(*tool_names: str, match: tuple[str, ...] = ()):
+    """
+    변경 도구가 성공적으로 실행되면 같은 고객의 관련 읽기 전용 도구 캐시를 지움.
+    match에 인자 이름을 주면 그 인자 값이 같은 항목만 지움.
+
+        @invalidates("lookup_order_status", match=("order_number",))
+        @function_tool
+        def initiate_return_process(...): ...
+    """
+
+    def decorate(tool: FunctionTool) -> FunctionTool:
+        invoke = tool.on_invoke_tool
+
+        async def on_invoke_tool(tool_context, input_json: str):
+            value = await invoke(tool_context, input_json)
+            customer_id = _customer_id(tool_context)
+            if customer_id is not None and not _failed(value):
+                _, arguments = _canonical_arguments(input_json)
+                get_tool_cache().invalidate(
+                    customer_id,
+                    tool_names,
+                    {name: arguments.get(name) for name in match},
+                )
+            return value
+
+        return replace(tool, on_invoke_tool=on_invoke_tool)
+
+    return decorate
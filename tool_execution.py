@@ -0,0 +1,128 @@
+"""
+전문 Agent의 도구 실행 방식: 병렬 호출, 동기 도구의 스레드 풀 실행, 호출별 시간 기록.
+
+모델이 한 응답에서 여러 도구를 호출하면(parallel_tool_calls) SDK가 모두 동시에 실행하고
+결과를 호출 순서대로 모아 다음 요청에 넣음. 여기서는 그 실행을 다음과 같이 다룸.
+- 동기 도구(@in_thread)는 공유 스레드 풀에서 실행되어 이벤트 루프를 막지 않음
+- 읽기 전용 도구(tool_cache.read_only)는 서로 동시에 실행됨
+- 변경 도구는 같은 고객 안에서 호출 순서대로 하나씩 실행됨
+- 호출마다 현재 턴에 "tool" span을 남기고 도구별 누적 시간을 기록함
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+from agents import FunctionTool, ModelSettings
+
+from tool_cache import is_read_only
+from turn_tracing import stage_span
+
+
+# 한 응답의 도구 호출을 동시에 실행하도록 모델에 허용함
+PARALLEL_TOOL_SETTINGS = ModelSettings(parallel_tool_calls=True)
+# 동기 도구를 실행할 스레드 수 (SQLite 조회 등 짧은 작업 위주)
+TOOL_THREAD_POOL_SIZE = 8
+
+_executor = ThreadPoolExecutor(max_workers=TOOL_THREAD_POOL_SIZE, thread_name_prefix="tool")
+
+
+def in_thread(func):
+    """
+    동기 도구 함수를 스레드 풀에서 실행하는 비동기 함수로 바꿈 (@function_tool 바로 아래에 붙임).
+    시그니처와 docstring은 그대로 유지되므로 도구 스키마는 바뀌지 않음.
+
+        @function_tool
+        @in_thread
+        def lookup_order_status(wrapper, order_number: str) -> str: ...
+    """
+
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        # 현재 턴(turn_tracing) 등 컨텍스트 변수를 스레드에서도 볼 수 있게 복사함
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(_executor, call)
+
+    return run
+
+
+@dataclass
+class ToolTiming:
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+class ToolTimings:
+    # 도구별 실행 시간 누적 (변경 도구의 대기 시간은 제외함)
+
+    def __init__(self):
+        self._timings: dict[str, ToolTiming] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, elapsed_ms: float):
+        with self._lock:
+            timing = self._timings.setdefault(name, ToolTiming())
+            timing.calls += 1
+            timing.total_ms += elapsed_ms
+            timing.max_ms = max(timing.max_ms, elapsed_ms)
+
+    def snapshot(self) -> dict[str, ToolTiming]:
+        with self._lock:
+            return {name: replace(timing) for name, timing in sorted(self._timings.items())}
+
+
+_timings = ToolTimings()
+# 이벤트 루프별 고객 ID -> 변경 도구 락 (asyncio.Lock은 만들어진 루프에서만 사용할 수 있음)
+_write_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_tool_timings() -> ToolTimings:
+    return _timings
+
+
+def _write_lock(customer_id) -> asyncio.Lock:
+    locks = _write_locks.setdefault(asyncio.get_running_loop(), {})
+    lock = locks.get(customer_id)
+    if lock is None:
+        lock = locks[customer_id] = asyncio.Lock()
+    return lock
+
+
+def scheduled(tool: FunctionTool) -> FunctionTool:
+    # 도구 호출을 위 규칙대로 실행하도록 on_invoke_tool을 감쌈
+    invoke = tool.on_invoke_tool
+    read_only = is_read_only(tool.name)
+
+    async def on_invoke_tool(tool_context, input_json: str):
+        customer_id = getattr(getattr(tool_context, "context", None), "customer_id", None)
+        call_id = getattr(tool_context, "tool_call_id", None)
+        with stage_span("tool", tool.name, call_id=call_id, read_only=read_only) as span:
+            waited = time.perf_counter()
+            if read_only or customer_id is None:
+                start = waited
+                result = await invoke(tool_context, input_json)
+            else:
+                # asyncio.Lock은 요청한 순서대로 넘겨주므로 변경 도구는 호출 순서대로 실행됨
+                async with _write_lock(customer_id):
+                    start = time.perf_counter()
+                    result = await invoke(tool_context, input_json)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if span is not None:
+                span.attributes.update(wait_ms=round((start - waited) * 1000, 3), result_chars=len(str(result)))
+        _timings.record(tool.name, elapsed_ms)
+        return result
+
+    return replace(tool, on_invoke_tool=on_invoke_tool)
+
+
+def schedule_tools(tools: list[FunctionTool]) -> list[FunctionTool]:
+    return [scheduled(tool) for tool in tools]
@@ -1,8 +1,24 @@
-import streamlit as st
+import logging
 from agents import function_tool, AgentHooks, Agent, Tool, RunContextWrapper
 from models import UserAccountContext
+from domain_store import get_domain_store, is_premium
+from tool_cache import invalidates, read_only
+from tool_execution import in_thread
 import random
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+
+logger = logging.getLogger(__name__)
+
+# 읽기 전용 도구 결과 캐시 TTL(초)
+# 같은 대화에서 같은 인자로 반복 조회하면 백엔드를 다시 호출하지 않고 같은 결과를 돌려줌
+BILLING_HISTORY_TTL = 5 * 60
+ORDER_STATUS_TTL = 60
+DIAGNOSTIC_TTL = 60
+# 트러블슈팅 단계는 고정된 안내문이므로 길게 캐시함
+TROUBLESHOOTING_TTL = 60 * 60
+
+# 도구의 첫 번째 인자는 실행 컨텍스트(RunContextWrapper)이므로 모델이 채우는 인자에 포함되지 않음
+# 고객 ID는 항상 실행 컨텍스트에서 가져오며, 조회는 해당 고객의 데이터로 한정됨
 
 
 # =============================================================================
@@ -10,9 +26,11 @@ from datetime import datetime, timedelta
 # =============================================================================
 
 
+@read_only(ttl=DIAGNOSTIC_TTL)
 @function_tool
+@in_thread
 def run_diagnostic_check(
-    context: UserAccountContext, product_name: str, issue_description: str
+    wrapper: RunContextWrapper[UserAccountContext], product_name: str, issue_description: str
 ) -> str:
     """
     고객 제품에 대한 진단 점검을 수행해 잠재 이슈를 식별함.
@@ -33,8 +51,9 @@ def run_diagnostic_check(
     return f"다음은 {product_name}에 대한 진단 결과:\n" + "\n".join(diagnostics)
 
 
+@read_only(ttl=TROUBLESHOOTING_TTL)
 @function_tool
-def provide_troubleshooting_steps(context: UserAccountContext, issue_type: str) -> str:
+def provide_troubleshooting_steps(wrapper: RunContextWrapper[UserAccountContext], issue_type: str) -> str:
     """
     일반적인 이슈 유형에 대한 단계별 트러블슈팅 지침을 제공함.
 
@@ -83,14 +102,15 @@ def provide_troubleshooting_steps(context: UserAccountContext, issue_type: str)
         ],
     )
 
-    # 사용자 컨텍스트에 제공한 단계 기록 남김
-    context.add_troubleshooting_step(f"{issue_type} 유형 트러블슈팅 단계 제공함")
+    # 안내만 하는 조회 도구이므로 기록을 남기지 않음 (병렬 호출/배치 재생에서 티켓이 중복되지 않도록)
+    # 후속 조치가 필요하면 escalate_to_engineering이 티켓을 만듦
     return f"{issue_type} 이슈에 대한 트러블슈팅 단계:\n" + "\n".join(steps)
 
 
 @function_tool
+@in_thread
 def escalate_to_engineering(
-    context: UserAccountContext, issue_summary: str, priority: str = "medium"
+    wrapper: RunContextWrapper[UserAccountContext], issue_summary: str, priority: str = "medium"
 ) -> str:
     """
     기술 이슈를 엔지니어링 팀에 에스컬레이션함.
@@ -99,60 +119,59 @@ def escalate_to_engineering(
         issue_summary: 기술 이슈 요약
         priority: 우선순위 (low, medium, high, critical)
     """
-    # 티켓 아이디 생성
-    ticket_id = f"ENG-{random.randint(10000, 99999)}"
+    context = wrapper.context
+    # 엔지니어링 티켓 생성
+    ticket_id = get_domain_store().add_ticket(
+        context.customer_id, "engineering", issue_summary, priority=priority.lower()
+    )
 
     return (
         "엔지니어링 팀으로 이슈를 에스컬레이션함\n"
-        f"티켓 ID: {ticket_id}\n"
+        f"티켓 ID: ENG-{ticket_id:05d}\n"
         f"우선순위: {priority.upper()}\n"
         f"요약: {issue_summary}\n"
-        f"예상 응답 시간: {2 if context.is_premium_customer() else 4}시간"
+        f"예상 응답 시간: {2 if is_premium(context.tier) else 4}시간"
     )
 
 
 # =============================================================================
 # BILLING SUPPORT TOOLS
 # =============================================================================
+# 응답 문구(*_message)는 같은 도구의 비동기 버전(async_tools.py)과 함께 사용함
 
 
-@function_tool
-def lookup_billing_history(context: UserAccountContext, months_back: int = 6) -> str:
-    """
-    고객의 청구 및 결제 내역을 조회함.
-
-    Args:
-        months_back: 조회 개월(기본 6개월)
-    """
-    # 더미 결제 내역 생성
-    payments = []
-    for i in range(months_back):
-        date = datetime.now() - timedelta(days=30 * i)
-        amount = random.choice([29.99, 49.99, 99.99])
-        status = random.choice(["Paid", "Paid", "Paid", "Failed"])
-        payments.append(f"• {date.strftime('%b %Y')}: ${amount} - {status}")
+def billing_history_message(invoices, months_back: int) -> str:
+    if not invoices:
+        return f"최근 {months_back}개월 동안의 청구 내역이 없음"
 
+    payments = [
+        f"• {date.fromisoformat(invoice['issued_at']).strftime('%b %Y')}: "
+        f"${invoice['amount']} - {invoice['status']}"
+        for invoice in invoices
+    ]
     return f"청구 내역 (최근 {months_back}개월):\n" + "\n".join(payments)
 
 
+@read_only(ttl=BILLING_HISTORY_TTL)
 @function_tool
-def process_refund_request(
-    context: UserAccountContext, refund_amount: float, reason: str
-) -> str:
+@in_thread
+def lookup_billing_history(wrapper: RunContextWrapper[UserAccountContext], months_back: int = 6) -> str:
     """
-    고객 환불 요청을 처리함.
+    고객의 청구 및 결제 내역을 조회함.
 
     Args:
-        refund_amount: 환불 금액
-        reason: 환불 사유
+        months_back: 조회 개월(기본 6개월)
     """
-    # 프리미엄 고객일 경우 처리 기간 단축
-    processing_days = 3 if context.is_premium_customer() else 5
-    refund_id = f"REF-{random.randint(100000, 999999)}"
+    invoices = get_domain_store().invoices(wrapper.context.customer_id, months_back)
+    return billing_history_message(invoices, months_back)
 
+
+def refund_message(refund_id: int, refund_amount: float, reason: str, context: UserAccountContext) -> str:
+    # 프리미엄 고객일 경우 처리 기간 단축
+    processing_days = 3 if is_premium(context.tier) else 5
     return (
         "환불 요청을 처리함\n"
-        f"환불 ID: {refund_id}\n"
+        f"환불 ID: REF-{refund_id:06d}\n"
         f"금액: ${refund_amount}\n"
         f"사유: {reason}\n"
         f"처리 기간: 영업일 기준 {processing_days}일\n"
@@ -160,14 +179,27 @@ def process_refund_request(
     )
 
 
+@invalidates("lookup_billing_history")
 @function_tool
-def update_payment_method(context: UserAccountContext, payment_type: str) -> str:
+@in_thread
+def process_refund_request(
+    wrapper: RunContextWrapper[UserAccountContext], refund_amount: float, reason: str
+) -> str:
     """
-    고객 결제 수단 업데이트를 지원함.
+    고객 환불 요청을 처리함.
 
     Args:
-        payment_type: 결제 수단 유형 (credit_card, paypal, bank_transfer)
+        refund_amount: 환불 금액
+        reason: 환불 사유
     """
+    context = wrapper.context
+    refund_id = get_domain_store().add_refund(
+        context.customer_id, "refund", refund_amount, reason, "processing"
+    )
+    return refund_message(refund_id, refund_amount, reason, context)
+
+
+def payment_method_message(payment_type: str, context: UserAccountContext) -> str:
     # 보안 링크 발송 안내 문구 생성
     return (
         "결제 수단 업데이트를 시작함\n"
@@ -178,17 +210,23 @@ def update_payment_method(context: UserAccountContext, payment_type: str) -> str
     )
 
 
+@invalidates("lookup_billing_history")
 @function_tool
-def apply_billing_credit(
-    context: UserAccountContext, credit_amount: float, reason: str
-) -> str:
+@in_thread
+def update_payment_method(wrapper: RunContextWrapper[UserAccountContext], payment_type: str) -> str:
     """
-    보상/정산 목적의 청구 크레딧을 계정에 적용함.
+    고객 결제 수단 업데이트를 지원함.
 
     Args:
-        credit_amount: 적용할 크레딧 금액
-        reason: 크레딧 사유
+        payment_type: 결제 수단 유형 (credit_card, paypal, bank_transfer)
     """
+    context = wrapper.context
+    # 결제 수단은 보안 링크에서 확인이 끝나면 바뀌므로 요청만 기록함
+    get_domain_store().add_ticket(context.customer_id, "payment_method", payment_type)
+    return payment_method_message(payment_type, context)
+
+
+def billing_credit_message(credit_amount: float, reason: str, context: UserAccountContext) -> str:
     # 크레딧 적용 결과 문구 생성
     return (
         "계정 크레딧을 적용함\n"
@@ -199,37 +237,82 @@ def apply_billing_credit(
     )
 
 
+@invalidates("lookup_billing_history")
+@function_tool
+@in_thread
+def apply_billing_credit(
+    wrapper: RunContextWrapper[UserAccountContext], credit_amount: float, reason: str
+) -> str:
+    """
+    보상/정산 목적의 청구 크레딧을 계정에 적용함.
+
+    Args:
+        credit_amount: 적용할 크레딧 금액
+        reason: 크레딧 사유
+    """
+    context = wrapper.context
+    get_domain_store().add_refund(context.customer_id, "credit", credit_amount, reason, "applied")
+    return billing_credit_message(credit_amount, reason, context)
+
+
 # =============================================================================
 # ORDER MANAGEMENT TOOLS
 # =============================================================================
 
 
+def order_status_message(order, order_number: str, context: UserAccountContext) -> str:
+    if order is None:
+        return f"주문을 찾을 수 없음: {order_number} (고객 계정의 주문 번호인지 확인 필요)"
+
+    lines = [
+        f"주문 상태: {order['order_number']}",
+        f"상태: {order['status'].replace('_', ' ').title()}",
+        f"품목: {order['items']}",
+        f"주문일: {order['ordered_at']}",
+    ]
+    if order["tracking_number"]:
+        lines += [
+            f"운송장: {order['tracking_number']} ({order['carrier']})",
+            f"예상 배송일: {date.fromisoformat(order['estimated_delivery']).strftime('%B %d, %Y')}",
+        ]
+    lines.append(f"배송지 확인: {context.email}")
+    return "\n".join(lines)
+
+
+@read_only(ttl=ORDER_STATUS_TTL)
 @function_tool
-def lookup_order_status(context: UserAccountContext, order_number: str) -> str:
+@in_thread
+def lookup_order_status(wrapper: RunContextWrapper[UserAccountContext], order_number: str) -> str:
     """
     주문 상태와 상세 정보를 조회함.
 
     Args:
         order_number: 고객 주문 번호
     """
-    # 상태 무작위 선택 및 배송 ETA 구성
-    statuses = ["processing", "shipped", "in_transit", "delivered"]
-    current_status = random.choice(statuses)
-    tracking_number = f"1Z{random.randint(100000, 999999)}"
-    estimated_delivery = datetime.now() + timedelta(days=random.randint(1, 5))
+    context = wrapper.context
+    order = get_domain_store().order(context.customer_id, order_number)
+    return order_status_message(order, order_number, context)
 
+
+def return_message(return_id: int, order_number: str, items: str, context: UserAccountContext) -> str:
+    # 프리미엄 고객은 반품 라벨 무료
+    return_label_fee = 0 if is_premium(context.tier) else 5.99
     return (
-        f"주문 상태: {order_number}\n"
-        f"상태: {current_status.title()}\n"
-        f"운송장: {tracking_number}\n"
-        f"예상 배송일: {estimated_delivery.strftime('%B %d, %Y')}\n"
-        f"배송지 확인: {context.email}"
+        "반품을 시작함\n"
+        f"반품 ID: RET-{return_id:06d}\n"
+        f"주문: {order_number}\n"
+        f"반품 품목: {items}\n"
+        f"반품 라벨 비용: ${return_label_fee}\n"
+        f"반품 라벨이 전송됨: {context.email}\n"
+        "반품 가능 기간: 30일"
     )
 
 
+@invalidates("lookup_order_status", match=("order_number",))
 @function_tool
+@in_thread
 def initiate_return_process(
-    context: UserAccountContext, order_number: str, return_reason: str, items: str
+    wrapper: RunContextWrapper[UserAccountContext], order_number: str, return_reason: str, items: str
 ) -> str:
     """
     주문 반품 프로세스를 시작함.
@@ -239,24 +322,36 @@ def initiate_return_process(
         return_reason: 반품 사유
         items: 반품 품목
     """
-    # 반품 ID와 라벨 비용 계산
-    return_id = f"RET-{random.randint(100000, 999999)}"
-    return_label_fee = 0 if context.is_premium_customer() else 5.99
+    context = wrapper.context
+    store = get_domain_store()
+    order = store.order(context.customer_id, order_number)
+    if order is None:
+        return f"주문을 찾을 수 없음: {order_number}"
+
+    # 반품 접수
+    store.update_order(context.customer_id, order_number, "return_requested")
+    return_id = store.add_ticket(
+        context.customer_id, "return", f"{return_reason} ({items})", reference=order["order_number"]
+    )
+    return return_message(return_id, order["order_number"], items, context)
 
+
+def redelivery_message(tracking_number: str, preferred_date: str, context: UserAccountContext) -> str:
     return (
-        "반품을 시작함\n"
-        f"반품 ID: {return_id}\n"
-        f"주문: {order_number}\n"
-        f"반품 품목: {items}\n"
-        f"반품 라벨 비용: ${return_label_fee}\n"
-        f"반품 라벨이 전송됨: {context.email}\n"
-        "반품 가능 기간: 30일"
+        "재배송을 예약함\n"
+        f"운송장: {tracking_number}\n"
+        f"새 배송일: {preferred_date}\n"
+        f"주소 확인: {context.email}\n"
+        "배송 30분 전에 기사 연락 예정"
     )
 
 
+# 운송장 번호로는 주문을 특정할 수 없으므로 고객의 주문 조회 결과를 모두 지움
+@invalidates("lookup_order_status")
 @function_tool
+@in_thread
 def schedule_redelivery(
-    context: UserAccountContext, tracking_number: str, preferred_date: str
+    wrapper: RunContextWrapper[UserAccountContext], tracking_number: str, preferred_date: str
 ) -> str:
     """
     배송 실패 건에 대해 재배송 일정을 예약함.
@@ -265,35 +360,59 @@ def schedule_redelivery(
         tracking_number: 운송장 번호
         preferred_date: 고객이 선호하는 배송 날짜
     """
-    # 재배송 예약 결과 문구 생성
+    context = wrapper.context
+    store = get_domain_store()
+    shipment = store.shipment(context.customer_id, tracking_number)
+    if shipment is None:
+        return f"운송장을 찾을 수 없음: {tracking_number}"
+
+    # 재배송 예약 기록
+    store.update_shipment(shipment["tracking_number"], status="redelivery_scheduled")
+    store.add_ticket(
+        context.customer_id, "redelivery", preferred_date, reference=shipment["tracking_number"]
+    )
+    return redelivery_message(shipment["tracking_number"], preferred_date, context)
+
+
+# 익일 배송 업그레이드는 프리미엄 고객만 가능함
+EXPEDITE_PREMIUM_ONLY = "배송 속도 업그레이드는 프리미엄 멤버십이 필요함"
+
+
+def expedite_message(order_number: str, context: UserAccountContext) -> str:
     return (
-        "재배송을 예약함\n"
-        f"운송장: {tracking_number}\n"
-        f"새 배송일: {preferred_date}\n"
-        f"주소 확인: {context.email}\n"
-        "배송 30분 전에 기사 연락 예정"
+        "배송 속도를 업그레이드함\n"
+        f"주문: {order_number}\n"
+        "업그레이드: 익일 배송\n"
+        "추가 요금 없음 (프리미엄 혜택)\n"
+        f"업데이트된 운송장 정보가 전송됨: {context.email}"
     )
 
 
+@invalidates("lookup_order_status", match=("order_number",))
 @function_tool
-def expedite_shipping(context: UserAccountContext, order_number: str) -> str:
+@in_thread
+def expedite_shipping(wrapper: RunContextWrapper[UserAccountContext], order_number: str) -> str:
     """
     주문의 배송 속도를 업그레이드함 (프리미엄 고객 전용).
 
     Args:
         order_number: 대상 주문 번호
     """
+    context = wrapper.context
     # 프리미엄 고객 여부 확인
-    if not context.is_premium_customer():
-        return "배송 속도 업그레이드는 프리미엄 멤버십이 필요함"
-
-    return (
-        "배송 속도를 업그레이드함\n"
-        f"주문: {order_number}\n"
-        "업그레이드: 익일 배송\n"
-        "추가 요금 없음 (프리미엄 혜택)\n"
-        f"업데이트된 운송장 정보가 전송됨: {context.email}"
+    if not is_premium(context.tier):
+        return EXPEDITE_PREMIUM_ONLY
+
+    store = get_domain_store()
+    order = store.order(context.customer_id, order_number)
+    if order is None or not order["tracking_number"]:
+        return f"배송 정보가 있는 주문을 찾을 수 없음: {order_number}"
+    store.update_shipment(
+        order["tracking_number"],
+        service_level="next_day",
+        estimated_delivery=(date.today() + timedelta(days=1)).isoformat(),
     )
+    return expedite_message(order["order_number"], context)
 
 
 # =============================================================================
@@ -301,17 +420,9 @@ def expedite_shipping(context: UserAccountContext, order_number: str) -> str:
 # =============================================================================
 
 
-@function_tool
-def reset_user_password(context: UserAccountContext, email: str) -> str:
-    """
-    고객 이메일로 비밀번호 재설정 안내를 발송함.
-
-    Args:
-        email: 재설정 안내를 보낼 이메일 주소
-    """
+def password_reset_message(email: str) -> str:
     # 단일 사용 토큰 생성
     reset_token = f"RST-{random.randint(100000, 999999)}"
-
     return (
         "비밀번호 재설정을 시작함\n"
         f"재설정 링크가 전송됨: {email}\n"
@@ -322,16 +433,21 @@ def reset_user_password(context: UserAccountContext, email: str) -> str:
 
 
 @function_tool
-def enable_two_factor_auth(context: UserAccountContext, method: str = "app") -> str:
+@in_thread
+def reset_user_password(wrapper: RunContextWrapper[UserAccountContext], email: str) -> str:
     """
-    2단계 인증을 설정함.
+    고객 이메일로 비밀번호 재설정 안내를 발송함.
 
     Args:
-        method: 인증 방식 (app, sms, email)
+        email: 재설정 안내를 보낼 이메일 주소
     """
+    get_domain_store().add_ticket(wrapper.context.customer_id, "password_reset", email)
+    return password_reset_message(email)
+
+
+def two_factor_message(method: str, context: UserAccountContext) -> str:
     # 설정 코드 생성
     setup_code = f"2FA-{random.randint(100000, 999999)}"
-
     return (
         "2단계 인증 설정\n"
         f"방식: {method.upper()}\n"
@@ -342,19 +458,22 @@ def enable_two_factor_auth(context: UserAccountContext, method: str = "app") ->
 
 
 @function_tool
-def update_account_email(
-    context: UserAccountContext, old_email: str, new_email: str
-) -> str:
+@in_thread
+def enable_two_factor_auth(wrapper: RunContextWrapper[UserAccountContext], method: str = "app") -> str:
     """
-    계정 이메일 주소 변경을 처리함.
+    2단계 인증을 설정함.
 
     Args:
-        old_email: 기존 이메일 주소
-        new_email: 새 이메일 주소
+        method: 인증 방식 (app, sms, email)
     """
-    # 이메일 변경 검증 코드 생성
-    verification_code = f"VER-{random.randint(100000, 999999)}"
+    context = wrapper.context
+    get_domain_store().update_customer(context.customer_id, two_factor_method=method.lower())
+    return two_factor_message(method, context)
 
+
+def email_change_message(old_email: str, new_email: str) -> str:
+    # 이메일 변경 검증 코드 생성 (검증이 끝나면 변경됨)
+    verification_code = f"VER-{random.randint(100000, 999999)}"
     return (
         "이메일 변경 요청 접수\n"
         f"변경 전: {old_email}\n"
@@ -366,16 +485,25 @@ def update_account_email(
 
 
 @function_tool
-def deactivate_account(
-    context: UserAccountContext, reason: str, feedback: str = ""
+@in_thread
+def update_account_email(
+    wrapper: RunContextWrapper[UserAccountContext], old_email: str, new_email: str
 ) -> str:
     """
-    계정 비활성화 요청을 처리함.
+    계정 이메일 주소 변경을 처리함.
 
     Args:
-        reason: 계정 비활성화 사유
-        feedback: 선택 입력 피드백
+        old_email: 기존 이메일 주소
+        new_email: 새 이메일 주소
     """
+    # 검증이 끝나야 변경되므로 요청만 기록함
+    get_domain_store().add_ticket(
+        wrapper.context.customer_id, "email_change", f"{old_email} → {new_email}"
+    )
+    return email_change_message(old_email, new_email)
+
+
+def deactivation_message(reason: str, feedback: str, context: UserAccountContext) -> str:
     # 비활성화 처리 안내 문구 생성
     return (
         "계정 비활성화를 시작함\n"
@@ -389,19 +517,28 @@ def deactivate_account(
 
 
 @function_tool
-def export_account_data(context: UserAccountContext, data_types: str) -> str:
+@in_thread
+def deactivate_account(
+    wrapper: RunContextWrapper[UserAccountContext], reason: str, feedback: str = ""
+) -> str:
     """
-    고객 계정 데이터 내보내기를 생성함.
+    계정 비활성화 요청을 처리함.
 
     Args:
-        data_types: 내보낼 데이터 유형 (profile, orders, billing 등)
+        reason: 계정 비활성화 사유
+        feedback: 선택 입력 피드백
     """
-    # 내보내기 ID 생성 및 처리 시간 안내
-    export_id = f"EXP-{random.randint(100000, 999999)}"
+    context = wrapper.context
+    store = get_domain_store()
+    store.update_customer(context.customer_id, status="deactivation_pending")
+    store.add_ticket(context.customer_id, "deactivation", f"{reason} / {feedback or '-'}")
+    return deactivation_message(reason, feedback, context)
+
 
+def export_message(export_id: int, data_types: str, context: UserAccountContext) -> str:
     return (
         "데이터 내보내기 요청 접수\n"
-        f"내보내기 ID: {export_id}\n"
+        f"내보내기 ID: EXP-{export_id:06d}\n"
         f"데이터 유형: {data_types}\n"
         "처리 시간: 2~4시간\n"
         f"다운로드 링크가 전송될 주소: {context.email}\n"
@@ -409,8 +546,24 @@ def export_account_data(context: UserAccountContext, data_types: str) -> str:
     )
 
 
+@function_tool
+@in_thread
+def export_account_data(wrapper: RunContextWrapper[UserAccountContext], data_types: str) -> str:
+    """
+    고객 계정 데이터 내보내기를 생성함.
+
+    Args:
+        data_types: 내보낼 데이터 유형 (profile, orders, billing 등)
+    """
+    context = wrapper.context
+    # 내보내기 요청 기록
+    export_id = get_domain_store().add_ticket(context.customer_id, "export", data_types)
+    return export_message(export_id, data_types, context)
+
+
 class AgentToolUsageLoggingHooks(AgentHooks):
-    # 각 훅에서 Streamlit 사이드바에 로그를 남김
+    # 각 훅에서 로그를 남김
+    # (턴 단계별 지연 시간 분석은 turn_tracing의 span과 사이드바 워터폴에서 확인)
 
     async def on_tool_start(
         self,
@@ -419,8 +572,7 @@ class AgentToolUsageLoggingHooks(AgentHooks):
         tool: Tool,
     ):
         # 도구 실행 시작 로그
-        with st.sidebar:
-            st.write(f"{agent.name} 시작한 도구: `{tool.name}`")
+        logger.info("%s 시작한 도구: %s", agent.name, tool.name)
 
     async def on_tool_end(
         self,
@@ -430,9 +582,8 @@ class AgentToolUsageLoggingHooks(AgentHooks):
         result: str,
     ):
         # 도구 실행 종료 로그와 반환값 출력
-        with st.sidebar:
-            st.write(f"{agent.name} 사용한 도구: `{tool.name}`")
-            st.code(result)
+        logger.info("%s 사용한 도구: %s", agent.name, tool.name)
+        logger.debug("%s 결과:\n%s", tool.name, result)
 
     async def on_handoff(
         self,
@@ -441,8 +592,7 @@ class AgentToolUsageLoggingHooks(AgentHooks):
         source: Agent[UserAccountContext],
     ):
         # 에이전트 간 핸드오프 로그
-        with st.sidebar:
-            st.write(f"핸드오프: {source.name} → {agent.name}")
+        logger.info("핸드오프: %s → %s", source.name, agent.name)
 
     async def on_start(
         self,
@@ -450,8 +600,7 @@ class AgentToolUsageLoggingHooks(AgentHooks):
         agent: Agent[UserAccountContext],
     ):
         # 에이전트 시작 로그
-        with st.sidebar:
-            st.write(f"{agent.name} 활성화됨")
+        logger.info("%s 활성화됨", agent.name)
 
     async def on_end(
         self,
@@ -460,5 +609,4 @@ class AgentToolUsageLoggingHooks(AgentHooks):
         output,
     ):
         # 에이전트 종료 로그
-        with st.sidebar:
-            st.write(f"{agent.name} 완료됨")
+        logger.info("%s 완료됨", agent.name)
@@ -0,0 +1,241 @@
+import re
+import threading
+import zlib
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+# 벡터화 설정 (문자 n-gram 해싱)
+NGRAM_SIZES = (2, 3)
+HASH_DIM = 4096
+# 가장 가까운 예시와의 코사인 유사도가 이 값 이상이고, 반대편보다 MARGIN 이상 높아야 확신함
+MIN_SIMILARITY = 0.4
+MIN_MARGIN = 0.15
+
+# 지침의 카테고리 제목 (예: "결제 지원 (BILLING SUPPORT)")
+CATEGORY_HEADER = re.compile(r"^\s*(\S.*?)\s*\(([A-Z][A-Z ]+)\)\s*$")
+# 지침의 예시 목록 (예: - 예시: "두 번 결제됐어요", "환불이 필요해요")
+EXAMPLE_LINE = re.compile(r"^\s*-\s*예시\s*:(.*)$")
+QUOTED = re.compile(r'"([^"]+)"')
+
+# 지원 문의로 확정할 수 있는 여러 단어 구문 (짧은 발화에서도 바로 판단할 수 있도록)
+# "카드", "로그인", "이메일" 같은 단일 명사는 범위 밖 요청(카드 게임, 로그인 페이지 코드 등)에도 흔히 나오므로
+# 용어로 쓰지 않고 벡터 예시로만 사용함
+ON_TOPIC_PHRASES = [
+    "주문 번호", "주문 상태", "주문 취소", "주문한 상품", "내 주문",
+    "배송 조회", "배송 상태", "배송 언제", "배송이 안", "배송이 늦", "택배가 안", "운송장 번호",
+    "반품하고", "반품 신청", "교환하고", "교환 신청", "잘못된 상품",
+    "환불이 필요", "환불 요청", "환불해 주", "환불받", "두 번 결제", "중복 결제", "결제가 실패", "결제 실패",
+    "결제 수단", "결제 내역", "구독 해지", "구독을 취소", "요금제 변경", "청구서",
+    "비밀번호를 잊", "비밀번호 재설정", "비밀번호 바꾸", "비밀번호를 바꾸", "로그인이 안", "로그인 안 돼",
+    "2단계 인증", "계정 삭제", "계정 접근", "이메일 주소를 바꾸", "이메일 변경",
+    "앱이 안 켜", "앱이 꺼", "앱이 자꾸", "앱이 충돌", "앱 충돌", "오류 메시지", "에러 메시지",
+    "설치가 안", "설치 오류", "업데이트 후",
+    "order status", "track my order", "where is my order", "refund request", "charged twice",
+    "reset my password", "can't log in", "cannot log in", "error message",
+]
+
+# 지시 무시/프롬프트 탈취 시도는 지원 용어가 섞여 있어도 로컬에서 판정하지 않고 LLM 가드레일에 맡김
+INJECTION = re.compile(
+    r"(ignore|disregard|forget)\s+(all\s+|the\s+|any\s+)?(previous|prior|above|earlier)\s+(instructions?|prompts?)"
+    r"|system\s+prompt|(이전|앞의|위의)\s*(지시|지침|명령)\S*\s*(무시|잊)|시스템\s*프롬프트",
+    re.IGNORECASE,
+)
+
+# 대화 초반의 간단한 잡담은 허용함 (가드레일 지침과 동일)
+SMALL_TALK = re.compile(r"^\s*(안녕|안녕하세요|반가워요|감사합니다|고마워요|hello|hi|thanks)\W*$", re.IGNORECASE)
+
+# 명백히 범위를 벗어난 요청 (지침에는 없으므로 별도로 정의함)
+OFF_TOPIC_TERMS = [
+    "날씨", "레시피", "요리", "주식", "코인", "비트코인", "축구", "야구", "영화 추천",
+    "노래", "농담", "숙제", "번역", "여행", "맛집", "운세", "연애", "뉴스", "시 써",
+    "weather", "recipe", "stock", "joke", "homework",
+]
+OFF_TOPIC_EXAMPLES = [
+    "오늘 날씨 어때요?",
+    "내일 비 와요?",
+    "김치찌개 레시피 알려줘",
+    "저녁 메뉴 추천해줘",
+    "주식 뭐 살까요?",
+    "비트코인 시세 알려줘",
+    "어제 축구 경기 결과 알려줘",
+    "재미있는 농담 해줘",
+    "영화 추천해줘",
+    "수학 숙제 좀 도와줘",
+    "이 문장 영어로 번역해줘",
+    "제주도 여행 일정 짜줘",
+    "근처 맛집 알려줘",
+    "오늘 운세 봐줘",
+    "시 한 편 써줘",
+    "대통령이 누구야?",
+]
+
+
+def normalize(text: str) -> str:
+    # 대소문자/공백 차이를 없앤 비교용 텍스트
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+def _compile_terms(terms) -> re.Pattern | None:
+    terms = sorted({term for term in terms if term}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(term) for term in terms))
+
+
+def vectorize(texts: list[str], dim: int = HASH_DIM) -> np.ndarray:
+    # 문자 n-gram을 해싱하여 L2 정규화된 (len(texts), dim) 행렬로 만듦
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        compact = normalize(text).replace(" ", "_")
+        for n in NGRAM_SIZES:
+            for i in range(len(compact) - n + 1):
+                matrix[row, zlib.crc32(compact[i : i + n].encode()) % dim] += 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-9)
+
+
+def parse_instruction_seeds(instructions: str) -> dict[str, dict[str, list[str]]]:
+    """
+    분류 지침에서 카테고리별 bullet 문구와 예시 문장을 추출함.
+    반환값: {"BILLING SUPPORT": {"phrases": [...], "examples": [...]}, ...}
+    """
+    seeds = {}
+    current = None
+    for line in instructions.splitlines():
+        header = CATEGORY_HEADER.match(line)
+        if header:
+            current = seeds.setdefault(header.group(2).strip(), {"phrases": [], "examples": []})
+            continue
+        if current is None:
+            continue
+        if line.strip().startswith("---"):
+            current = None
+            continue
+        example = EXAMPLE_LINE.match(line)
+        if example:
+            current["examples"].extend(QUOTED.findall(example.group(1)))
+        elif line.strip().startswith("- "):
+            current["phrases"].extend(
+                phrase.strip() for phrase in line.strip()[2:].split(",") if phrase.strip()
+            )
+    return seeds
+
+
+@dataclass
+class TopicVerdict:
+    # label: "on_topic" | "off_topic" | "uncertain"
+    label: str
+    source: str
+    category: str | None = None
+    score: float = 0.0
+    reason: str = ""
+    # 지원 범위 예시와의 벡터 유사도도 on-topic 기준을 넘었는지 (빠른 라우팅은 이 경우에만 허용함)
+    vector_agrees: bool = False
+
+    @property
+    def is_confident(self) -> bool:
+        return self.label != "uncertain"
+
+
+@dataclass
+class ClassifierStats:
+    # 단계별 판정 횟수 (llm은 로컬에서 판단하지 못해 LLM 가드레일로 넘긴 횟수)
+    counts: dict[str, int] = field(default_factory=dict)
+    total: int = 0
+
+    def record(self, verdict: TopicVerdict):
+        key = "llm" if not verdict.is_confident else f"{verdict.source}_{verdict.label}"
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+
+    @property
+    def hit_rate(self) -> float:
+        # LLM 호출 없이 로컬에서 판정한 비율
+        if self.total == 0:
+            return 0.0
+        return 1 - self.counts.get("llm", 0) / self.total
+
+
+class TopicClassifier:
+    """
+    LLM off-topic 가드레일 앞단의 로컬 분류기.
+    1) 구문 사전/정규식: 지원 문의 구문(여러 단어)이 있으면 on-topic, 범위 밖 용어만 있으면 후보로 표시
+       (양쪽이 모두 있거나 지시 무시 시도가 있으면 "uncertain")
+    2) 문자 n-gram 벡터 유사도: 지침의 예시와 범위 밖 예시 중 어느 쪽에 가까운지 점수화
+       (구문이 없으면 벡터 점수가 기준을 넘고 범위 밖 용어가 없을 때만 on-topic)
+    확신할 수 없는 입력만 "uncertain"으로 반환하여 LLM 가드레일이 판단하게 함.
+    """
+
+    def __init__(self, seeds: dict[str, dict[str, list[str]]], off_topic_examples=OFF_TOPIC_EXAMPLES):
+        on_texts, on_labels = [], []
+        for category, seed in seeds.items():
+            for text in seed["phrases"] + seed["examples"]:
+                on_texts.append(text)
+                on_labels.append(category)
+
+        self._on_pattern = _compile_terms(ON_TOPIC_PHRASES)
+        self._off_pattern = _compile_terms(OFF_TOPIC_TERMS)
+        self._on_labels = on_labels
+        self._on_vectors = vectorize(on_texts)
+        self._off_vectors = vectorize(list(off_topic_examples))
+        self.stats = ClassifierStats()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_instructions(cls, instructions: str, **kwargs) -> "TopicClassifier":
+        return cls(parse_instruction_seeds(instructions), **kwargs)
+
+    def classify(self, text: str, record: bool = True) -> TopicVerdict:
+        # record=False: 라우터처럼 가드레일 밖에서 참고용으로 호출할 때는 통계에 넣지 않음
+        verdict = self._classify(normalize(text))
+        if record:
+            with self._lock:
+                self.stats.record(verdict)
+        return verdict
+
+    def _classify(self, text: str) -> TopicVerdict:
+        if not text:
+            return TopicVerdict("uncertain", "lexicon")
+        if SMALL_TALK.match(text):
+            return TopicVerdict("on_topic", "lexicon", reason="간단한 인사")
+        injection = INJECTION.search(text)
+        if injection:
+            return TopicVerdict("uncertain", "lexicon", reason=f"지시 무시 시도: {injection.group(0)}")
+
+        vector = vectorize([text])[0]
+        on_scores = self._on_vectors @ vector
+        off_score = float((self._off_vectors @ vector).max()) if len(self._off_vectors) else 0.0
+        best = int(on_scores.argmax()) if len(on_scores) else -1
+        on_score = float(on_scores[best]) if best >= 0 else 0.0
+        category = self._on_labels[best] if best >= 0 else None
+        vector_agrees = on_score >= MIN_SIMILARITY and on_score - off_score >= MIN_MARGIN
+
+        on_match = self._on_pattern.search(text) if self._on_pattern else None
+        off_match = self._off_pattern.search(text) if self._off_pattern else None
+        if on_match and off_match:
+            # 예: "주문 번호로 운세 봐줘" - 구문만으로는 판단할 수 없으므로 LLM 가드레일에 맡김
+            return TopicVerdict(
+                "uncertain", "lexicon", score=on_score,
+                reason=f"양쪽 용어가 모두 있음: {on_match.group(0)}, {off_match.group(0)}",
+            )
+        if on_match:
+            return TopicVerdict(
+                "on_topic", "lexicon", category, on_score,
+                reason=f"지원 문의 구문: {on_match.group(0)}", vector_agrees=vector_agrees,
+            )
+        if vector_agrees and not off_match:
+            return TopicVerdict(
+                "on_topic", "vector", category, on_score,
+                reason="지원 범위 예시와 유사함", vector_agrees=True,
+            )
+        # 범위 밖 용어가 있으면 벡터 점수가 반대편보다 높기만 해도 off-topic으로 확정함
+        if off_match and off_score > on_score:
+            return TopicVerdict(
+                "off_topic", "lexicon", score=off_score,
+                reason=f"지원 범위 밖 요청: {off_match.group(0)}",
+            )
+        if off_score >= MIN_SIMILARITY and off_score - on_score >= MIN_MARGIN:
+            return TopicVerdict("off_topic", "vector", score=off_score, reason="지원 범위 밖 예시와 유사함")
+        return TopicVerdict("uncertain", "vector", score=max(on_score, off_score))
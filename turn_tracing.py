@@ -0,0 +1,375 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+from agents import Agent, RunContextWrapper, RunHooks
+from agents.voice import STTModel, TTSModel
+from models import UserAccountContext
+
+
+# 턴 단계 이름 (사이드바 워터폴의 행 순서와 같음)
+STAGES = [
+    "ingest",
+    "stt",
+    "input_guardrail",
+    "agent",
+    "llm",
+    "handoff",
+    "tool",
+    "output_guardrail",
+    "tts",
+]
+
+DEFAULT_SPAN_FILE = "turn-spans.jsonl"
+# span 저장 위치: JSONL 파일 경로 또는 "sqlite:<DB 파일 경로>" (단계별 집계 쿼리용)
+SPAN_EXPORT_ENV_VAR = "SUPPORT_SPAN_EXPORT"
+SQLITE_EXPORT_PREFIX = "sqlite:"
+
+
+@dataclass
+class Span:
+    # 턴 시작 시점 기준 상대 시간(ms)으로 기록한 단계 구간
+    turn_id: str
+    stage: str
+    name: str
+    start_ms: float
+    end_ms: float | None = None
+    attributes: dict = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float | None:
+        if self.end_ms is None:
+            return None
+        return self.end_ms - self.start_ms
+
+
+class TurnTrace:
+    """
+    하나의 음성 턴(STT → 가드레일 → LLM/핸드오프/도구 → TTS)에서 발생한 span 모음.
+    span은 여러 태스크(가드레일, TTS 등)에서 동시에 추가될 수 있으므로 락으로 보호함.
+    """
+
+    def __init__(self, turn_id: str | None = None):
+        self.turn_id = turn_id or uuid.uuid4().hex[:12]
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.spans: list[Span] = []
+        self.total_ms: float | None = None
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def now_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def start_span(self, stage: str, name: str, **attributes) -> Span:
+        span = Span(self.turn_id, stage, name, self.now_ms(), attributes=attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def end_span(self, span: Span, **attributes):
+        span.end_ms = self.now_ms()
+        span.attributes.update(attributes)
+
+    def event(self, stage: str, name: str, **attributes) -> Span:
+        # 길이가 없는 시점 이벤트 (예: 핸드오프)
+        span = self.start_span(stage, name, **attributes)
+        span.end_ms = span.start_ms
+        return span
+
+    def last_span(self, stage: str) -> Span | None:
+        with self._lock:
+            for span in reversed(self.spans):
+                if span.stage == stage:
+                    return span
+        return None
+
+    def finish(self):
+        self.total_ms = self.now_ms()
+
+    def finished_spans(self) -> list[Span]:
+        with self._lock:
+            return [span for span in self.spans if span.end_ms is not None]
+
+
+# 현재 실행 중인 턴 (asyncio 태스크 생성 시 컨텍스트가 복사되므로 하위 태스크에서도 보임)
+_current_turn: ContextVar[TurnTrace | None] = ContextVar("current_turn", default=None)
+
+
+def start_turn(turn_id: str | None = None) -> TurnTrace:
+    turn = TurnTrace(turn_id)
+    _current_turn.set(turn)
+    return turn
+
+
+def current_turn() -> TurnTrace | None:
+    return _current_turn.get()
+
+
+@contextmanager
+def stage_span(stage: str, name: str | None = None, **attributes):
+    # 현재 턴이 있을 때만 span을 기록함 (턴 밖에서 호출되면 아무것도 하지 않음)
+    turn = current_turn()
+    if turn is None:
+        yield None
+        return
+    span = turn.start_span(stage, name or stage, **attributes)
+    try:
+        yield span
+    except BaseException as e:
+        span.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        turn.end_span(span)
+
+
+# =============================================================================
+# HOOKS / MODEL WRAPPERS
+# =============================================================================
+
+
+class TurnTracingHooks(RunHooks):
+    # Runner 실행 전체(모든 Agent)의 LLM 호출, 핸드오프 구간을 현재 턴에 기록함
+
+    def __init__(self):
+        self._open: dict[tuple, list[Span]] = {}
+
+    def _start(self, key, stage, name, **attributes):
+        turn = current_turn()
+        if turn is not None:
+            span = turn.start_span(stage, name, **attributes)
+            self._open.setdefault((turn.turn_id, *key), []).append(span)
+
+    def _end(self, key, **attributes):
+        turn = current_turn()
+        if turn is None:
+            return
+        spans = self._open.get((turn.turn_id, *key))
+        if spans:
+            turn.end_span(spans.pop(0), **attributes)
+            if not spans:
+                del self._open[(turn.turn_id, *key)]
+
+    async def on_agent_start(
+        self,
+        context: RunContextWrapper[UserAccountContext],
+        agent: Agent[UserAccountContext],
+    ):
+        self._start(("agent", agent.name), "agent", agent.name)
+
+    async def on_agent_end(
+        self,
+        context: RunContextWrapper[UserAccountContext],
+        agent: Agent[UserAccountContext],
+        output,
+    ):
+        self._end(("agent", agent.name))
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items):
+        self._start(("llm", agent.name), "llm", agent.name, input_items=len(input_items))
+
+    async def on_llm_end(self, context, agent, response):
+        self._end(
+            ("llm", agent.name),
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+        )
+
+    async def on_handoff(
+        self,
+        context: RunContextWrapper[UserAccountContext],
+        from_agent: Agent[UserAccountContext],
+        to_agent: Agent[UserAccountContext],
+    ):
+        turn = current_turn()
+        if turn is not None:
+            # 에이전트 전환 시 이전 에이전트 구간은 여기서 종료됨
+            self._end(("agent", from_agent.name))
+            # on_handoff 콜백(handle_handoff)이 사유와 함께 이미 기록했다면 이름만 보완함
+            recorded = turn.last_span("handoff")
+            if recorded is not None and recorded.attributes.get("to_agent") == to_agent.name:
+                recorded.name = f"{from_agent.name} → {to_agent.name}"
+            else:
+                turn.event("handoff", f"{from_agent.name} → {to_agent.name}", to_agent=to_agent.name)
+
+    # 도구 구간은 tool_execution.scheduled가 호출(call_id) 단위로 기록함
+    # (한 응답의 도구들이 동시에 실행되므로 도구 이름만으로는 시작/종료를 짝지을 수 없음)
+
+
+class TracedSTTModel(STTModel):
+    # STT 모델을 감싸 전사 구간을 "stt" span으로 기록함
+    def __init__(self, model: STTModel):
+        self.model = model
+
+    @property
+    def model_name(self) -> str:
+        return self.model.model_name
+
+    async def transcribe(self, input, settings, trace_include_sensitive_data, trace_include_sensitive_audio_data):
+        with stage_span("stt", self.model_name, audio_seconds=len(input.buffer) / input.frame_rate) as span:
+            transcript = await self.model.transcribe(
+                input, settings, trace_include_sensitive_data, trace_include_sensitive_audio_data
+            )
+            if span is not None:
+                span.attributes["chars"] = len(transcript)
+            return transcript
+
+    async def create_session(self, input, settings, trace_include_sensitive_data, trace_include_sensitive_audio_data):
+        return await self.model.create_session(
+            input, settings, trace_include_sensitive_data, trace_include_sensitive_audio_data
+        )
+
+
+class TracedTTSModel(TTSModel):
+    # TTS 모델을 감싸 문장 단위 합성 구간을 "tts" span으로 기록함 (첫 바이트 지연 포함)
+    def __init__(self, model: TTSModel):
+        self.model = model
+
+    @property
+    def model_name(self) -> str:
+        return self.model.model_name
+
+    async def run(self, text, settings):
+        turn = current_turn()
+        span = turn.start_span("tts", self.model_name, chars=len(text)) if turn else None
+        audio_bytes = 0
+        try:
+            async for chunk in self.model.run(text, settings):
+                if span is not None and audio_bytes == 0:
+                    span.attributes["first_byte_ms"] = turn.now_ms() - span.start_ms
+                audio_bytes += len(chunk)
+                yield chunk
+        finally:
+            if span is not None:
+                turn.end_span(span, audio_bytes=audio_bytes)
+
+
+# =============================================================================
+# EXPORTERS
+# =============================================================================
+
+
+def _span_record(span: Span, started_at: str) -> dict:
+    record = asdict(span)
+    record["duration_ms"] = span.duration_ms
+    record["turn_started_at"] = started_at
+    return record
+
+
+class JsonlSpanExporter:
+    # 턴이 끝날 때 span을 JSONL 파일에 한 줄씩 추가함
+    def __init__(self, path: str = DEFAULT_SPAN_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, turn: TurnTrace):
+        lines = [
+            json.dumps(_span_record(span, turn.started_at), ensure_ascii=False, default=str)
+            for span in turn.finished_spans()
+        ]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+
+
+class SQLiteSpanExporter:
+    # 턴 span을 SQLite 테이블에 저장함 (단계별 집계 쿼리용)
+    def __init__(self, path: str, table: str = "turn_spans"):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        # 턴마다 새로 열지 않고 커넥션 하나를 잠금으로 보호해 재사용함
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    turn_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    start_ms REAL NOT NULL,
+                    end_ms REAL NOT NULL,
+                    duration_ms REAL NOT NULL,
+                    attributes TEXT,
+                    turn_started_at TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_turn ON {table} (turn_id)")
+
+    def export(self, turn: TurnTrace):
+        rows = [
+            (
+                span.turn_id,
+                span.stage,
+                span.name,
+                span.start_ms,
+                span.end_ms,
+                span.duration_ms,
+                json.dumps(span.attributes, ensure_ascii=False, default=str),
+                turn.started_at,
+            )
+            for span in turn.finished_spans()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT INTO {self.table} VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def build_span_exporter(target: str | None = None):
+    """
+    설정(인자 또는 SUPPORT_SPAN_EXPORT 환경 변수)에 맞는 span exporter를 만듦.
+    - "sqlite:turn-spans.db" → SQLiteSpanExporter
+    - 그 외 → 해당 경로의 JsonlSpanExporter (기본값: turn-spans.jsonl)
+    """
+    target = target or os.environ.get(SPAN_EXPORT_ENV_VAR) or DEFAULT_SPAN_FILE
+    if target.startswith(SQLITE_EXPORT_PREFIX):
+        return SQLiteSpanExporter(target[len(SQLITE_EXPORT_PREFIX) :])
+    return JsonlSpanExporter(target)
+
+
+def render_waterfall(turn: TurnTrace):
+    """턴 span을 Streamlit 사이드바용 워터폴 차트(가로 막대)로 그림."""
+    import altair as alt
+    import streamlit as st
+
+    spans = turn.finished_spans()
+    if not spans:
+        return
+    rows = []
+    seen: dict[str, int] = {}
+    for span in sorted(spans, key=lambda s: s.start_ms):
+        # 같은 도구를 한 턴에 여러 번(동시에) 호출하면 행을 나눠 겹쳐 보이지 않게 함
+        label = f"{span.stage}: {span.name}"
+        seen[label] = seen.get(label, 0) + 1
+        rows.append(
+            {
+                "stage": span.stage,
+                "label": label if seen[label] == 1 else f"{label} ({seen[label]})",
+                "start": span.start_ms,
+                "end": max(span.end_ms, span.start_ms + 1),
+                "duration_ms": round(span.duration_ms, 1),
+            }
+        )
+    chart = (
+        alt.Chart(alt.Data(values=rows))
+        .mark_bar()
+        .encode(
+            x=alt.X("start:Q", title="ms"),
+            x2="end:Q",
+            y=alt.Y("label:N", sort=None, title=None),
+            color=alt.Color("stage:N", sort=STAGES, legend=None),
+            tooltip=["label:N", "duration_ms:Q"],
+        )
+    )
+    total = turn.total_ms if turn.total_ms is not None else max(row["end"] for row in rows)
+    st.caption(f"Turn `{turn.turn_id}` · {total:.0f} ms")
+    st.altair_chart(chart, use_container_width=True)
@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# 프레임 에너지 기반 VAD 기본 설정
+FRAME_MS = 20
+# 이 값(dBFS)보다 조용한 프레임은 노이즈 수준과 무관하게 항상 무음으로 간주함
+SILENCE_FLOOR_DBFS = -50.0
+# 노이즈 바닥(하위 에너지 분위수)보다 이만큼 커야 음성으로 판단함
+NOISE_MARGIN_DB = 10.0
+# 녹음 전체가 발화인 경우를 위해 임계값은 최대 에너지보다 이만큼 낮게 제한함
+PEAK_MARGIN_DB = 25.0
+# 발화 앞뒤로 남겨두는 여유 구간 (자음 손실 방지)
+PADDING_MS = 200
+# 음성 프레임 합계가 이보다 짧으면 빈 녹음으로 간주함
+MIN_SPEECH_MS = 250
+
+
+@dataclass
+class VadResult:
+    # 무음 제거 결과와 통계
+    audio: np.ndarray
+    sample_rate: int
+    original_samples: int
+    speech_samples: int
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self.audio) == 0
+
+    @property
+    def dropped_seconds(self) -> float:
+        return (self.original_samples - len(self.audio)) / self.sample_rate
+
+    @property
+    def kept_seconds(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    @property
+    def dropped_ratio(self) -> float:
+        if self.original_samples == 0:
+            return 0.0
+        return 1 - len(self.audio) / self.original_samples
+
+
+def frame_energy_dbfs(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    # int16 샘플을 프레임 단위로 나눠 RMS 에너지(dBFS)를 벡터 연산으로 계산함
+    usable = len(samples) - len(samples) % frame_length
+    frames = samples[:usable].reshape(-1, frame_length).astype(np.float32)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1)) / 32768.0
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = FRAME_MS,
+    padding_ms: int = PADDING_MS,
+    min_speech_ms: int = MIN_SPEECH_MS,
+) -> VadResult:
+    """
+    STT 호출 전에 녹음 앞뒤의 무음을 잘라내는 에너지 기반 VAD.
+    발화가 없는(너무 짧은) 녹음은 빈 배열을 반환하므로 모델 호출 전에 걸러낼 수 있음.
+    잘라낸 결과는 원본 배열의 뷰이므로 복사가 발생하지 않음.
+    """
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    energy = frame_energy_dbfs(samples, frame_length)
+
+    empty = VadResult(
+        audio=samples[:0],
+        sample_rate=sample_rate,
+        original_samples=len(samples),
+        speech_samples=0,
+    )
+    if len(energy) == 0:
+        return empty
+
+    # 녹음 환경마다 노이즈 수준이 다르므로 하위 10% 프레임 에너지를 노이즈 바닥으로 추정함
+    noise_floor = np.percentile(energy, 10)
+    peak = energy.max()
+    threshold = max(
+        SILENCE_FLOOR_DBFS,
+        min(noise_floor + NOISE_MARGIN_DB, peak - PEAK_MARGIN_DB),
+    )
+    voiced = np.flatnonzero(energy > threshold)
+
+    speech_samples = len(voiced) * frame_length
+    if speech_samples < sample_rate * min_speech_ms // 1000:
+        empty.speech_samples = speech_samples
+        return empty
+
+    padding = sample_rate * padding_ms // 1000
+    start = max(0, voiced[0] * frame_length - padding)
+    end = min(len(samples), (voiced[-1] + 1) * frame_length + padding)
+
+    return VadResult(
+        audio=samples[start:end],
+        sample_rate=sample_rate,
+        original_samples=len(samples),
+        speech_samples=speech_samples,
+    )
@@ -1,31 +1,314 @@
+import asyncio
+from collections import deque
+from contextlib import nullcontext
+
 from agents.voice import VoiceWorkflowBase, VoiceWorkflowHelper
-from agents import Runner
-import streamlit as st
+from agents import (
+    InputGuardrailTripwireTriggered,
+    OutputGuardrailTripwireTriggered,
+    RunContextWrapper,
+    Runner,
+)
+from output_guardrails import sentence_checked_run, split_sentences
+from providers import get_run_config
+from turn_tracing import current_turn
+
+
+# 입력 가드레일 판정을 기다리며 응답 텍스트(TTS)를 보류하는 최대 시간(초)
+# None이면 판정이 나올 때까지 항상 보류함
+DEFAULT_GUARDRAIL_GRACE_SECONDS = 2.0
 
 
 # 음성 입력 기반 사용자 요청을 처리하는 커스텀 워크플로우 정의
 class CustomWorkflow(VoiceWorkflowBase):
 
-    def __init__(self, context):
+    def __init__(
+        self,
+        context,
+        state=None,
+        hooks=None,
+        input_guardrails=None,
+        guardrail_grace_seconds=DEFAULT_GUARDRAIL_GRACE_SECONDS,
+        sentence_guardrails=None,
+        router=None,
+    ):
         # 대화나 사용자 관련 정보를 담는 컨텍스트 저장
         self.context = context
+        # 대화별 활성 Agent/세션 (ConversationState, 매 턴 읽고 갱신함)
+        self.state = state
+        # 실행 전체(모든 Agent)에 적용되는 RunHooks (계측/로깅용, 선택)
+        self.hooks = hooks
+        # Agent 실행과 병렬로 검사할 입력 가드레일 (매 턴 현재 Agent와 무관하게 적용)
+        self.input_guardrails = input_guardrails or []
+        self.guardrail_grace_seconds = guardrail_grace_seconds
+        # 최종 출력 대신 스트리밍되는 응답을 문장 단위로 검사할 출력 가드레일
+        # (해당 가드레일이 등록된 Agent의 응답에만 적용됨)
+        self.sentence_guardrails = sentence_guardrails or []
+        # 진입 Agent(triage)에서 명확한 요청을 바로 전문 Agent로 보내는 로컬 라우터 (선택)
+        self.router = router
 
     async def run(self, transcription):
         # 음성 입력을 텍스트로 변환한 transcription을 받아
         # Agent에 전달하여 스트리밍 형태로 응답을 생성함
+        agent = self.state.agent
+        if self.router is not None and agent is self.router.entry_agent:
+            agent = await self._fast_route(transcription) or agent
 
         # Agent를 스트리밍 모드로 실행
-        result = Runner.run_streamed(
-            st.session_state["agent"],              # 현재 활성화된 Agent 인스턴스
-            transcription,                          # 음성 인식 결과 텍스트
-            session=st.session_state["session"],    # 대화 세션 상태 관리
-            context=self.context,                   # 사용자 컨텍스트 전달
-        )
+        # 문장 단위 검사를 하면 Agent의 최종 출력 가드레일은 건너뜀 (중복 호출 방지)
+        with sentence_checked_run() if self.sentence_guardrails else nullcontext():
+            result = Runner.run_streamed(
+                agent,                                  # 현재 활성화된 Agent 인스턴스
+                transcription,                          # 음성 인식 결과 텍스트
+                session=_session_for(self.state.session, agent),  # 대화 세션 (Agent별 기록 예산)
+                context=self.context,                   # 사용자 컨텍스트 전달
+                run_config=get_run_config(),            # 모델 제공자 설정 (온라인/오프라인)
+                hooks=self.hooks,                       # 실행 단위 훅
+            )
 
         # 모델 응답을 한 덩어리(chunk)씩 비동기로 받아 처리
-        async for chunk in VoiceWorkflowHelper.stream_text_from(result):
+        chunks = VoiceWorkflowHelper.stream_text_from(result)
+        if self.sentence_guardrails:
+            # 검증된 문장만 TTS로 내보냄
+            chunks = self._sentence_guarded(result, chunks)
+        if self.input_guardrails:
+            # 가드레일 판정과 Agent 실행을 동시에 진행
+            chunks = self._guarded(agent, transcription, result, chunks)
+
+        async for chunk in chunks:
             # 각 텍스트 조각을 실시간으로 반환하여 Streamlit에 표시
             yield chunk
 
-        # 대화 후 마지막 Agent 상태를 세션에 저장하여 다음 요청 시 이어서 사용
-        st.session_state["agent"] = result.last_agent
+        # 대화 후 마지막 Agent를 대화 상태에 저장하여 다음 요청 시 이어서 사용
+        # (입력 가드레일이 발동하면 위에서 예외가 발생하므로 이전 Agent가 유지됨)
+        self.state.agent = result.last_agent
+
+    async def _fast_route(self, transcription):
+        # 확신도가 충분하면 triage LLM 턴을 건너뛰고 전문 Agent를 반환함 (아니면 None)
+        decision = await self.router.route(transcription)
+        agent = self.router.agent_for(decision)
+        turn = current_turn()
+        if turn is not None:
+            turn.event(
+                "handoff",
+                f"fast-path → {agent.name}" if agent else "fast-path: triage",
+                to_agent=agent.name if agent else None,
+                confidence=decision.confidence,
+                source=decision.source,
+            )
+        # 대화 상태의 활성 Agent는 run()이 끝날 때(입력 가드레일 통과 후) 바꿈
+        return agent
+
+    async def _check_input(self, agent, transcription):
+        # 모든 입력 가드레일을 동시에 실행하고, 처음으로 tripwire가 발동한 결과(없으면 None)를 반환
+        wrapper = RunContextWrapper(context=self.context)
+        tasks = [
+            asyncio.create_task(guardrail.run(agent, transcription, wrapper))
+            for guardrail in self.input_guardrails
+        ]
+        try:
+            for done in asyncio.as_completed(tasks):
+                guardrail_result = await done
+                if guardrail_result.output.tripwire_triggered:
+                    return guardrail_result
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _guarded(self, agent, transcription, result, chunks):
+        """
+        입력 가드레일을 Agent 스트리밍과 병렬로 실행함.
+        - 판정 전까지 응답 텍스트를 보류하고, 판정이 통과하면 즉시 내보냄
+        - 유예 시간(guardrail_grace_seconds)이 지나면 판정 전이라도 내보내기 시작함
+        - tripwire가 발동하면 진행 중인 실행을 즉시 취소하고 예외를 발생시킴
+        """
+        loop = asyncio.get_running_loop()
+        verdict = asyncio.create_task(self._check_input(agent, transcription))
+        deadline = (
+            None
+            if self.guardrail_grace_seconds is None
+            else loop.time() + self.guardrail_grace_seconds
+        )
+        held = []
+        released = False
+        checked = False
+        next_chunk = asyncio.ensure_future(chunks.__anext__())
+
+        try:
+            while True:
+                if not checked and verdict.done():
+                    checked = True
+                    tripped = verdict.result()
+                    if tripped is not None:
+                        result.cancel()
+                        _retrieve_task_exception()
+                        raise InputGuardrailTripwireTriggered(tripped)
+                    released = True
+
+                if released and held:
+                    for chunk in held:
+                        yield chunk
+                    held.clear()
+
+                if next_chunk.done():
+                    try:
+                        chunk = next_chunk.result()
+                    except StopAsyncIteration:
+                        break
+                    if released:
+                        yield chunk
+                    else:
+                        held.append(chunk)
+                    next_chunk = asyncio.ensure_future(chunks.__anext__())
+                    continue
+
+                timeout = None
+                if not released and deadline is not None:
+                    timeout = max(0.0, deadline - loop.time())
+                waiting = {next_chunk} if checked else {next_chunk, verdict}
+                done, _ = await asyncio.wait(
+                    waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # 유예 시간 경과: 판정은 계속 기다리되 보류한 텍스트는 내보냄
+                    released = True
+
+            # 응답이 판정보다 먼저 끝난 경우: 판정을 기다린 뒤 내보냄
+            if not checked:
+                tripped = await verdict
+                if tripped is not None:
+                    _retrieve_task_exception()
+                    raise InputGuardrailTripwireTriggered(tripped)
+            for chunk in held:
+                yield chunk
+        finally:
+            verdict.cancel()
+            await _close_stream(chunks, next_chunk)
+
+    async def _check_sentence(self, guardrails, agent, sentence, wrapper):
+        # 문장에 적용할 출력 가드레일을 모두 실행하고, tripwire가 발동한 결과(없으면 None)를 반환
+        results = await asyncio.gather(
+            *(guardrail.run(wrapper, agent, sentence) for guardrail in guardrails)
+        )
+        for guardrail_result in results:
+            if guardrail_result.output.tripwire_triggered:
+                return guardrail_result
+        return None
+
+    async def _sentence_guarded(self, result, chunks):
+        """
+        스트리밍 응답을 문장 단위로 출력 가드레일에 검사하며 내보냄.
+        - 문장이 완성되는 즉시 검사를 시작하고, 검증된 문장은 순서대로 바로 내보냄
+        - 위반이 발견되면 진행 중인 실행을 취소하고 나머지 문장은 버림
+        - 문장 검사 대상이 아닌 Agent의 텍스트는 검사 없이 순서만 지켜 내보냄
+        """
+        wrapper = RunContextWrapper(context=self.context)
+        loop = asyncio.get_running_loop()
+        # (내보낼 텍스트, 검사 태스크) 큐 (검사가 없는 텍스트는 결과가 None인 future)
+        queue = deque()
+        buffer = ""
+        buffer_agent = None
+        buffer_guardrails = []
+        next_chunk = asyncio.ensure_future(chunks.__anext__())
+
+        def passthrough(text):
+            future = loop.create_future()
+            future.set_result(None)
+            queue.append((text, future))
+
+        def check(sentence):
+            task = asyncio.create_task(
+                self._check_sentence(buffer_guardrails, buffer_agent, sentence, wrapper)
+            )
+            queue.append((sentence, task))
+
+        try:
+            while True:
+                # 앞에서부터 검사가 끝난 문장을 순서대로 내보냄
+                while queue and queue[0][1].done():
+                    text, task = queue.popleft()
+                    tripped = task.result()
+                    if tripped is not None:
+                        result.cancel()
+                        _retrieve_task_exception()
+                        raise OutputGuardrailTripwireTriggered(tripped)
+                    yield text
+
+                if next_chunk is None:
+                    if not queue:
+                        break
+                    await asyncio.wait({queue[0][1]})
+                    continue
+
+                waiting = {next_chunk, queue[0][1]} if queue else {next_chunk}
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                if next_chunk not in done:
+                    continue
+
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    # 스트림 종료: 남은 텍스트를 마지막 문장으로 검사함
+                    next_chunk = None
+                    if buffer.strip():
+                        check(buffer)
+                    buffer = ""
+                    continue
+                next_chunk = asyncio.ensure_future(chunks.__anext__())
+
+                agent = result.current_agent
+                if agent is not buffer_agent:
+                    # 핸드오프로 Agent가 바뀌면 이전 Agent의 남은 텍스트를 먼저 처리함
+                    if buffer.strip():
+                        check(buffer)
+                    buffer = ""
+                    buffer_agent = agent
+                    buffer_guardrails = [
+                        guardrail
+                        for guardrail in self.sentence_guardrails
+                        if guardrail in agent.output_guardrails
+                    ]
+
+                if not buffer_guardrails:
+                    passthrough(chunk)
+                    continue
+                sentences, buffer = split_sentences(buffer + chunk)
+                for sentence in sentences:
+                    check(sentence)
+        finally:
+            for _, task in queue:
+                task.cancel()
+            await _close_stream(chunks, next_chunk)
+
+
+def _session_for(session, agent):
+    # 요약 세션이면 Agent별 토큰 예산이 적용된 뷰를 사용함
+    if hasattr(session, "for_agent"):
+        return session.for_agent(agent.name)
+    return session
+
+
+def _retrieve_task_exception():
+    # VoicePipeline은 워크플로우를 자체 태스크에서 실행하고, 예외를 결과 스트림으로 전달한 뒤 태스크에서도
+    # 다시 발생시킴. 스트림을 읽는 쪽이 이미 처리하므로 태스크의 예외는 끝날 때 회수함
+    # ("Task exception was never retrieved" 로그 방지)
+    task = asyncio.current_task()
+    if task is not None:
+        task.add_done_callback(_consume_exception)
+
+
+def _consume_exception(task):
+    if not task.cancelled():
+        task.exception()
+
+
+async def _close_stream(chunks, next_chunk):
+    # 대기 중인 다음 chunk 요청을 정리한 뒤 스트림을 닫음
+    if next_chunk is not None and not next_chunk.done():
+        next_chunk.cancel()
+        try:
+            await next_chunk
+        except (asyncio.CancelledError, StopAsyncIteration):
+            pass
+    await chunks.aclose()